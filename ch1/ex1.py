@@ -1,3 +1,4 @@
+import os
 import sys
 
 import gi
@@ -8,23 +9,24 @@ gi.require_version('Gst', '1.0')
 
 from gi.repository import Gst, GObject, GLib
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+from bus_dispatcher import wait_until
+from media_cache import cached_uri
+
 
 # initialize GStreamer
 Gst.init(sys.argv[1:])
 
 # build the pipeline
+# 두 번째 재생부터는 로컬 디스크 캐시에서
 pipeline = Gst.parse_launch(
-    "playbin uri=https://gstreamer.freedesktop.org/data/media/sintel_trailer-480p.webm"
+    "playbin uri=" + cached_uri("https://gstreamer.freedesktop.org/data/media/sintel_trailer-480p.webm")
 )
 
 # start playing
 pipeline.set_state(Gst.State.PLAYING)
 
-# wait until EOS or error
-bus = pipeline.get_bus()
-msg = bus.timed_pop_filtered(
-    Gst.CLOCK_TIME_NONE,
-    Gst.MessageType.ERROR | Gst.MessageType.EOS
-)
+# wait until EOS or error (bus fd 를 asyncio 에서 기다림)
+msg = wait_until(pipeline, Gst.MessageType.ERROR | Gst.MessageType.EOS)
 # free resources
 pipeline.set_state(Gst.State.NULL)
\ No newline at end of file
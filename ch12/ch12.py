@@ -1,14 +1,27 @@
+import os
+import sys
 import gi
 gi.require_version('Gst', '1.0')
 from gi.repository import Gst, GLib
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+from buffering_control import BufferingController
+from media_cache import cached_uri
+
 class CustomData:
     def __init__(self):
         self.is_live = False
         self.pipeline = None
         self.loop = None
+        self.buffering = None
 
 def cb_message(bus, msg, data):
+    # BUFFERING 은 히스테리시스 컨트롤러가 처리 (메시지마다 상태를 바꾸지 않음)
+    if data.buffering.handle(msg):
+        s = data.buffering.last_stats
+        print(f"Buffering ({s['percent']}%, in {s['avg_in']} B/s, out {s['avg_out']} B/s)", end="\r")
+        return
+
     msg_type = msg.type
     if msg_type == Gst.MessageType.ERROR:
         err, debug = msg.parse_error()
@@ -20,17 +33,6 @@ def cb_message(bus, msg, data):
         data.pipeline.set_state(Gst.State.READY)
         data.loop.quit()
 
-    elif msg_type == Gst.MessageType.BUFFERING:
-        if data.is_live:
-            return
-        percent = msg.parse_buffering()
-        print(f"Buffering ({percent}%)", end="\r")
-        print(percent)
-        if percent < 100:
-            data.pipeline.set_state(Gst.State.PAUSED)
-        else:
-            data.pipeline.set_state(Gst.State.PLAYING)
-
     elif msg_type == Gst.MessageType.CLOCK_LOST:
         data.pipeline.set_state(Gst.State.PAUSED)
         data.pipeline.set_state(Gst.State.PLAYING)
@@ -39,11 +41,12 @@ def main():
     Gst.init(None)
     data = CustomData()
 
-    uri = "https://gstreamer.freedesktop.org/data/media/sintel_trailer-480p.webm"
+    uri = cached_uri("https://gstreamer.freedesktop.org/data/media/sintel_trailer-480p.webm")
     pipeline = Gst.parse_launch(f"playbin uri={uri}")
     data.pipeline = pipeline
+    data.buffering = BufferingController(pipeline)
 
-    ret = pipeline.set_state(Gst.State.PLAYING)
+    ret = data.buffering.start()
     if ret == Gst.StateChangeReturn.FAILURE:
         print("Unable to set the pipeline to the playing state.")
         return
@@ -64,6 +67,7 @@ def main():
         pass
 
     pipeline.set_state(Gst.State.NULL)
+    print(f"\n{data.buffering.stats()}")
 
 if __name__ == "__main__":
     main()
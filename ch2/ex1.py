@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import os
 import sys
 import gi
 import logging
@@ -8,6 +9,9 @@ gi.require_version("GObject", "2.0")
 gi.require_version("Gst", "1.0")
 
 from gi.repository import Gst, GLib, GObject
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+from bus_dispatcher import wait_until
 logging.basicConfig(level=logging.DEBUG, format="[%(name)s] [%(levelname)8s] - %(message)s")
 logger = logging.getLogger(__name__)
 
@@ -42,8 +46,7 @@ if ret == Gst.StateChangeReturn.FAILURE:
     logger.error("Unable to set the pipeline to the playing state.")
     sys.exit(1)
 
-bus = pipeline.get_bus()
-msg = bus.timed_pop_filtered(Gst.CLOCK_TIME_NONE, Gst.MessageType.ERROR | Gst.MessageType.EOS)
+msg = wait_until(pipeline, Gst.MessageType.ERROR | Gst.MessageType.EOS)
 if msg:
     if msg.type == Gst.MessageType.ERROR:
         err, debug_info = msg.parse_error()
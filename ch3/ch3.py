@@ -1,10 +1,15 @@
 #!/usr/bin/env python3
+import os
 import sys
 import gi
 
 gi.require_version('Gst', '1.0')
 from gi.repository import Gst, GObject
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+from bus_dispatcher import wait_until
+from caps_index import CapsIndex
+
 class CustomData:
     def __init__(self):
         self.pipeline = None
@@ -12,6 +17,7 @@ class CustomData:
         self.convert = None
         self.resample = None
         self.sink = None
+        self.caps_index = None
 
 def pad_added_handler(src, new_pad, data):
     """uridecodebin이 새 pad를 만들었을 때 호출되는 콜백"""
@@ -25,10 +31,22 @@ def pad_added_handler(src, new_pad, data):
     new_pad_struct = new_pad_caps.get_structure(0)
     new_pad_type = new_pad_struct.get_name()
 
-    # raw 오디오가 아니면 무시
+    # raw 오디오가 아니면 인덱스에서 audio/x-raw 로 바꿔 줄 요소를 찾고, 없으면 무시
     if not new_pad_type.startswith('audio/x-raw'):
-        print(f"It has type '{new_pad_type}' which is not raw audio. Ignoring.")
-        return
+        factory = data.caps_index.find_converter(new_pad_type, 'audio/x-raw', caps=new_pad_caps)
+        if factory is None:
+            print(f"It has type '{new_pad_type}' which is not raw audio. Ignoring.")
+            return
+        converter = Gst.ElementFactory.make(factory, None)
+        data.pipeline.add(converter)
+        converter.sync_state_with_parent()
+        if not converter.link(data.convert):
+            print(f"Type is '{new_pad_type}' but {factory} could not be linked.")
+            converter.set_state(Gst.State.NULL)
+            data.pipeline.remove(converter)
+            return
+        print(f"Inserting {factory} for type '{new_pad_type}'.")
+        sink_pad = converter.get_static_pad('sink')
 
     # pad 간 연결 시도
     ret = new_pad.link(sink_pad)
@@ -41,6 +59,8 @@ def main():
     Gst.init(None)
 
     data = CustomData()
+    # 팩토리 스캔은 저장된 인덱스로 대체 (레지스트리가 바뀌었을 때만 다시 만든다)
+    data.caps_index = CapsIndex.load()
 
     # 요소 생성
     data.source   = Gst.ElementFactory.make('uridecodebin',   'source')
@@ -80,30 +100,19 @@ def main():
         data.pipeline.set_state(Gst.State.NULL)
         sys.exit(1)
  
-    # 버스 메시지 폴링 루프
-    bus = data.pipeline.get_bus()
-    terminate = False
-    while not terminate:
-        msg = bus.timed_pop_filtered(
-            Gst.CLOCK_TIME_NONE,
-            Gst.MessageType.STATE_CHANGED | Gst.MessageType.ERROR | Gst.MessageType.EOS
-        )
-        if msg:
-            t = msg.type
-            if t == Gst.MessageType.ERROR:
-                err, debug = msg.parse_error()
-                sys.stderr.write(f"Error received from element {msg.src.get_name()}: {err.message}\n")
-                sys.stderr.write(f"Debugging information: {debug}\n")
-                terminate = True
-            elif t == Gst.MessageType.EOS:
-                print("End-Of-Stream reached.")
-                terminate = True
-            elif t == Gst.MessageType.STATE_CHANGED:
-                if(msg.src == data.pipeline):
-                    old, new, _ = msg.parse_state_changed()
-                    print(f"Pipeline state changed from {Gst.Element.state_get_name(old)} to {Gst.Element.state_get_name(new)}.")
-            else:
-                print("Unexpected message received.")
+    # 버스 메시지 대기 (STATE_CHANGED 는 핸들러, EOS/ERROR 에서 끝)
+    def on_state_changed(msg, old, new, _pending):
+        if msg.src == data.pipeline:
+            print(f"Pipeline state changed from {Gst.Element.state_get_name(old)} to {Gst.Element.state_get_name(new)}.")
+
+    msg = wait_until(data.pipeline, Gst.MessageType.ERROR | Gst.MessageType.EOS,
+                     {Gst.MessageType.STATE_CHANGED: on_state_changed})
+    if msg.type == Gst.MessageType.ERROR:
+        err, debug = msg.parse_error()
+        sys.stderr.write(f"Error received from element {msg.src.get_name()}: {err.message}\n")
+        sys.stderr.write(f"Debugging information: {debug}\n")
+    else:
+        print("End-Of-Stream reached.")
 
     # 정리
     data.pipeline.set_state(Gst.State.NULL)
@@ -2,12 +2,18 @@
 """
 Equivalent of the C ‘playbin’ example in Python (GStreamer 1.x, PyGObject)
 """
+import asyncio
+import os
 import sys
 import gi
 
 gi.require_version("Gst", "1.0")
 from gi.repository import Gst
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+from bus_dispatcher import BusDispatcher, run
+from media_cache import cached_uri
+
 class CustomData:
     """Mimics the C struct _CustomData"""
     def __init__(self) -> None:
@@ -65,6 +71,79 @@ def handle_message(data: CustomData, msg: Gst.Message) -> None:
                 print("Seeking query failed.", file=sys.stderr)
 
 
+def refresh_ui(data: CustomData) -> None:
+    """Position display and the one-time seek, every 100 ms while PLAYING"""
+    if not data.playing:
+        return
+    ok, current = data.playbin.query_position(Gst.Format.TIME)
+    if not ok:
+        print("Could not query current position.", file=sys.stderr)
+        current = Gst.CLOCK_TIME_NONE
+
+    if data.duration == Gst.CLOCK_TIME_NONE:
+        ok, data.duration = data.playbin.query_duration(Gst.Format.TIME)
+        if not ok:
+            print("Could not query current duration.", file=sys.stderr)
+            data.duration = Gst.CLOCK_TIME_NONE
+
+    if (
+        current != Gst.CLOCK_TIME_NONE
+        and data.duration != Gst.CLOCK_TIME_NONE
+    ):
+        print(
+            f"Position {current / Gst.SECOND:.2f}s / "
+            f"{data.duration / Gst.SECOND:.2f}s",
+            end="\r",
+            flush=True,
+        )
+
+    # Seek to 30 s once we pass 10 s
+    if (
+        data.seek_enabled
+        and not data.seek_done
+        and current > 10 * Gst.SECOND
+    ):
+        print("\nReached 10 s, performing seek…")
+        data.playbin.seek_simple(
+            Gst.Format.TIME,
+            Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT,
+            30 * Gst.SECOND,
+        )
+        data.seek_done = True
+
+
+async def watch_bus(data: CustomData) -> None:
+    """Bus messages from the dispatcher; the 100 ms UI timer only runs while PLAYING"""
+    loop = asyncio.get_running_loop()
+    handle = BusDispatcher().watch(data.playbin)
+    timer: asyncio.TimerHandle | None = None
+
+    def tick() -> None:
+        nonlocal timer
+        refresh_ui(data)
+        timer = loop.call_later(0.1, tick)
+
+    def on_state_changed(msg, _old, new, _pending) -> None:
+        nonlocal timer
+        handle_message(data, msg)
+        if msg.src is not data.playbin:
+            return
+        if new == Gst.State.PLAYING and timer is None:
+            timer = loop.call_later(0.1, tick)
+        elif new != Gst.State.PLAYING and timer is not None:
+            timer.cancel()
+            timer = None
+
+    handle.on(Gst.MessageType.STATE_CHANGED, on_state_changed)
+    handle.on(Gst.MessageType.DURATION_CHANGED, lambda msg: handle_message(data, msg))
+    try:
+        handle_message(data, await handle.wait_for(Gst.MessageType.ERROR | Gst.MessageType.EOS))
+    finally:
+        if timer is not None:
+            timer.cancel()
+        handle.close()
+
+
 def main() -> int:
     Gst.init(None)
 
@@ -77,7 +156,7 @@ def main() -> int:
 
     data.playbin.set_property(
         "uri",
-        "https://gstreamer.freedesktop.org/data/media/sintel_trailer-480p.webm",
+        cached_uri("https://gstreamer.freedesktop.org/data/media/sintel_trailer-480p.webm"),
     )
 
     # Start playback
@@ -87,61 +166,11 @@ def main() -> int:
         data.playbin.unref()
         return -1
 
-    bus = data.playbin.get_bus()
-
-    while not data.terminate:
-        # Wait up to 100 ms for interesting messages on the bus
-        msg = bus.timed_pop_filtered(
-            100 * Gst.MSECOND,
-            Gst.MessageType.STATE_CHANGED
-            | Gst.MessageType.ERROR
-            | Gst.MessageType.EOS
-            | Gst.MessageType.DURATION_CHANGED,
-        )
-
-        if msg:
-            handle_message(data, msg)
-        else:
-            # Timeout expired — do UI/update work
-            if data.playing:
-                ok, current = data.playbin.query_position(Gst.Format.TIME)
-                if not ok:
-                    print("Could not query current position.", file=sys.stderr)
-                    current = Gst.CLOCK_TIME_NONE
-
-                if data.duration == Gst.CLOCK_TIME_NONE:
-                    ok, data.duration = data.playbin.query_duration(Gst.Format.TIME)
-                    if not ok:
-                        print("Could not query current duration.", file=sys.stderr)
-                        data.duration = Gst.CLOCK_TIME_NONE
-
-                if (
-                    current != Gst.CLOCK_TIME_NONE
-                    and data.duration != Gst.CLOCK_TIME_NONE
-                ):
-                    print(
-                        f"Position {current / Gst.SECOND:.2f}s / "
-                        f"{data.duration / Gst.SECOND:.2f}s",
-                        end="\r",
-                        flush=True,
-                    )
-
-                # Seek to 30 s once we pass 10 s
-                if (
-                    data.seek_enabled
-                    and not data.seek_done
-                    and current > 10 * Gst.SECOND
-                ):
-                    print("\nReached 10 s, performing seek…")
-                    data.playbin.seek_simple(
-                        Gst.Format.TIME,
-                        Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT,
-                        30 * Gst.SECOND,
-                    )
-                    data.seek_done = True
+    # Bus messages arrive through the dispatcher (no bus polling);
+    # the 100 ms position timer runs only while PLAYING
+    run(lambda: watch_bus(data))
 
     # Clean up
-    bus.unref()
     data.playbin.set_state(Gst.State.NULL)
     data.playbin.unref()
     return 0
@@ -4,26 +4,32 @@ GTK + GStreamer ‘playbin’ 데모
 — 재생/일시정지/정지 버튼, 시크 슬라이더, 스트림 메타데이터 표시
 """
 
-import gi, sys
+import gi, os, sys, threading, time
 gi.require_version("Gst", "1.0")
 gi.require_version("Gtk", "3.0")                 # GTK 3 예제 (4도 유사)
 from gi.repository import Gst, Gtk, GLib
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+from startup_probe import preload_async
+from media_cache import cached_uri
+from seek_scheduler import SeekScheduler
+from trick_mode import TrickPlayer
+from playlist import Playlist
+
 GST_SEC = Gst.SECOND  # 읽기 편하게 상수 alias
 
 
 class Player:
 
-    def __init__(self) -> None:
+    def __init__(self, uris: list[str] | None = None) -> None:
 
         Gst.init(None)
         Gtk.init(None)
+        # 플러그인 로드는 UI 를 만드는 동안 백그라운드에서
+        preload_async()
         self.playbin: Gst.Element = Gst.ElementFactory.make("playbin", "playbin")
 
-        self.playbin.set_state(Gst.State.NULL)
-        self.playbin.set_state(Gst.State.READY)
-        self.playbin.set_state(Gst.State.PAUSED)
-        self.playbin.set_state(Gst.State.PLAYING)
+        # URI/싱크를 모두 설정한 뒤 마지막에 PLAYING 한 번만 (빈 playbin 으로 상태를 돌리지 않음)
         if not self.playbin:
             print("playbin 생성 실패", file=sys.stderr)
             sys.exit(1)
@@ -39,11 +45,22 @@ class Player:
             videosink = Gst.ElementFactory.make("gtksink", "gtksink")
             self.sink_widget = videosink.get_property("widget")
 
-        self.playbin.set_property(
-            "uri",
-            "https://gstreamer.freedesktop.org/data/media/sintel_trailer-480p.webm",
-        )
         self.playbin.set_property("video-sink", videosink)
+        # URI 를 여러 개 주면 갭리스 플레이리스트 (다음 항목을 미리 프리롤)
+        self.playlist = None
+        if uris and len(uris) > 1:
+            self.playlist = Playlist(self.playbin, [cached_uri(u) for u in uris])
+            self.playlist.attach()
+        else:
+            self.playbin.set_property(
+                "uri",
+                cached_uri(uris[0] if uris else "https://gstreamer.freedesktop.org/data/media/sintel_trailer-480p.webm"),
+            )
+        # 드래그 중 시크는 마지막 목표만 남기고, 손을 떼면 정확한 시크 한 번
+        self.seeker = SeekScheduler(self.playbin)
+        self.dragging = False
+        # 빨리 감기/되감기: 키프레임만 디코딩하는 rate 시크
+        self.trick = TrickPlayer(self.playbin)
 
         # -------------- GUI --------------
         self._build_ui()
@@ -56,10 +73,18 @@ class Player:
         bus.connect("message::eos", self._on_eos)
         bus.connect("message::state-changed", self._on_state_changed)
         bus.connect("message::application", self._on_app_msg)
-
-        # playbin 태그 변경 시 application 메시지 발생
-        for sig in ("video-tags-changed", "audio-tags-changed", "text-tags-changed"):
-            self.playbin.connect(sig, self._on_tags_changed)
+        bus.connect("message::async-done", lambda _bus, msg: self.seeker.handle(msg))
+        bus.connect("message::qos", lambda _bus, msg: self.trick.handle(msg))
+
+        # playbin 태그 변경 시 application 메시지 발생 (한 루프 반복에 한 번만)
+        self._dirty_streams: set[tuple[str, int]] = set()
+        self._tags_lock = threading.Lock()
+        self._tags_posted = False
+        self._sections: dict[tuple[str, int], tuple[str, Gtk.TextMark]] = {}   # 구역 텍스트, 시작 mark
+        self.tag_counters = {"signals": 0, "messages": 0, "section_updates": 0, "unchanged": 0}
+        self._t_start = time.monotonic()
+        for kind in ("video", "audio", "text"):
+            self.playbin.connect(f"{kind}-tags-changed", self._on_tags_changed, kind)
 
         # 1 초마다 UI 새로고침
         GLib.timeout_add_seconds(1, self._refresh_ui)
@@ -78,7 +103,11 @@ class Player:
         play_btn = Gtk.Button.new_from_icon_name("media-playback-start", Gtk.IconSize.SMALL_TOOLBAR)
         pause_btn = Gtk.Button.new_from_icon_name("media-playback-pause", Gtk.IconSize.SMALL_TOOLBAR)
         stop_btn = Gtk.Button.new_from_icon_name("media-playback-stop", Gtk.IconSize.SMALL_TOOLBAR)
-        play_btn.connect("clicked", lambda *_: self.playbin.set_state(Gst.State.PLAYING))
+        rew_btn = Gtk.Button.new_from_icon_name("media-seek-backward", Gtk.IconSize.SMALL_TOOLBAR)
+        ffwd_btn = Gtk.Button.new_from_icon_name("media-seek-forward", Gtk.IconSize.SMALL_TOOLBAR)
+        play_btn.connect("clicked", self._on_play)
+        rew_btn.connect("clicked", lambda *_: self.trick.faster(reverse=True))
+        ffwd_btn.connect("clicked", lambda *_: self.trick.faster())
         pause_btn.connect("clicked", lambda *_: self.playbin.set_state(Gst.State.PAUSED))
         stop_btn.connect("clicked", lambda *_: self.playbin.set_state(Gst.State.READY))
 
@@ -86,6 +115,8 @@ class Player:
         self.slider = Gtk.Scale.new_with_range(Gtk.Orientation.HORIZONTAL, 0, 100, 1)
         self.slider.set_draw_value(False)
         self.slider_update_id = self.slider.connect("value-changed", self._on_slider_change)
+        self.slider.connect("button-press-event", self._on_slider_press)
+        self.slider.connect("button-release-event", self._on_slider_release)
 
         # 스트림 정보 뷰어
         self.streams_view = Gtk.TextView(editable=False)
@@ -93,7 +124,7 @@ class Player:
 
         # 레이아웃
         controls = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=4)
-        for b in (play_btn, pause_btn, stop_btn):  # type: ignore[arg-type]
+        for b in (rew_btn, play_btn, pause_btn, stop_btn, ffwd_btn):  # type: ignore[arg-type]
             controls.pack_start(b, False, False, 0)
         controls.pack_start(self.slider, True, True, 0)
 
@@ -114,17 +145,32 @@ class Player:
         self.state: Gst.State = Gst.State.NULL
 
     # ---------- 콜백 ----------
+    def _on_play(self, *_):
+        self.playbin.set_state(Gst.State.PLAYING)
+        if self.trick.rate != 1.0:
+            self.trick.normal()
+
     def _on_delete(self, *_):
+        print(f"seek: {self.seeker.stats()}")
+        print(f"trick mode: {self.trick.report()}")
+        print(f"tags: {self.tag_counters} {self.tag_rates()}")
+        if self.playlist:
+            print(f"playlist: {self.playlist.stats()}")
         self.playbin.set_state(Gst.State.NULL)
         Gtk.main_quit()
 
     def _on_slider_change(self, range_: Gtk.Range):
-        val = range_.get_value()
-        self.playbin.seek_simple(
-            Gst.Format.TIME,
-            Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT,
-            int(val * GST_SEC),
-        )
+        # 드래그 중엔 KEY_UNIT|SNAP (합쳐서), 키보드/클릭 한 번이면 바로 ACCURATE
+        self.seeker.request(int(range_.get_value() * GST_SEC), final=not self.dragging)
+
+    def _on_slider_press(self, *_):
+        self.dragging = True
+        return False
+
+    def _on_slider_release(self, *_):
+        self.dragging = False
+        self.seeker.request(int(self.slider.get_value() * GST_SEC), final=True)
+        return False
 
     def _refresh_ui(self):
         if self.state < Gst.State.PAUSED:  # READY 또는 NULL
@@ -138,7 +184,7 @@ class Player:
 
         # 현재 위치
         ok, current = self.playbin.query_position(Gst.Format.TIME)
-        if ok and self.duration != Gst.CLOCK_TIME_NONE:
+        if ok and self.duration != Gst.CLOCK_TIME_NONE and not self.dragging and not self.seeker.busy:
             self.slider.handler_block(self.slider_update_id)
             self.slider.set_value(current / GST_SEC)
             self.slider.handler_unblock(self.slider_update_id)
@@ -162,8 +208,14 @@ class Player:
             if old == Gst.State.READY and new == Gst.State.PAUSED:
                 self._refresh_ui()  # 첫 PAUSED 시 즉시 업데이트
 
-    # 태그 콜백 → application 메시지
-    def _on_tags_changed(self, _playbin, _stream):
+    # 태그 콜백(스트리밍 스레드) → 바뀐 스트림만 모아 두고 application 메시지는 한 번만
+    def _on_tags_changed(self, _playbin, stream, kind):
+        with self._tags_lock:
+            self.tag_counters["signals"] += 1
+            self._dirty_streams.add((kind, stream))
+            if self._tags_posted:
+                return
+            self._tags_posted = True
         self.playbin.post_message(
             Gst.Message.new_application(
                 self.playbin, Gst.Structure.new_empty("tags-changed")
@@ -172,47 +224,85 @@ class Player:
 
     def _on_app_msg(self, _bus, msg):
         if msg.get_structure().get_name() == "tags-changed":
-            self._analyze_streams()
+            with self._tags_lock:
+                dirty, self._dirty_streams = self._dirty_streams, set()
+                self._tags_posted = False
+            self.tag_counters["messages"] += 1
+            self._analyze_streams(dirty)
 
     # 스트림 메타데이터 분석
-    def _analyze_streams(self):
+    def _stream_text(self, kind: str, i: int) -> str:
+        tags = self.playbin.emit(f"get-{kind}-tags", i)
+        if not tags:
+            return ""
+        if kind == "video":
+            codec = tags.get_string(Gst.TAG_VIDEO_CODEC)[1] or "unknown"
+            return f"video stream {i}:\n  codec: {codec}\n\n"
+        lines = [f"{'audio' if kind == 'audio' else 'subtitle'} stream {i}:\n"]
+        if kind == "audio":
+            codec = tags.get_string(Gst.TAG_AUDIO_CODEC)[1]
+            if codec:
+                lines.append(f"  codec: {codec}\n")
+        lang = tags.get_string(Gst.TAG_LANGUAGE_CODE)[1]
+        if lang:
+            lines.append(f"  language: {lang}\n")
+        if kind == "audio":
+            rate = tags.get_uint(Gst.TAG_BITRATE)[1]
+            if rate:
+                lines.append(f"  bitrate: {rate}\n")
+        return "".join(lines) + "\n"
+
+    def _analyze_streams(self, dirty: set[tuple[str, int]]):
+        """바뀐 스트림의 구역만 다시 쓴다. 구역 경계는 텍스트 mark 로 기억."""
+        counts = {kind: self.playbin.get_property(f"n-{kind}") for kind in ("video", "audio", "text")}
+        # 사라진 스트림 구역 지우기
+        for key in [k for k in self._sections if k[1] >= counts[k[0]]]:
+            self._replace_section(key, "")
+        for key in sorted(dirty, key=self._section_order):
+            if key[1] < counts[key[0]]:
+                self._replace_section(key, self._stream_text(*key))
+
+    @staticmethod
+    def _section_order(key: tuple[str, int]) -> tuple[int, int]:
+        return ("video", "audio", "text").index(key[0]), key[1]
+
+    def _section_end(self, key: tuple[str, int]) -> Gtk.TextIter:
+        """구역 = 자기 시작 mark ~ 다음 구역의 시작 mark (없으면 버퍼 끝)"""
+        later = [k for k in self._sections if self._section_order(k) > self._section_order(key)]
+        if not later:
+            return self.streams_buf.get_end_iter()
+        return self.streams_buf.get_iter_at_mark(self._sections[min(later, key=self._section_order)][1])
+
+    def _replace_section(self, key: tuple[str, int], text: str) -> None:
+        # 시작 mark 는 모두 오른쪽 gravity: 삽입하면 같은 위치의 mark 가 뒤로 밀린다
         buf = self.streams_buf
-        buf.set_text("")  # clear
-
-        def append(txt: str):
-            buf.insert(buf.get_end_iter(), txt)
-
-        n_vid = self.playbin.get_property("n-video")
-        n_aud = self.playbin.get_property("n-audio")
-        n_txt = self.playbin.get_property("n-text")
-
-        for i in range(n_vid):
-            tags = self.playbin.emit("get-video-tags", i)
-            if tags:
-                codec = tags.get_string(Gst.TAG_VIDEO_CODEC)[1] or "unknown"
-                append(f"video stream {i}:\n  codec: {codec}\n")
-
-        for i in range(n_aud):
-            tags = self.playbin.emit("get-audio-tags", i)
-            if tags:
-                append(f"\naudio stream {i}:\n")
-                codec = tags.get_string(Gst.TAG_AUDIO_CODEC)[1]
-                lang = tags.get_string(Gst.TAG_LANGUAGE_CODE)[1]
-                rate = tags.get_uint(Gst.TAG_BITRATE)[1]
-                if codec:
-                    append(f"  codec: {codec}\n")
-                if lang:
-                    append(f"  language: {lang}\n")
-                if rate:
-                    append(f"  bitrate: {rate}\n")
-
-        for i in range(n_txt):
-            tags = self.playbin.emit("get-text-tags", i)
-            if tags:
-                append(f"\nsubtitle stream {i}:\n")
-                lang = tags.get_string(Gst.TAG_LANGUAGE_CODE)[1]
-                if lang:
-                    append(f"  language: {lang}\n")
+        section = self._sections.get(key)
+        if section is not None and section[0] == text:
+            self.tag_counters["unchanged"] += 1
+            return
+        if section is None and not text:
+            return
+        self.tag_counters["section_updates"] += 1
+        end = self._section_end(key)
+        if section is None:
+            offset = end.get_offset()
+            buf.insert(end, text)
+            self._sections[key] = (text, buf.create_mark(None, buf.get_iter_at_offset(offset), False))
+            return
+        mark = section[1]
+        offset = buf.get_iter_at_mark(mark).get_offset()
+        buf.delete(buf.get_iter_at_mark(mark), end)
+        if not text:
+            buf.delete_mark(mark)
+            del self._sections[key]
+            return
+        buf.insert(buf.get_iter_at_offset(offset), text)
+        buf.move_mark(mark, buf.get_iter_at_offset(offset))     # 자기 mark 만 앞으로 되돌림
+        self._sections[key] = (text, mark)
+
+    def tag_rates(self) -> dict:
+        elapsed = max(1e-6, time.monotonic() - self._t_start)
+        return {f"{name}_per_s": round(n / elapsed, 2) for name, n in self.tag_counters.items()}
 
     # ---------- 실행 ----------
     def run(self):
@@ -221,4 +311,7 @@ class Player:
 
 if __name__ == "__main__":
 
-    Player().run()
+    # python ch5.py [uri …]  — file 경로도 받는다
+    Gst.init(None)
+    uris = [a if Gst.uri_is_valid(a) else Gst.filename_to_uri(os.path.abspath(a)) for a in sys.argv[1:]]
+    Player(uris).run()
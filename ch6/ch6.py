@@ -4,10 +4,13 @@ basic-tutorial-6.py ― Pad Capabilities (Python port)
 GTK UI 없이 콘솔에만 정보를 출력합니다.
 """
 
-import sys, gi
+import os, sys, gi
 gi.require_version("Gst", "1.0")
 from gi.repository import Gst
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+from bus_dispatcher import wait_until
+
 # ---------- Capabilities 출력 유틸 ----------
 def print_field(struct, field_name, value, pfx=""):
     """Gst.Structure.foreach() 용 콜백 (파이썬은 foreach 대신 직접 loop)"""
@@ -95,33 +98,24 @@ def main():
     if ret == Gst.StateChangeReturn.FAILURE:
         sys.exit("PLAYING 상태로 전환 실패")
 
-    # Bus loop
-    bus = pipeline.get_bus()
-    terminate = False
-    while not terminate:
-        msg = bus.timed_pop_filtered(
-            Gst.CLOCK_TIME_NONE,
-            Gst.MessageType.ERROR | Gst.MessageType.EOS | Gst.MessageType.STATE_CHANGED
-        )
-        if msg:
-            t = msg.type
-            if t == Gst.MessageType.ERROR:
-                err, dbg = msg.parse_error()
-                print(f"Error from {msg.src.get_name()}: {err.message}")
-                if dbg:
-                    print(f"Debug info: {dbg}")
-                terminate = True
-            elif t == Gst.MessageType.EOS:
-                print("End-Of-Stream")
-                terminate = True
-            elif t == Gst.MessageType.STATE_CHANGED and msg.src == pipeline:
-                old, new, pending = msg.parse_state_changed()
-                print(f"\nPipeline state changed {old.value_nick} → {new.value_nick}:")
-                print_pad_capabilities(sink, "sink")
+    # Bus 대기: 상태가 바뀔 때마다 sink pad caps 출력, EOS/ERROR 에서 끝
+    def on_state_changed(msg, old, new, _pending):
+        if msg.src == pipeline:
+            print(f"\nPipeline state changed {old.value_nick} → {new.value_nick}:")
+            print_pad_capabilities(sink, "sink")
+
+    msg = wait_until(pipeline, Gst.MessageType.ERROR | Gst.MessageType.EOS,
+                     {Gst.MessageType.STATE_CHANGED: on_state_changed})
+    if msg.type == Gst.MessageType.ERROR:
+        err, dbg = msg.parse_error()
+        print(f"Error from {msg.src.get_name()}: {err.message}")
+        if dbg:
+            print(f"Debug info: {dbg}")
+    else:
+        print("End-Of-Stream")
 
     # 정리
     pipeline.set_state(Gst.State.NULL)
-    bus.unref()
 
 if __name__ == "__main__":
     main()
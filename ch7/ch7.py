@@ -3,10 +3,14 @@
 basic-tutorial-7.py — Tee branches (audio + visual) in Python
 """
 
-import sys, gi
+import os, sys, gi
 gi.require_version("Gst", "1.0")
 from gi.repository import Gst
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+from bus_dispatcher import wait_until
+from queue_policy import BEST_EFFORT, BranchPolicies, QueuePolicy
+
 
 def link_many(*elements) -> bool:
     """C의 gst_element_link_many()와 같은 역할 (PadLinkReturn 검사)."""
@@ -41,6 +45,11 @@ def main():
     visual.set_property("shader", 0)
     visual.set_property("style", 1)                              # wavescope 옵션 :contentReference[oaicite:2]{index=2}
 
+    # 브랜치별 queue 정책: 비주얼라이저가 느려져도 오디오 재생은 막히지 않게
+    policies = BranchPolicies()
+    policies.apply("audio", audio_queue, QueuePolicy(max_time=Gst.SECOND))
+    policies.apply("visual", video_queue, BEST_EFFORT)
+
     # 3. 파이프라인 구성 & 자동 링크
     for element in (
             audio_source, tee,
@@ -74,25 +83,17 @@ def main():
     pipeline.set_state(Gst.State.PLAYING)
 
     # 6. 버스 대기 (EOS/ERROR)
-    bus = pipeline.get_bus()
-    while True:
-        msg = bus.timed_pop_filtered(
-            Gst.CLOCK_TIME_NONE,
-            Gst.MessageType.ERROR | Gst.MessageType.EOS
-        )
-        if not msg:
-            continue
-        t = msg.type
-        if t == Gst.MessageType.ERROR:
-            err, dbg = msg.parse_error()
-            print(f"Error: {err.message}")
-            if dbg: print(dbg)
-        else:
-            print("EOS reached")
-        msg = None
-        break
+    msg = wait_until(pipeline, Gst.MessageType.ERROR | Gst.MessageType.EOS)
+    if msg.type == Gst.MessageType.ERROR:
+        err, dbg = msg.parse_error()
+        print(f"Error: {err.message}")
+        if dbg: print(dbg)
+    else:
+        print("EOS reached")
+    msg = None
 
     # 7. 정리
+    policies.print_summary()
     tee.release_request_pad(tee_audio_pad)
     tee.release_request_pad(tee_video_pad)
     pipeline.set_state(Gst.State.NULL)
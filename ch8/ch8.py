@@ -4,19 +4,26 @@
 C tutorial ‘appsrc + tee’ 예제를 gst-python으로 옮긴 버전.
 ― 16-bit mono @ 44.1 kHz 사인파를 실시간 생성
 ― 오디오 재생 / 파형 비주얼라이저 / appsink 수집 3-way 분기
+― 인자로 원시 S16LE mono 44.1 kHz 파일을 주면 사인파 대신 그 파일을 mmap 해서 반복 재생
 """
-import gi, math, sys, ctypes
-import numpy as np
+import gi, math, os, sys, ctypes
 from gi.overrides.GstAudio import GstAudio
 
 gi.require_version("Gst", "1.0")
 from gi.repository import Gst, GObject, GLib
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+from queue_policy import BEST_EFFORT, SAMPLING, BranchPolicies, QueuePolicy
+from bootstrap import lazy_import
+from mmap_feeder import MmapFeeder
+
+np = lazy_import("numpy")   # appsink 콜백에서 처음 쓸 때 로드
+
 CHUNK_SIZE   = 1024      # bytes per push (== 512 samples)
 SAMPLE_RATE  = 44100     # Hz
 
 class AppSrcTeeDemo:
-    def __init__(self):
+    def __init__(self, raw_path=None):
         Gst.init(None)
         self.loop         = GLib.MainLoop()
         self.num_samples  = 0
@@ -47,6 +54,13 @@ class AppSrcTeeDemo:
                     self.videoconv, self.sink_vid, self.q_app, self.appsink]):
             raise RuntimeError("요소 생성 실패")
 
+        # ---------- 브랜치별 queue 정책 ----------
+        # 오디오 재생이 기준, 비주얼라이저/appsink 는 밀리면 버림
+        self.policies = BranchPolicies()
+        self.policies.apply("audio", self.q_audio, QueuePolicy(max_time=Gst.SECOND))
+        self.policies.apply("visual", self.q_vis, BEST_EFFORT)
+        self.policies.apply("app", self.q_app, SAMPLING)
+
         # ---------- wavescope 설정 ----------
         self.scope.set_property("shader", 0)
         self.scope.set_property("style",  0)
@@ -55,10 +69,15 @@ class AppSrcTeeDemo:
         info = GstAudio.AudioInfo()
         info.set_format(GstAudio.AudioFormat.S16, 44100, 1, None)
         caps = info.to_caps()
-        self.appsrc.set_property("caps", caps)
-        self.appsrc.set_property("format", Gst.Format.TIME)
-        self.appsrc.connect("need-data",   self.on_need_data)
-        self.appsrc.connect("enough-data", self.on_enough_data)
+        self.feeder = None
+        if raw_path:
+            # 파일 → 매핑을 가리키는 버퍼 (복사 없음). caps/format/타임스탬프는 feeder 가 맞춘다
+            self.feeder = MmapFeeder(self.appsrc, raw_path, caps, loop=True, chunk_bytes=CHUNK_SIZE * 16)
+        else:
+            self.appsrc.set_property("caps", caps)
+            self.appsrc.set_property("format", Gst.Format.TIME)
+            self.appsrc.connect("need-data",   self.on_need_data)
+            self.appsrc.connect("enough-data", self.on_enough_data)
 
         # ---------- appsink 설정 ----------
         self.appsink.set_property("emit-signals", True)
@@ -206,11 +225,19 @@ class AppSrcTeeDemo:
     # -------------------- 실행 --------------------
     def run(self):
         self.pipeline.set_state(Gst.State.PLAYING)
+        if self.feeder:
+            self.feeder.start()
         try:
             self.loop.run()
         finally:
+            if self.feeder:
+                self.feeder.stop()       # 막힌 push 를 EOS 로 깨우고 스레드가 끝날 때까지
             self.pipeline.set_state(Gst.State.NULL)
+            if self.feeder:
+                self.feeder.close()
+            print()
+            self.policies.print_summary()
 
 if __name__ == "__main__":
     GObject.threads_init()
-    AppSrcTeeDemo().run()
+    AppSrcTeeDemo(sys.argv[1] if len(sys.argv) > 1 else None).run()
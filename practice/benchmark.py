@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+튜토리얼 파이프라인 헤드리스 벤치마크
+— ch1~ch12, practice/ 의 토폴로지를 로컬 대역(videotestsrc/audiotestsrc/생성한 파일)과
+  fakesink sync=false / appsink 로 바꿔서 최대 처리량을 측정
+— 항목별: fps 또는 samples/s, CPU, RSS(최대), PLAYING 까지 걸린 시간
+— 결과는 JSON, 저장된 baseline 과 비교해서 회귀를 표시 (회귀가 있으면 exit 1)
+
+    python benchmark.py                          # 전부 실행 → bench_results.json
+    python benchmark.py ch7 hls_test_1           # 일부만
+    python benchmark.py --save-baseline          # 현재 결과를 baseline 으로
+    python benchmark.py --baseline bench_baseline.json --tolerance 0.1
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+import local_media
+
+FRAMES = 600          # 비디오 소스 길이 (버퍼 수)
+AUDIO_BUFFERS = 4000  # 오디오 소스 길이 (버퍼 수, 1024 samples/buffer)
+SINK = "fakesink name=bench_sink sync=false"
+
+
+def _topologies() -> dict[str, tuple[str, str]]:
+    """이름 → (launch 문자열, 단위). bench_sink 에 도착하는 양을 센다."""
+    webm = local_media.file_uri(local_media.webm_clip())
+    mp4 = local_media.file_uri(local_media.mp4_clip())
+    mp4_path = local_media.mp4_clip()
+    playbin = (f"playbin uri={webm} video-sink=\"{SINK}\" "
+               f"audio-sink=\"fakesink sync=false\"")
+    recorder_tail = (
+        "tee name=t "
+        "t. ! queue leaky=downstream max-size-buffers=2 ! videorate ! videoscale ! "
+        "video/x-raw,width=640,height=360,framerate=15/1 ! videoconvert ! fakesink sync=false "
+        f"t. ! queue ! videoconvert ! x264enc tune=zerolatency key-int-max=30 ! h264parse ! {SINK}")
+    return {
+        # 튜토리얼
+        "ch1": (playbin, "frames"),
+        "ch2": (f"videotestsrc num-buffers={FRAMES} pattern=0 ! {SINK}", "frames"),
+        "ch3": (f"uridecodebin uri={webm} ! audioconvert ! audioresample ! {SINK}", "samples"),
+        "ch4": (playbin, "frames"),
+        "ch5": (playbin, "frames"),
+        "ch6": (f"audiotestsrc num-buffers={AUDIO_BUFFERS} ! {SINK}", "samples"),
+        "ch7": (f"audiotestsrc num-buffers={AUDIO_BUFFERS} freq=215 ! tee name=t "
+                f"t. ! queue ! audioconvert ! audioresample ! {SINK} "
+                f"t. ! queue ! wavescope shader=0 style=1 ! videoconvert ! fakesink sync=false",
+                "samples"),
+        "ch8": (f"audiotestsrc num-buffers={AUDIO_BUFFERS} samplesperbuffer=512 ! "
+                f"audio/x-raw,format=S16LE,rate=44100,channels=1 ! tee name=t "
+                f"t. ! queue ! audioconvert ! audioresample ! {SINK} "
+                f"t. ! queue ! audioconvert ! wavescope shader=0 style=0 ! videoconvert ! "
+                f"fakesink sync=false "
+                f"t. ! queue ! appsink emit-signals=false drop=true max-buffers=1",
+                "samples"),
+        "ch12": (playbin, "frames"),
+        # practice/
+        "uri_src_test": (f"uridecodebin uri={mp4} ! {SINK}", "frames"),
+        "hls_test": (f"uridecodebin uri={mp4} ! {recorder_tail}", "frames"),
+        "hls_mp4": (f"uridecodebin uri={mp4} ! {recorder_tail}", "frames"),
+        "hls_test_1": (f"filesrc location={mp4_path} ! qtdemux ! h264parse ! avdec_h264 ! "
+                       f"{recorder_tail}", "frames"),
+        "slender": (f"videotestsrc num-buffers={FRAMES} ! videoconvert ! "
+                    f"x264enc tune=zerolatency ! {SINK}", "frames"),
+        "slave": (f"filesrc location={mp4_path} ! decodebin ! {SINK}", "frames"),
+    }
+
+
+def _rss_peak_bytes() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024   # Linux: KiB
+
+
+def _bench_sink(pipeline: Gst.Element) -> Gst.Element | None:
+    """측정할 싱크. playbin 은 video-sink 로 넘긴 싱크를 READY→PAUSED 에서야 playsink 안에
+    넣으므로 get_by_name 으로는 PLAYING 전에 찾을 수 없다 — 속성에서 직접 꺼낸다."""
+    if pipeline.find_property("video-sink") is not None:
+        return pipeline.get_property("video-sink")
+    return pipeline.get_by_name("bench_sink")
+
+
+def run_one(name: str) -> dict:
+    """현재 프로세스에서 토폴로지 하나를 EOS 까지 돌리고 측정한다."""
+    Gst.init(None)
+    description, unit = _topologies()[name]
+    pipeline = Gst.parse_launch(description)
+    sink = _bench_sink(pipeline)
+    if sink is None:
+        raise RuntimeError(f"{name}: no bench_sink in the pipeline")
+    counted = {"buffers": 0, "units": 0, "rate": 0}
+
+    def _count(pad, info):
+        buf = info.get_buffer()
+        counted["buffers"] += 1
+        if unit == "samples":
+            if not counted["rate"]:
+                caps = pad.get_current_caps()
+                counted["rate"] = caps.get_structure(0).get_int("rate")[1] if caps else 44100
+            counted["units"] += Gst.util_uint64_scale(buf.duration, counted["rate"], Gst.SECOND)
+        else:
+            counted["units"] += 1
+        return Gst.PadProbeReturn.OK
+
+    sink.get_static_pad("sink").add_probe(Gst.PadProbeType.BUFFER, _count)
+
+    bus = pipeline.get_bus()
+    ru0 = resource.getrusage(resource.RUSAGE_SELF)
+    t0 = time.monotonic()
+    if pipeline.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+        raise RuntimeError(f"{name}: unable to set PLAYING")
+
+    t_playing = None
+    while True:
+        msg = bus.timed_pop_filtered(
+            120 * Gst.SECOND,
+            Gst.MessageType.STATE_CHANGED | Gst.MessageType.ERROR | Gst.MessageType.EOS)
+        if msg is None:
+            raise RuntimeError(f"{name}: timed out")
+        if msg.type == Gst.MessageType.ERROR:
+            err, dbg = msg.parse_error()
+            pipeline.set_state(Gst.State.NULL)
+            raise RuntimeError(f"{name}: {err.message} ({dbg or 'none'})")
+        if msg.type == Gst.MessageType.EOS:
+            break
+        if msg.src == pipeline and msg.parse_state_changed()[1] == Gst.State.PLAYING:
+            t_playing = time.monotonic()
+
+    t_end = time.monotonic()
+    ru1 = resource.getrusage(resource.RUSAGE_SELF)
+    pipeline.set_state(Gst.State.NULL)
+
+    wall = t_end - (t_playing or t0)
+    cpu = (ru1.ru_utime - ru0.ru_utime) + (ru1.ru_stime - ru0.ru_stime)
+    return {
+        "name": name,
+        "unit": unit,
+        "throughput": counted["units"] / wall if wall > 0 else 0.0,   # frames/s 또는 samples/s
+        "buffers": counted["buffers"],
+        "cpu_percent": 100 * cpu / (t_end - t0),
+        "rss_peak_mb": _rss_peak_bytes() / 1e6,
+        "time_to_playing_ms": (t_playing - t0) * 1000 if t_playing else None,
+        "wall_s": t_end - t0,
+    }
+
+
+def run_isolated(name: str) -> dict:
+    """RSS 가 섞이지 않도록 항목마다 새 프로세스에서 실행"""
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-one", name],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"name": name, "error": proc.stderr.strip().splitlines()[-1:] or ["failed"]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# 클수록 좋은 지표는 감소가, 작을수록 좋은 지표는 증가가 회귀
+HIGHER_IS_BETTER = {"throughput"}
+LOWER_IS_BETTER = {"cpu_percent", "rss_peak_mb", "time_to_playing_ms"}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if not base or "error" in cur or "error" in base:
+            continue
+        for key in HIGHER_IS_BETTER | LOWER_IS_BETTER:
+            old, new = base.get(key), cur.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (key in HIGHER_IS_BETTER and change < -tolerance) or \
+               (key in LOWER_IS_BETTER and change > tolerance):
+                regressions.append(f"{name}.{key}: {old:.1f} → {new:.1f} ({change:+.1%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="headless benchmark of the tutorial pipelines")
+    parser.add_argument("names", nargs="*", help="subset to run (default: all)")
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--baseline", default="bench_baseline.json")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_one(args.run_one)))
+        return 0
+
+    Gst.init(None)
+    names = args.names or list(_topologies())   # 미디어 생성도 여기서 한 번
+    results = {}
+    for name in names:
+        r = run_isolated(name)
+        results[name] = r
+        if "error" in r:
+            print(f"{name:>14}: ERROR {r['error']}")
+        else:
+            print(f"{name:>14}: {r['throughput']:12.1f} {r['unit']}/s  cpu {r['cpu_percent']:6.1f} %  "
+                  f"rss {r['rss_peak_mb']:7.1f} MB  to PLAYING {r['time_to_playing_ms'] or 0:7.1f} ms")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+GStreamer 프로세스 부트스트랩 (워커를 많이 띄우는 supervisor 용)
+— 고정(pinned) 레지스트리 캐시: 한 번 데운 뒤 GST_REGISTRY_UPDATE=no 로 플러그인 재검사 생략
+— 파이프라인 spec 에 나온 요소 팩토리만 미리 로드
+— 무거운 파이썬 의존성(numpy, requests …)은 첫 속성 접근 때 import (importlib LazyLoader)
+— 단계별 import / init 시간 기록, spawn → PLAYING 비교
+
+    python bootstrap.py                              # 기본 spec 으로 default vs pinned 비교
+    python bootstrap.py --runs 10 "videotestsrc ! videoconvert ! fakesink"
+
+주의: 레지스트리 환경 변수는 Gst.init 전에 정해져야 하므로 bootstrap() 은
+      gi.repository.Gst 를 import 하는 다른 모듈보다 먼저 불러야 효과가 있다.
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+T0 = time.monotonic()
+
+REGISTRY_DIR = os.environ.get("GST_BOOTSTRAP_DIR", os.path.join(tempfile.gettempdir(), "gst-bootstrap"))
+DEFAULT_SPEC = "videotestsrc num-buffers=1 ! videoconvert ! videoscale ! fakesink name=sink"
+
+
+class Phases:
+    """단계 이름 → 소요 ms (이전 mark 이후). 기준점은 모듈 import 시점."""
+
+    def __init__(self) -> None:
+        self.items: list[tuple[str, float]] = []
+        self._last = T0
+
+    def mark(self, name: str) -> float:
+        now = time.monotonic()
+        self.items.append((name, (now - self._last) * 1000))
+        self._last = now
+        return now
+
+    def total_ms(self) -> float:
+        return sum(ms for _, ms in self.items)
+
+    def report(self) -> str:
+        lines = [f"{ms:9.2f} ms  {name}" for name, ms in self.items]
+        lines.append(f"{self.total_ms():9.2f} ms  total")
+        return "\n".join(lines)
+
+
+def lazy_import(name: str):
+    """
+    모듈을 지금 찾기만 하고 실제 실행은 첫 속성 접근 때 한다.
+    np = lazy_import("numpy") 처럼 모듈 전역에서 쓰면 된다. 설치돼 있지 않으면 ImportError.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# ---------- 레지스트리 ----------
+def _plugin_dirs() -> list[str]:
+    dirs = []
+    for var in ("GST_PLUGIN_PATH", "GST_PLUGIN_PATH_1_0", "GST_PLUGIN_SYSTEM_PATH",
+                "GST_PLUGIN_SYSTEM_PATH_1_0"):
+        dirs += [d for d in os.environ.get(var, "").split(os.pathsep) if d]
+    return dirs
+
+
+def registry_path() -> str:
+    """플러그인 경로 설정마다 별도 캐시 파일 (경로가 바뀌면 자동으로 새로 데운다)"""
+    key = hashlib.sha1(json.dumps([sys.executable, _plugin_dirs()]).encode()).hexdigest()[:12]
+    return os.path.join(REGISTRY_DIR, f"registry-{key}.bin")
+
+
+def pin_registry(path: str | None = None) -> bool:
+    """
+    Gst.init 전에 호출. 캐시가 있으면 재검사 없이 그대로 쓰고(True),
+    없으면 이번 init 에서 검사해 path 에 저장하게 둔다(False, 다음 프로세스부터 고정).
+    플러그인을 설치/업데이트한 뒤에는 캐시 파일을 지우거나 --rewarm.
+    """
+    path = path or registry_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.environ["GST_REGISTRY"] = path
+    os.environ.setdefault("GST_REGISTRY_FORK", "no")     # 검사 헬퍼 프로세스 생략
+    warm = os.path.exists(path)
+    os.environ["GST_REGISTRY_UPDATE"] = "no" if warm else "yes"
+    return warm
+
+
+def spec_factories(spec: str) -> list[str]:
+    """launch 문자열에서 요소 팩토리 이름만 뽑는다 (caps, 속성, 'name.' 참조 제외)."""
+    names = []
+    for segment in spec.replace("(", " ").replace(")", " ").split("!"):
+        for token in segment.split():
+            if "=" in token or "/" in token or token.endswith(".") or token.startswith(("\"", "'")):
+                continue
+            if token not in names:
+                names.append(token)
+            break
+    return names
+
+
+def preload(Gst, names, background: bool = False) -> threading.Thread | int:
+    """선언된 팩토리의 플러그인 .so 를 미리 로드. background=True 면 스레드로."""
+    def _load() -> int:
+        loaded = 0
+        for name in names:
+            factory = Gst.ElementFactory.find(name)
+            if factory and factory.load():
+                loaded += 1
+        return loaded
+
+    if background:
+        thread = threading.Thread(target=_load, name="gst-preload", daemon=True)
+        thread.start()
+        return thread
+    return _load()
+
+
+def bootstrap(spec: str | None = None, factories=(), pinned: bool = True,
+              phases: Phases | None = None):
+    """
+    import gi → require_version → Gst typelib → Gst.init → 선언 요소 로드 순서로 올리고
+    (Gst 모듈, Phases) 를 돌려준다.
+    """
+    phases = phases or Phases()
+    if pinned:
+        warm = pin_registry()
+        phases.mark(f"registry pin ({'warm' if warm else 'cold, writing cache'})")
+    import gi
+    phases.mark("import gi")
+    gi.require_version("Gst", "1.0")
+    from gi.repository import Gst
+    phases.mark("import Gst typelib")
+    Gst.init(None)
+    phases.mark("Gst.init (registry load)")
+    names = list(factories) + (spec_factories(spec) if spec else [])
+    if names:
+        n = preload(Gst, names)
+        phases.mark(f"preload {n}/{len(names)} factories")
+    return Gst, phases
+
+
+# ---------- spawn → PLAYING 비교 ----------
+def _child(mode: str, spec: str) -> dict:
+    phases = Phases()
+    if mode == "default":
+        # 기존 스크립트처럼: 무거운 의존성을 바로 import 하고 기본 레지스트리
+        for heavy in ("numpy", "requests"):
+            try:
+                __import__(heavy)
+            except ImportError:
+                pass
+        phases.mark("eager imports")
+        Gst, _ = bootstrap(pinned=False, phases=phases)
+    else:
+        for heavy in ("numpy", "requests"):
+            try:
+                lazy_import(heavy)
+            except ImportError:
+                pass
+        phases.mark("lazy imports")
+        Gst, _ = bootstrap(spec, pinned=True, phases=phases)
+
+    pipeline = Gst.parse_launch(spec)
+    phases.mark("parse_launch")
+    pipeline.set_state(Gst.State.PLAYING)
+    pipeline.get_state(Gst.CLOCK_TIME_NONE)
+    playing = phases.mark("PLAYING")
+    pipeline.set_state(Gst.State.NULL)
+    return {"playing_at": playing, "phases": phases.items}
+
+
+def compare(spec: str, runs: int) -> dict:
+    """모드마다 새 프로세스를 runs 번 띄워서 spawn → PLAYING 중앙값 비교"""
+    # pinned 캐시를 한 번 데워 둔다 (첫 실행은 검사 비용을 낸다)
+    subprocess.run([sys.executable, os.path.abspath(__file__), "--child", "pinned", spec],
+                   capture_output=True, check=True)
+    report = {}
+    for mode in ("default", "pinned"):
+        samples, phases = [], {}
+        for _ in range(runs):
+            spawned = time.monotonic()     # CLOCK_MONOTONIC 은 프로세스 간 공통
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, spec],
+                                 capture_output=True, text=True)
+            if out.returncode != 0:
+                raise RuntimeError(out.stderr)
+            child = json.loads(out.stdout.strip().splitlines()[-1])
+            samples.append((child["playing_at"] - spawned) * 1000)
+            for name, ms in child["phases"]:
+                phases.setdefault(name, []).append(ms)
+        report[mode] = {
+            "runs": runs,
+            "spawn_to_playing_ms_median": statistics.median(samples),
+            "spawn_to_playing_ms_min": min(samples),
+            "phases_ms_median": {name: statistics.median(v) for name, v in phases.items()},
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="pinned registry / lazy import bootstrap")
+    parser.add_argument("spec", nargs="?", default=DEFAULT_SPEC)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rewarm", action="store_true", help="drop the pinned registry cache first")
+    parser.add_argument("--child", choices=("default", "pinned"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_child(args.child, args.spec)))
+        sys.exit(0)
+
+    if args.rewarm and os.path.exists(registry_path()):
+        os.remove(registry_path())
+    report = compare(args.spec, args.runs)
+    for mode, r in report.items():
+        print(f"--- {mode}: spawn→PLAYING median {r['spawn_to_playing_ms_median']:.1f} ms "
+              f"(min {r['spawn_to_playing_ms_min']:.1f}) ---")
+        for name, ms in r["phases_ms_median"].items():
+            print(f"{ms:9.2f} ms  {name}")
+    saved = report["default"]["spawn_to_playing_ms_median"] - report["pinned"]["spawn_to_playing_ms_median"]
+    print(f"pinned bootstrap saves {saved:.1f} ms per worker spawn (median)")
+    sys.exit(0)
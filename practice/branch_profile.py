@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+tee 브랜치별 프로파일 (해상도 · framerate · 포맷)
+— 브랜치마다 videorate → videoscale → videoconvert → capsfilter 를 필요한 만큼만 삽입
+— 변환은 줄인 크기에서 한 번만, n-threads 는 코어 수 기준
+— 같은 포맷 · framerate 를 쓰는 소비자끼리는 변환 체인을 공유: 큰 해상도부터 작은 해상도로
+  스케일러를 이어 붙이고(캐스케이드), 소비자는 자기 해상도 단계의 tee 에서 갈라진다
+— 브랜치(= queue 스트리밍 스레드)별 CPU 사용량 측정
+"""
+import os
+import threading
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+
+def default_threads() -> int:
+    return os.cpu_count() or 1
+
+
+class BranchProfile:
+    """tee 브랜치 하나가 필요로 하는 영상 형태. None 인 항목은 원본 그대로."""
+
+    def __init__(self, name: str, width: int | None = None, height: int | None = None,
+                 fps: int | None = None, format: str | None = None,
+                 threads: int | None = None) -> None:
+        self.name = name
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.format = format
+        self.threads = threads or default_threads()
+
+    @property
+    def key(self) -> tuple:
+        return self.width, self.height, self.fps, self.format
+
+    @property
+    def family(self) -> tuple:
+        """해상도만 다른 프로파일끼리 같은 값 — 스케일 캐스케이드를 공유할 수 있다"""
+        return self.fps, self.format
+
+    @property
+    def area(self) -> float:
+        """정해지지 않은 축은 원본 크기(무한대)로 본다"""
+        return (self.width or float("inf")) * (self.height or float("inf"))
+
+    def caps_string(self) -> str:
+        fields = ["video/x-raw"]
+        if self.width:
+            fields.append(f"width={self.width}")
+        if self.height:
+            fields.append(f"height={self.height}")
+        if self.fps:
+            fields.append(f"framerate={self.fps}/1")
+        if self.format:
+            fields.append(f"format={self.format}")
+        return ",".join(fields)
+
+    def make_elements(self, prefix: str | None = None, rate: bool = True,
+                      convert: bool = True) -> list[Gst.Element]:
+        """
+        프레임 수 → 크기 → 포맷 순으로 줄여서 비싼 변환이 작은 프레임에서 돌게 한다.
+        rate/convert=False 는 캐스케이드 뒷단용 (앞 단계에서 이미 framerate · 포맷을 맞췄다).
+        """
+        prefix = prefix or self.name
+        elements = []
+        if self.fps and rate:
+            elements.append(Gst.ElementFactory.make("videorate", f"{prefix}_rate"))
+        if self.width or self.height:
+            scale = Gst.ElementFactory.make("videoscale", f"{prefix}_scale")
+            scale.set_property("n-threads", self.threads)
+            elements.append(scale)
+        if convert:
+            videoconvert = Gst.ElementFactory.make("videoconvert", f"{prefix}_convert")
+            videoconvert.set_property("n-threads", self.threads)
+            elements.append(videoconvert)
+        caps = Gst.ElementFactory.make("capsfilter", f"{prefix}_caps")
+        caps.set_property("caps", Gst.Caps.from_string(self.caps_string()))
+        elements.append(caps)
+
+        if not all(elements):
+            raise RuntimeError(f"Failed to create conversion elements for profile '{self.name}'")
+        return elements
+
+
+# 자주 쓰는 프로파일
+DISPLAY = BranchProfile("display", width=640, height=360, fps=15)
+ANALYTICS = BranchProfile("analytics", width=416, height=234, fps=5, format="RGB")
+RECORD = BranchProfile("record", format="I420")
+
+
+def link_many(*elements) -> bool:
+    for src, sink in zip(elements, elements[1:]):
+        if not src.link(sink):
+            print(f"link failed: {src.get_name()} → {sink.get_name()}")
+            return False
+    return True
+
+
+class BranchPlanner:
+    """
+    tee 뒤에 소비자들을 프로파일별로 붙인다.
+
+    포맷 · framerate(family)가 같은 소비자들은 해상도가 큰 것부터 작은 것 순으로
+      tee → queue → videorate → videoscale → videoconvert → caps(1280x720) → tee ─ queue → 소비자
+                                                                            └ queue → videoscale → caps(640x360) → …
+    처럼 framerate · 포맷 변환은 한 번, 스케일은 바로 앞 단계(가장 작은 충분한 해상도)에서 한다.
+    """
+
+    def __init__(self, pipeline: Gst.Pipeline, tee: Gst.Element) -> None:
+        self.pipeline = pipeline
+        self.tee = tee
+        self.consumers: dict[tuple, list[tuple[BranchProfile, list[Gst.Element]]]] = {}
+        # 브랜치 이름 → 스트리밍 스레드를 여는 queue. 캐스케이드 단계는 "<단계 이름>_stage"
+        self.queues: dict[str, Gst.Element] = {}
+
+    def add(self, profile: BranchProfile, *consumer: Gst.Element) -> None:
+        self.consumers.setdefault(profile.family, []).append((profile, list(consumer)))
+
+    def build(self) -> None:
+        for group in self.consumers.values():
+            # 해상도별 단계, 큰 것부터
+            stages: dict[tuple, list[tuple[BranchProfile, list[Gst.Element]]]] = {}
+            for profile, consumer in sorted(group, key=lambda pc: pc[0].area, reverse=True):
+                stages.setdefault(profile.key, []).append((profile, consumer))
+
+            upstream = self.tee
+            stage_list = list(stages.values())
+            for i, members in enumerate(stage_list):
+                head, _ = members[0]
+                name = "_".join(p.name for p, _ in members)
+                queue = Gst.ElementFactory.make("queue", f"{name}_queue")
+                chain = [queue] + head.make_elements(name, rate=i == 0, convert=i == 0)
+                self._add(chain)
+                self._link_request(upstream, queue)
+
+                last_stage = i == len(stage_list) - 1
+                if len(members) == 1 and last_stage:
+                    consumer = members[0][1]
+                    self._add(consumer)
+                    self._link(*chain, *consumer)
+                    self.queues[head.name] = queue        # 변환 + 소비자가 이 스레드
+                    break
+
+                split = Gst.ElementFactory.make("tee", f"{name}_tee")
+                self._add([split])
+                self._link(*chain, split)
+                # 이 단계의 videorate/videoscale/videoconvert 는 stage queue 스레드에서 돈다
+                self.queues[f"{name}_stage"] = queue
+                for profile, consumer in members:
+                    q = Gst.ElementFactory.make("queue", f"{profile.name}_out_queue")
+                    self._add([q, *consumer])
+                    self._link(split, q, *consumer)
+                    self.queues[profile.name] = q
+                upstream = split
+
+    @staticmethod
+    def _link(*elements) -> None:
+        if not link_many(*elements):
+            raise RuntimeError("Failed to link " + " -> ".join(e.get_name() for e in elements))
+
+    @staticmethod
+    def _link_request(tee: Gst.Element, queue: Gst.Element) -> None:
+        tee_pad = tee.request_pad_simple("src_%u")
+        if tee_pad is None or tee_pad.link(queue.get_static_pad("sink")) != Gst.PadLinkReturn.OK:
+            raise RuntimeError(f"Failed to link {tee.get_name()} -> {queue.get_name()}")
+
+    def _add(self, elements) -> None:
+        for e in elements:
+            if e.get_parent() is None:
+                self.pipeline.add(e)
+
+
+# ---------- 브랜치별 CPU ----------
+def _thread_cpu_seconds(tid: int) -> float | None:
+    """/proc/self/task/<tid>/stat 의 utime+stime (Linux 전용)"""
+    try:
+        with open(f"/proc/self/task/{tid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class BranchCpuMeter:
+    """
+    queue 의 src pad 는 자기 스트리밍 스레드에서 다음 queue 까지 전부 실행한다.
+    첫 버퍼에서 그 스레드 id 를 잡아두고, 이후에는 스레드 CPU 시간만 읽는다.
+    """
+
+    def __init__(self) -> None:
+        self.tids: dict[str, int] = {}
+        self._last: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def watch(self, name: str, queue: Gst.Element) -> None:
+        def _capture(_pad, _info):
+            with self._lock:
+                self.tids[name] = threading.get_native_id()
+            return Gst.PadProbeReturn.REMOVE
+
+        queue.get_static_pad("src").add_probe(Gst.PadProbeType.BUFFER, _capture)
+
+    def watch_planner(self, planner: BranchPlanner) -> None:
+        for name, queue in planner.queues.items():
+            self.watch(name, queue)
+
+    def sample(self) -> dict[str, float]:
+        """마지막 sample() 이후 브랜치별 CPU 사용률 (1.0 = 코어 하나)"""
+        now = time.monotonic()
+        usage = {}
+        with self._lock:
+            tids = dict(self.tids)
+        for name, tid in tids.items():
+            cpu = _thread_cpu_seconds(tid)
+            if cpu is None:
+                continue
+            last = self._last.get(name)
+            if last and now > last[0]:
+                usage[name] = (cpu - last[1]) / (now - last[0])
+            self._last[name] = (now, cpu)
+        return usage
+
+
+# ---------- 데모: 1080p 소스 하나 → 녹화 / 디스플레이 / 분석 ----------
+if __name__ == "__main__":
+    from gi.repository import GLib
+
+    Gst.init(None)
+    pipeline = Gst.Pipeline.new("branch-profile-demo")
+    src = Gst.parse_bin_from_description(
+        "videotestsrc is-live=true ! video/x-raw,width=1920,height=1080,framerate=30/1", True)
+    tee = Gst.ElementFactory.make("tee", "tee")
+    pipeline.add(src)
+    pipeline.add(tee)
+    src.link(tee)
+
+    planner = BranchPlanner(pipeline, tee)
+    planner.add(RECORD, Gst.ElementFactory.make("x264enc", "enc"),
+                Gst.ElementFactory.make("fakesink", "rec_sink"))
+    planner.add(DISPLAY, Gst.ElementFactory.make("fakesink", "display_sink"))
+    planner.add(ANALYTICS, Gst.ElementFactory.make("fakesink", "analytics_sink"))
+    # DISPLAY 와 같은 family → DISPLAY 단계(640x360) 뒤에서 한 번 더 줄인다
+    planner.add(BranchProfile("thumbnail", width=320, height=180, fps=15),
+                Gst.ElementFactory.make("fakesink", "thumbnail_sink"))
+    planner.build()
+
+    meter = BranchCpuMeter()
+    meter.watch_planner(planner)
+
+    def _report():
+        for name, cpu in sorted(meter.sample().items()):
+            print(f"{name:>10}: {cpu * 100:5.1f} % CPU")
+        return True
+
+    pipeline.set_state(Gst.State.PLAYING)
+    GLib.timeout_add_seconds(2, _report)
+    loop = GLib.MainLoop()
+    GLib.timeout_add_seconds(20, loop.quit)
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        pass
+    pipeline.set_state(Gst.State.NULL)
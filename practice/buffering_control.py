@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+playbin 버퍼링 제어 (히스테리시스)
+— ch12 처럼 BUFFERING 메시지마다 PAUSED/PLAYING 을 오가지 않고
+  재생 중엔 percent < low 일 때만 멈추고, 멈춘 뒤엔 percent >= high 이거나
+  parse_buffering_stats() 의 입력/출력 속도로 보아 끝까지 버틸 수 있을 때 재개
+— 평균 입력 속도가 재생 속도보다 느리면 buffer-duration 을 늘리고(최대 max_duration),
+  buffer-size 는 측정한 입력 속도 × buffer-duration 으로 맞추고,
+  느린 네트워크에서 재버퍼링이 반복되면 low 를 올린다
+— max_duration 으로도 모자라면(download=None) 현재 위치에서 다운로드 모드(디스크 버퍼)로 다시 연다
+— 재버퍼링 횟수, 총 정지 시간, 첫 재생까지 걸린 시간을 기록
+  (다운로드 모드로 다시 여는 시간은 정지 시간과 따로 reopen_s 로)
+
+    python buffering_control.py                     # 대역폭이 오르내리는 로컬 HTTP 서버로 ch12 방식과 비교
+    python buffering_control.py --rate 150000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gst, GLib
+
+import local_media
+
+PLAY_FLAG_DOWNLOAD = 1 << 7          # GstPlayFlags.DOWNLOAD (playbin 의 flags 는 Python 에 enum 이 없다)
+BUFFERING_ELEMENTS = ("queue2", "multiqueue", "downloadbuffer")
+
+
+class BufferingController:
+
+    def __init__(self, playbin: Gst.Element, low: int = 10, high: int = 100,
+                 min_duration: float = 2.0, max_duration: float = 30.0,
+                 download: bool | None = None, headroom: float = 1.2,
+                 min_size: int = 256 * 1024, max_size: int = 64 * 1024 * 1024) -> None:
+        """
+        low/high: 재생 중 멈출 / 멈춘 뒤 재개할 buffering percent
+        min_duration/max_duration: buffer-duration 조정 범위 (초)
+        download: 프로그레시브 다운로드(디스크 버퍼). True/False 는 처음부터 고정,
+            None 이면 max_duration 까지 늘려도 입력이 느릴 때 켠다 (READY 로 내렸다가 같은 위치로 seek)
+        headroom: 입력 속도가 출력 속도의 이 배수 이상이면 high 전이라도 재개
+        min_size/max_size: buffer-size 조정 범위 (바이트)
+        """
+        self.playbin = playbin
+        self.low = low
+        self.high = high
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        self.headroom = headroom
+        self.min_size = min_size
+        self.max_size = max_size
+        self.duration = min_duration
+        self.size: int | None = None      # None = playbin 기본값 (아직 입력 속도를 모름)
+        self.auto_download = download is None
+        self.download = bool(download)
+        self._resume_at: int | None = None
+        self._seeking = False
+        self.resume_target: int | None = None      # 다시 연 뒤 seek 한 위치 (ns)
+        self.resume_position: int | None = None    # 그 seek 가 끝난 뒤 실제 위치 (ns)
+        self.is_live = False
+
+        self.buffering = False
+        self.started = False             # 첫 재생 전엔 high 미만이면 바로 프리버퍼링
+        self.target = Gst.State.PLAYING   # 사용자가 원하는 상태 (pause()/play() 로 바꿈)
+        self.rebuffers = 0
+        self.stall_time = 0.0
+        self.reopen_time = 0.0
+        self.state_changes = 0
+        self.messages = 0
+        self.initial_buffering: float | None = None
+        self.last_stats: dict = {}
+        self._t_start = time.monotonic()
+        self._t_stall: float | None = None
+        self._t_reopen: float | None = None
+        self._elements: list[Gst.Element] = []
+
+        playbin.set_property("buffer-duration", int(self.duration * Gst.SECOND))
+        if self.download:
+            playbin.set_property("flags", playbin.get_property("flags") | PLAY_FLAG_DOWNLOAD)
+        playbin.connect("deep-element-added", self._on_element_added)
+
+    # ---------- 사용자 제어 ----------
+    def start(self) -> Gst.StateChangeReturn:
+        """
+        ch12 처럼 바로 PLAYING 으로 올린다. 버퍼링 메시지를 내지 않는 소스(로컬 파일)는 그대로 재생되고,
+        네트워크 소스는 첫 BUFFERING 메시지에서 PAUSED 로 내려 프리버퍼링한다.
+        """
+        self._t_start = time.monotonic()
+        ret = self.playbin.set_state(Gst.State.PLAYING)
+        if ret == Gst.StateChangeReturn.NO_PREROLL:
+            self.is_live = True
+        return ret
+
+    def play(self) -> None:
+        self.target = Gst.State.PLAYING
+        if not self.buffering:
+            self._set_state(Gst.State.PLAYING)
+
+    def pause(self) -> None:
+        self.target = Gst.State.PAUSED
+        self._set_state(Gst.State.PAUSED)
+
+    # ---------- 메시지 ----------
+    def handle(self, msg: Gst.Message) -> bool:
+        """BUFFERING 메시지를 처리하면 True. bus 'message' 핸들러에서 먼저 불러 주면 된다."""
+        if msg.type == Gst.MessageType.ASYNC_DONE and msg.src == self.playbin:
+            if self._resume_at is not None:
+                # 다운로드 모드로 다시 연 뒤 prerolled: 멈췄던 위치로
+                self.playbin.seek_simple(Gst.Format.TIME, Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT,
+                                         self._resume_at)
+                self.resume_target = self._resume_at
+                self._resume_at = None
+                self._seeking = True
+            elif self._seeking:
+                # 그 seek 의 ASYNC_DONE
+                self._seeking = False
+                ok, position = self.playbin.query_position(Gst.Format.TIME)
+                if ok:
+                    self.resume_position = position
+            return False
+        if msg.type != Gst.MessageType.BUFFERING or self.is_live:
+            return False
+        self.messages += 1
+        percent = msg.parse_buffering()
+        mode, avg_in, avg_out, left = msg.parse_buffering_stats()
+        self.last_stats = {"percent": percent, "mode": mode.value_nick, "avg_in": avg_in,
+                           "avg_out": avg_out, "left_ms": left}
+
+        if self.buffering:
+            if percent >= self.high or self._can_finish(avg_in, avg_out, left):
+                self.buffering = False
+                self._finish_stall()
+                if self.target == Gst.State.PLAYING:
+                    self._set_state(Gst.State.PLAYING)
+        elif not self.started:
+            if percent < self.high:
+                self.buffering = True
+                self._t_stall = self._t_start
+                self._set_state(Gst.State.PAUSED)
+            else:
+                self._finish_stall()
+        elif percent < self.low:
+            self.buffering = True
+            self.rebuffers += 1
+            self._t_stall = time.monotonic()
+            self._set_state(Gst.State.PAUSED)
+            self._adapt(avg_in, avg_out)
+        return True
+
+    def _can_finish(self, avg_in: int, avg_out: int, left_ms: int) -> bool:
+        """입력이 출력보다 충분히 빠르면(다운로드 모드면 남은 시간이 0) 기다릴 필요가 없다"""
+        if left_ms == 0:
+            return True
+        return avg_in > 0 and avg_out > 0 and avg_in >= avg_out * self.headroom
+
+    def _adapt(self, avg_in: int, avg_out: int) -> None:
+        if avg_in <= 0 or avg_out <= 0:
+            return
+        if avg_in < avg_out:
+            if self.auto_download and not self.download and self.duration >= self.max_duration:
+                self._enable_download()
+                return
+            # 재생 속도보다 느린 네트워크: 버퍼를 키우고, 재버퍼링이 잦으면 일찍 멈춘다
+            self.duration = min(self.max_duration, self.duration * 2)
+            self.low = min(50, self.low + 5)
+        # 바이트 한도가 먼저 차서 duration 만큼 못 모으는 일이 없도록 입력 속도에 맞춘다
+        self.size = max(self.min_size, min(self.max_size, int(avg_in * self.duration * self.headroom)))
+        self._apply_limits()
+
+    def _apply_limits(self) -> None:
+        ns = int(self.duration * Gst.SECOND)
+        self.playbin.set_property("buffer-duration", ns)
+        if self.size is not None:
+            self.playbin.set_property("buffer-size", self.size)
+        for e in self._elements:       # 이미 만들어진 버퍼링 요소에도 바로 반영
+            e.set_property("max-size-time", ns)
+            if self.size is not None:
+                e.set_property("max-size-bytes", self.size)
+
+    def _enable_download(self) -> None:
+        """
+        flags 는 READY 에서만 바뀐다: 위치를 기억하고 다시 열어서 ASYNC_DONE 때 그 위치로 seek.
+        지금까지의 정지는 여기서 끊고, 다시 재생될 때까지는 reopen_time 으로 잰다.
+        """
+        ok, position = self.playbin.query_position(Gst.Format.TIME)
+        now = time.monotonic()
+        if self._t_stall is not None:
+            self.stall_time += now - self._t_stall
+            self._t_stall = None
+        self._t_reopen = now
+        self.download = True
+        self._elements.clear()
+        self._resume_at = position if ok and position > 0 else None
+        self.playbin.set_state(Gst.State.READY)
+        self.playbin.set_property("flags", self.playbin.get_property("flags") | PLAY_FLAG_DOWNLOAD)
+        self._set_state(Gst.State.PAUSED)
+
+    def _on_element_added(self, _bin, _sub, element) -> None:
+        factory = element.get_factory()
+        if factory and factory.get_name() in BUFFERING_ELEMENTS \
+                and element.find_property("use-buffering") and element.get_property("use-buffering"):
+            self._elements.append(element)
+
+    def _finish_stall(self) -> None:
+        if not self.started:
+            self.started = True
+            self.initial_buffering = time.monotonic() - self._t_start
+        elif self._t_stall is not None:
+            self.stall_time += time.monotonic() - self._t_stall
+        if self._t_reopen is not None:
+            self.reopen_time += time.monotonic() - self._t_reopen
+        self._t_stall = None
+        self._t_reopen = None
+
+    def _set_state(self, state: Gst.State) -> None:
+        self.state_changes += 1
+        self.playbin.set_state(state)
+
+    def stats(self) -> dict:
+        stall = self.stall_time
+        if self._t_stall is not None and self.started:
+            stall += time.monotonic() - self._t_stall
+        reopen = self.reopen_time
+        if self._t_reopen is not None:
+            reopen += time.monotonic() - self._t_reopen
+        return {
+            "rebuffers": self.rebuffers,
+            "stall_time_s": round(stall, 3),
+            "initial_buffering_s": round(self.initial_buffering or 0.0, 3),
+            "state_changes": self.state_changes,
+            "buffering_messages": self.messages,
+            "low": self.low,
+            "buffer_duration_s": self.duration,
+            "buffer_size_bytes": self.size,
+            "download": self.download,
+            "reopen_s": round(reopen, 3),
+            "resume_target_s": None if self.resume_target is None else self.resume_target / Gst.SECOND,
+            "resume_position_s": None if self.resume_position is None else self.resume_position / Gst.SECOND,
+            **self.last_stats,
+        }
+
+
+class NaiveBuffering(BufferingController):
+    """비교용: ch12/ch12.py 의 cb_message 그대로 (percent < 100 이면 PAUSED, 100 이면 PLAYING)"""
+
+    def handle(self, msg: Gst.Message) -> bool:
+        if msg.type != Gst.MessageType.BUFFERING or self.is_live:
+            return False
+        self.messages += 1
+        percent = msg.parse_buffering()
+        if percent < 100:
+            if not self.buffering:
+                self.buffering = True
+                if self.started:
+                    self.rebuffers += 1
+                    self._t_stall = time.monotonic()
+            self._set_state(Gst.State.PAUSED)
+        else:
+            if self.buffering or not self.started:
+                self.buffering = False
+                self._finish_stall()
+            self._set_state(Gst.State.PLAYING)
+        return True
+
+
+def run_once(uri: str, controller_cls=BufferingController, timeout: float = 120, **kwargs) -> dict:
+    """uri 를 playbin(fakesink sync=true)으로 끝까지 재생하고 컨트롤러 통계를 돌려준다."""
+    Gst.init(None)
+    playbin = Gst.ElementFactory.make("playbin", None)
+    playbin.set_property("uri", uri)
+    playbin.set_property("video-sink", Gst.ElementFactory.make("fakesink", None))
+    playbin.set_property("audio-sink", Gst.ElementFactory.make("fakesink", None))
+    controller = controller_cls(playbin, **kwargs)
+    loop = GLib.MainLoop()
+    error = []
+
+    def on_message(_bus, msg):
+        if controller.handle(msg):
+            return
+        if msg.type == Gst.MessageType.ERROR:
+            err, _dbg = msg.parse_error()
+            error.append(err.message)
+            loop.quit()
+        elif msg.type == Gst.MessageType.EOS:
+            loop.quit()
+
+    bus = playbin.get_bus()
+    bus.add_signal_watch()
+    bus.connect("message", on_message)
+    t0 = time.monotonic()
+    controller.start()
+    GLib.timeout_add_seconds(int(timeout), loop.quit)
+    loop.run()
+    playbin.set_state(Gst.State.NULL)
+    bus.remove_signal_watch()
+    result = {"wall_s": round(time.monotonic() - t0, 3), **controller.stats()}
+    if error:
+        result["error"] = error[0]
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="hysteresis buffering vs ch12 buffering")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="fixed bytes/s (default: alternate fast/slow every 3 s)")
+    parser.add_argument("--seconds", type=int, default=20, help="clip length")
+    args = parser.parse_args()
+
+    Gst.init(None)
+    clip = local_media.webm_clip(seconds=args.seconds)
+    if args.rate:
+        profile = None
+    else:
+        # 재생 비트레이트 근처에서 빠름/느림이 번갈아 오는 네트워크
+        bitrate = os.path.getsize(clip) / args.seconds
+        profile = [(3, bitrate * 2.0), (3, bitrate * 0.6)] * 20
+
+    report = {}
+    for name, cls in (("ch12", NaiveBuffering), ("hysteresis", BufferingController)):
+        server = local_media.ThrottledHTTPServer(rate=args.rate or 0, profile=profile).start()
+        report[name] = run_once(server.url(clip), cls)
+        server.stop()
+    print(json.dumps(report, indent=2))
+    sys.exit(0)
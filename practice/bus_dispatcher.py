@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+asyncio 통합 버스 디스패처
+— 파이프라인마다 bus 의 poll fd 를 asyncio 에 reader 로 등록 → 스레드도, 폴링 타이머도 없음
+— Gst.MessageType 별로 파싱된 인자를 받는 핸들러 등록
+— await handle.wait_for(Gst.MessageType.EOS | Gst.MessageType.ERROR)
+— 튜토리얼 스크립트는 wait_until(pipeline, mask, handlers) 로 timed_pop_filtered 루프 대신 (ch1~ch7)
+— PyGObject 3.50+ 가 있으면 GLib 메인 컨텍스트 위에서 asyncio 를 돌려
+  GLib.timeout_add / idle_add 를 쓰는 다른 모듈과도 한 루프로 동작
+
+주의: 같은 bus 에 add_signal_watch() 를 함께 쓰면 메시지를 서로 빼앗는다.
+
+    python bus_dispatcher.py 200     # videotestsrc 파이프라인 200 개를 한 프로세스에서
+"""
+import asyncio
+import sys
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+# 메시지 타입별 파서 → 핸들러는 handler(msg, *parsed) 로 불린다
+PARSERS = {
+    Gst.MessageType.ERROR: lambda m: m.parse_error(),                 # (GError, debug)
+    Gst.MessageType.WARNING: lambda m: m.parse_warning(),             # (GError, debug)
+    Gst.MessageType.STATE_CHANGED: lambda m: m.parse_state_changed(), # (old, new, pending)
+    Gst.MessageType.BUFFERING: lambda m: (m.parse_buffering(),),      # (percent,)
+    Gst.MessageType.TAG: lambda m: (m.parse_tag(),),                  # (Gst.TagList,)
+    Gst.MessageType.QOS: lambda m: m.parse_qos_stats(),               # (format, processed, dropped)
+    Gst.MessageType.ELEMENT: lambda m: (m.get_structure(),),
+    Gst.MessageType.APPLICATION: lambda m: (m.get_structure(),),
+}
+
+
+def install_glib_policy() -> bool:
+    """가능하면 asyncio 를 GLib 메인 컨텍스트 위에서 돌린다 (PyGObject 3.50+)."""
+    try:
+        from gi.events import GLibEventLoopPolicy
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(GLibEventLoopPolicy())
+    return True
+
+
+class PipelineHandle:
+    """
+    파이프라인 하나의 bus 구독. 파이프라인 메서드는 그대로 위임되므로
+    handle.set_state(...) 처럼 파이프라인처럼 써도 된다.
+    """
+
+    def __init__(self, dispatcher: "BusDispatcher", pipeline: Gst.Pipeline) -> None:
+        self.pipeline = pipeline
+        self.bus = pipeline.get_bus()
+        self.handlers: dict[Gst.MessageType, list] = {}
+        self._waiters: list[tuple[Gst.MessageType, asyncio.Future]] = []
+        self._dispatcher = dispatcher
+        self.fd = self.bus.get_pollfd().fd
+
+    def __getattr__(self, name):
+        return getattr(self.pipeline, name)
+
+    def on(self, mtype: Gst.MessageType, handler) -> "PipelineHandle":
+        self.handlers.setdefault(mtype, []).append(handler)
+        return self
+
+    def wait_for(self, mask: Gst.MessageType) -> asyncio.Future:
+        """mask 에 해당하는 다음 메시지로 완료되는 Future"""
+        future = self._dispatcher.loop.create_future()
+        self._waiters.append((mask, future))
+        return future
+
+    async def play_until_done(self) -> Gst.Message:
+        """PLAYING 으로 올리고 EOS/ERROR 까지 기다린 뒤 NULL 로 내린다."""
+        if self.pipeline.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+            raise RuntimeError(f"{self.pipeline.get_name()}: unable to set PLAYING")
+        try:
+            return await self.wait_for(Gst.MessageType.EOS | Gst.MessageType.ERROR)
+        finally:
+            self.pipeline.set_state(Gst.State.NULL)
+
+    def _dispatch(self, msg: Gst.Message) -> None:
+        handlers = self.handlers.get(msg.type)
+        if handlers:
+            parse = PARSERS.get(msg.type)
+            args = parse(msg) if parse else ()
+            for handler in handlers:
+                handler(msg, *args)
+        if self._waiters:
+            remaining = []
+            for mask, future in self._waiters:
+                if future.done():
+                    continue
+                if msg.type & mask:
+                    future.set_result(msg)
+                else:
+                    remaining.append((mask, future))
+            self._waiters = remaining
+
+    def close(self) -> None:
+        self._dispatcher.unwatch(self)
+
+
+class BusDispatcher:
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        Gst.init(None)
+        self.loop = loop or asyncio.get_running_loop()
+        self.handles: dict[int, PipelineHandle] = {}
+
+    def watch(self, pipeline: Gst.Pipeline) -> PipelineHandle:
+        handle = PipelineHandle(self, pipeline)
+        self.handles[handle.fd] = handle
+        # fd 는 bus 에 메시지가 있는 동안 읽기 가능 상태다. 읽지 말고 pop() 으로 비운다.
+        self.loop.add_reader(handle.fd, self._drain, handle)
+        return handle
+
+    def unwatch(self, handle: PipelineHandle) -> None:
+        if self.handles.pop(handle.fd, None) is not None:
+            self.loop.remove_reader(handle.fd)
+            for _, future in handle._waiters:
+                future.cancel()
+            handle._waiters = []
+
+    @staticmethod
+    def _drain(handle: PipelineHandle) -> None:
+        while True:
+            msg = handle.bus.pop()
+            if msg is None:
+                break
+            handle._dispatch(msg)
+
+
+def run(main) -> object:
+    """GLib 정책이 가능하면 설치하고 asyncio.run(main())"""
+    install_glib_policy()
+    return asyncio.run(main())
+
+
+def wait_until(pipeline: Gst.Pipeline, mask: Gst.MessageType = Gst.MessageType.EOS | Gst.MessageType.ERROR,
+               handlers: dict | None = None) -> Gst.Message:
+    """
+    스크립트용 동기 버전 — bus.timed_pop_filtered(CLOCK_TIME_NONE, mask) 대신.
+    handlers={Gst.MessageType.STATE_CHANGED: fn, …} 는 기다리는 동안 on() 으로 불린다.
+    """
+    async def _main():
+        handle = BusDispatcher().watch(pipeline)
+        for mtype, handler in (handlers or {}).items():
+            handle.on(mtype, handler)
+        try:
+            return await handle.wait_for(mask)
+        finally:
+            handle.close()
+
+    return run(_main)
+
+
+# ---------- 데모: 파이프라인 N 개를 스레드 없이 ----------
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    async def main():
+        dispatcher = BusDispatcher(asyncio.get_running_loop())
+        handles = []
+        for i in range(n):
+            pipeline = Gst.parse_launch(
+                f"videotestsrc num-buffers={30 + i % 30} ! video/x-raw,width=160,height=120 ! "
+                f"fakesink sync=false")
+            pipeline.set_name(f"p{i}")
+            handle = dispatcher.watch(pipeline)
+            handle.on(Gst.MessageType.ERROR,
+                      lambda msg, err, dbg: print(f"{msg.src.get_name()}: {err.message}"))
+            handles.append(handle)
+
+        results = await asyncio.gather(*(h.play_until_done() for h in handles))
+        eos = sum(1 for m in results if m.type == Gst.MessageType.EOS)
+        print(f"{eos}/{n} pipelines reached EOS")
+        for h in handles:
+            h.close()
+
+    run(main)
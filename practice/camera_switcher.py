@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+대기 입력을 미리 띄워 두고 카메라를 즉시 전환
+— 지금은 cctvurl 을 바꿀 때마다 파이프라인을 새로 만들어 몇 초씩 걸린다
+— 대기 카메라는 디코딩하지 않는다: urisourcebin ! parsebin ! appsink (인코딩된 채로 받기만)
+  마지막 키프레임부터의 GOP 를 메모리에 들고 있다
+— 화면 쪽은 appsrc ! decodebin3 ! 싱크 하나 (input-selector 대신 appsrc 가 선택기 역할)
+  전환 = 새 카메라의 캐시된 GOP 를 밀어 넣고 이후 라이브 버퍼를 이어 붙임
+  캐시의 마지막 프레임이 '지금' 이 되도록 타임스탬프를 옮기므로, 앞 프레임들은 디코딩만 되고 늦어서 버려진다
+  → 다음 키프레임을 기다리지 않는다 (전환 지연 ≈ GOP 한 개 디코딩 시간)
+— 전환 요청 → 새 카메라 프레임이 싱크에 도착할 때까지 지연 기록 (대기 중이었는지 따로)
+— 대기 입력은 budget 개까지, 넘치면 가장 오래 안 본 것부터 내림 (LRU)
+
+    python camera_switcher.py uri1 uri2 uri3 …
+    python camera_switcher.py                  # 생성한 클립으로: 재구성 vs 대기 전환 비교
+"""
+import argparse
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gst, GLib
+
+
+class _Standby:
+    """인코딩된 채로 받아 GOP 만 들고 있는 카메라 입력"""
+
+    def __init__(self, uri: str, on_sample, on_error) -> None:
+        self.uri = uri
+        self.gop: list[Gst.Buffer] = []          # 마지막 키프레임부터 (clock time 으로 바꾼 pts 와 함께)
+        self.gop_times: list[int] = []
+        self.gop_bytes = 0
+        self.caps: Gst.Caps | None = None
+        self.frames = 0
+        self.failed = False
+
+        self.pipeline = Gst.Pipeline.new(None)
+        src = Gst.ElementFactory.make("urisourcebin", None)
+        src.set_property("uri", uri)
+        self.parse = Gst.ElementFactory.make("parsebin", None)
+        self.appsink = Gst.ElementFactory.make("appsink", None)
+        self.appsink.set_property("sync", True)          # 파일 입력도 실시간 속도로
+        self.appsink.set_property("emit-signals", True)
+        self.appsink.set_property("max-buffers", 4)
+        for e in (src, self.parse, self.appsink):
+            self.pipeline.add(e)
+        src.connect("pad-added", lambda _s, pad: pad.link(self.parse.get_static_pad("sink")))
+        self.parse.connect("pad-added", self._on_parsed_pad)
+        self.appsink.connect("new-sample", on_sample, self)
+        bus = self.pipeline.get_bus()
+        bus.add_signal_watch()
+        bus.connect("message::error", on_error, self)
+
+    def _on_parsed_pad(self, _parse, pad) -> None:
+        caps = pad.get_current_caps() or pad.query_caps(None)
+        if caps.get_structure(0).get_name().startswith("video/") \
+                and not self.appsink.get_static_pad("sink").is_linked():
+            pad.link(self.appsink.get_static_pad("sink"))
+            return
+        sink = Gst.ElementFactory.make("fakesink", None)
+        sink.set_property("async", False)
+        self.pipeline.add(sink)
+        sink.sync_state_with_parent()
+        pad.link(sink.get_static_pad("sink"))
+
+    def start(self) -> None:
+        if self.pipeline.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+            self.failed = True
+
+    def stop(self) -> None:
+        self.pipeline.set_state(Gst.State.NULL)
+        self.pipeline.get_bus().remove_signal_watch()
+
+
+class CameraSwitcher:
+
+    def __init__(self, budget: int = 4, gop_limit: int = 8 * 1024 * 1024,
+                 sink: Gst.Element | None = None) -> None:
+        """
+        budget: 동시에 띄워 둘 카메라 수 (보고 있는 것 포함)
+        gop_limit: 카메라당 GOP 캐시 상한(바이트). 넘으면 다음 키프레임까지 캐시하지 않는다.
+        """
+        self.budget = max(1, budget)
+        self.gop_limit = gop_limit
+        self.standby: OrderedDict[str, _Standby] = OrderedDict()   # 앞쪽 = 오래 안 본 것
+        self.active: _Standby | None = None
+        self.evictions = 0
+        self.latencies: list[tuple[bool, float]] = []              # (대기 중이었나, 초)
+        self._lock = threading.Lock()
+        self._offset = 0           # 활성 카메라 clock time → 화면 running time
+        self._pending: tuple[float, int, bool] | None = None       # (요청 시각, 목표 pts, warm)
+
+        self.pipeline = Gst.Pipeline.new("switcher")
+        self.appsrc = Gst.ElementFactory.make("appsrc", None)
+        self.appsrc.set_property("format", Gst.Format.TIME)
+        self.appsrc.set_property("is-live", True)
+        self.appsrc.set_property("do-timestamp", False)
+        decode = Gst.ElementFactory.make("decodebin3", None)
+        self.convert = Gst.ElementFactory.make("videoconvert", None)
+        self.sink = sink or Gst.ElementFactory.make("autovideosink", None)
+        for e in (self.appsrc, decode, self.convert, self.sink):
+            self.pipeline.add(e)
+        self.appsrc.link(decode)
+        decode.connect("pad-added", self._on_decoded_pad)
+        self.convert.link(self.sink)
+        self.convert.get_static_pad("src").add_probe(Gst.PadProbeType.BUFFER, self._on_display)
+
+    def _on_decoded_pad(self, _decode, pad) -> None:
+        sink_pad = self.convert.get_static_pad("sink")
+        if pad.query_caps(None).get_structure(0).get_name().startswith("video/") \
+                and not sink_pad.is_linked():
+            pad.link(sink_pad)
+
+    # ---------- 대기 입력 ----------
+    def prepare(self, uri: str) -> _Standby:
+        """uri 를 대기 상태로 (이미 있으면 그대로). budget 을 넘으면 LRU 를 내린다."""
+        cam = self._standby(uri)
+        self._evict(keep=cam)
+        return cam
+
+    def _standby(self, uri: str) -> _Standby:
+        cam = self.standby.get(uri)
+        if cam is None:
+            cam = _Standby(uri, self._on_sample, self._on_standby_error)
+            self.standby[uri] = cam
+            cam.start()
+        self.standby.move_to_end(uri)
+        return cam
+
+    def _evict(self, keep: _Standby | None = None) -> None:
+        while len(self.standby) > self.budget:
+            uri = next((u for u, c in self.standby.items() if c is not self.active and c is not keep), None)
+            if uri is None:
+                return
+            self.standby.pop(uri).stop()
+            self.evictions += 1
+
+    def _on_standby_error(self, _bus, msg, cam: _Standby) -> None:
+        print(f"{cam.uri}: {msg.parse_error()[0].message}")
+        cam.failed = True
+        if self.standby.get(cam.uri) is cam and cam is not self.active:
+            self.standby.pop(cam.uri).stop()     # 다음 switch 때 새로 띄운다
+
+    def _on_sample(self, appsink, cam: _Standby):
+        # 스트리밍 스레드 (카메라마다)
+        sample = appsink.emit("pull-sample")
+        if sample is None:
+            return Gst.FlowReturn.EOS
+        buf = sample.get_buffer()
+        if buf.pts == Gst.CLOCK_TIME_NONE:
+            return Gst.FlowReturn.OK
+        running = sample.get_segment().to_running_time(Gst.Format.TIME, buf.pts)
+        clock_time = cam.pipeline.get_base_time() + running
+        with self._lock:
+            cam.frames += 1
+            cam.caps = sample.get_caps()
+            keyframe = not buf.has_flags(Gst.BufferFlags.DELTA_UNIT)
+            if keyframe:
+                cam.gop, cam.gop_times, cam.gop_bytes = [], [], 0
+            if (keyframe or cam.gop) and cam.gop_bytes + buf.get_size() <= self.gop_limit:
+                cam.gop.append(buf)
+                cam.gop_times.append(clock_time)
+                cam.gop_bytes += buf.get_size()
+            elif cam.gop:
+                cam.gop, cam.gop_times, cam.gop_bytes = [], [], 0   # 너무 큰 GOP → 다음 키프레임까지 포기
+            if cam is self.active:
+                if self._pending is not None and self._pending[1] < 0:
+                    self._retarget(cam, clock_time)                  # 캐시 없이 전환했으면 첫 키프레임부터
+                if self._pending is None or self._pending[1] >= 0:
+                    self._push(buf, clock_time)
+        return Gst.FlowReturn.OK
+
+    # ---------- 전환 ----------
+    def switch(self, uri: str) -> bool:
+        """uri 로 화면 전환. 메인 루프 스레드에서 호출."""
+        if uri in self.standby and self.standby[uri].failed:
+            self.standby.pop(uri).stop()
+        warm = uri in self.standby
+        cam = self._standby(uri)
+        started = time.monotonic()
+        with self._lock:
+            self.active = cam
+            if cam.gop:
+                clock = self.pipeline.get_clock() or Gst.SystemClock.obtain()
+                self._offset = clock.get_time() - cam.gop_times[-1]
+                self.appsrc.set_caps(cam.caps)
+                self._pending = (started, self._display_pts(cam.gop_times[-1]), warm)
+                for buf, t in zip(cam.gop, cam.gop_times):
+                    self._push(buf, t)
+            else:
+                self._pending = (started, -1, warm)        # 키프레임이 올 때까지 기다림
+        self._evict()
+        return True
+
+    def _retarget(self, cam: _Standby, clock_time: int) -> None:
+        if cam.gop and cam.gop_times[0] == clock_time:        # 방금 키프레임
+            self._offset = 0
+            self.appsrc.set_caps(cam.caps)
+            self._pending = (self._pending[0], self._display_pts(clock_time), self._pending[2])
+
+    def _display_pts(self, clock_time: int) -> int:
+        return max(0, clock_time + self._offset - self.pipeline.get_base_time())
+
+    def _push(self, buf: Gst.Buffer, clock_time: int) -> None:
+        out = buf.copy()                  # 메모리는 공유, 메타데이터만 새로
+        out.pts = self._display_pts(clock_time)
+        if buf.dts != Gst.CLOCK_TIME_NONE:
+            out.dts = max(0, buf.dts + out.pts - buf.pts)
+        self.appsrc.emit("push-buffer", out)
+
+    def _on_display(self, _pad, info):
+        with self._lock:
+            pending = self._pending
+            if pending is not None and pending[1] >= 0 and info.get_buffer().pts >= pending[1]:
+                self.latencies.append((pending[2], time.monotonic() - pending[0]))
+                self._pending = None
+        return Gst.PadProbeReturn.OK
+
+    # ---------- 실행 ----------
+    def start(self) -> None:
+        if self.pipeline.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+            raise RuntimeError("Unable to set the pipeline to the playing state.")
+
+    def stop(self) -> None:
+        self.pipeline.set_state(Gst.State.NULL)
+        self.active = None
+        for cam in self.standby.values():
+            cam.stop()
+        self.standby.clear()
+
+    def stats(self) -> dict:
+        report = {"standby": len(self.standby), "evictions": self.evictions,
+                  "gop_cache_mb": sum(c.gop_bytes for c in self.standby.values()) / 1e6}
+        for name, want in (("warm", True), ("cold", False)):
+            values = sorted(s for w, s in self.latencies if w == want)
+            if values:
+                report[f"{name}_switches"] = len(values)
+                report[f"{name}_p50_ms"] = values[len(values) // 2] * 1000
+                report[f"{name}_max_ms"] = values[-1] * 1000
+        return report
+
+
+# ---------- 비교: 지금 방식 (매번 새 파이프라인) ----------
+def rebuild_latency(uri: str, timeout: float = 30.0) -> float:
+    """playbin 을 새로 만들어 uri 의 첫 프레임이 싱크에 올 때까지 (초)"""
+    t0 = time.monotonic()
+    playbin = Gst.ElementFactory.make("playbin", None)
+    playbin.set_property("uri", uri)
+    sink = Gst.ElementFactory.make("fakesink", None)
+    sink.set_property("sync", True)
+    playbin.set_property("video-sink", sink)
+    playbin.set_property("audio-sink", Gst.ElementFactory.make("fakesink", None))
+    first = threading.Event()
+    sink.get_static_pad("sink").add_probe(Gst.PadProbeType.BUFFER,
+                                          lambda *_: (first.set(), Gst.PadProbeReturn.REMOVE)[1])
+    playbin.set_state(Gst.State.PLAYING)
+    first.wait(timeout)
+    elapsed = time.monotonic() - t0
+    playbin.set_state(Gst.State.NULL)
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="instant camera switching with prerolled standby inputs")
+    parser.add_argument("uris", nargs="*")
+    parser.add_argument("--budget", type=int, default=3)
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between switches")
+    parser.add_argument("--switches", type=int, default=20)
+    args = parser.parse_args()
+
+    Gst.init(None)
+    uris = args.uris
+    if not uris:
+        import local_media
+        # 2 초 GOP 의 카메라 대역 4 개 (budget 3 → 하나는 늘 내려가 있다가 cold 로 전환)
+        uris = [local_media.file_uri(local_media.mp4_clip(seconds=120, width=1280, height=720, fps=30,
+                                                          gop=60, name=f"cam{i}-720p-gop60.mp4"))
+                for i in range(4)]
+
+    rebuild = sorted(rebuild_latency(u) for u in uris)
+    switcher = CameraSwitcher(args.budget)
+    for uri in uris[:args.budget]:
+        switcher.prepare(uri)
+    switcher.start()
+    switcher.switch(uris[0])
+    loop = GLib.MainLoop()
+    state = {"n": 0}
+
+    def next_switch():
+        state["n"] += 1
+        if state["n"] > args.switches:
+            loop.quit()
+            return False
+        switcher.switch(uris[state["n"] % len(uris)])
+        return True
+
+    GLib.timeout_add(int(args.interval * 1000), next_switch)
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        pass
+    s = switcher.stats()
+    switcher.stop()
+    print(f"rebuild playbin: p50 {rebuild[len(rebuild) // 2] * 1000:.0f} ms, max {rebuild[-1] * 1000:.0f} ms")
+    print(f"switcher: {s}")
+    sys.exit(0)
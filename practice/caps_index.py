@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+caps 로 요소 팩토리를 찾는 인덱스
+— ch6 처럼 팩토리마다 get_static_pad_templates() 를 훑는 일을 한 번만 하고
+  미디어 타입(+ caps features) → (팩토리, rank, 방향, presence) 로 저장
+— JSON 으로 저장하고, 플러그인 목록(파일, mtime, 버전)이 바뀌면 다시 만든다
+— 질의는 집합 교집합 + 결과 캐시라 pad-added 핸들러 안에서 써도 된다
+
+    python caps_index.py video/x-h264 video/x-raw    # 변환 요소 후보
+    python caps_index.py --bench
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+INDEX_PATH = os.environ.get("GST_CAPS_INDEX",
+                            os.path.join(tempfile.gettempdir(), "gst-caps-index.json"))
+ANY = "ANY"                          # caps 가 ANY 인 템플릿 (queue, tee, identity …)
+SYSTEM_MEMORY = "memory:SystemMemory"
+
+
+@dataclass(frozen=True)
+class PadEntry:
+    factory: str
+    rank: int
+    direction: int          # Gst.PadDirection 값
+    presence: int           # Gst.PadPresence 값
+    template: str           # name_template ("sink", "src_%u" …)
+    media_type: str         # 구조체 이름 ("video/x-raw" …), caps 가 ANY 면 ANY
+    features: str           # caps features ("memory:SystemMemory", "memory:GLMemory" …)
+    caps: str               # 이 구조체 하나만 직렬화한 caps (정밀 검사용)
+
+
+def _plugin_fingerprint() -> str:
+    """레지스트리의 플러그인 구성이 바뀌면 달라지는 값"""
+    items = []
+    for plugin in Gst.Registry.get().get_plugin_list():
+        filename = plugin.get_filename() or ""
+        try:
+            mtime = os.stat(filename).st_mtime_ns if filename else 0
+        except OSError:
+            mtime = 0
+        items.append((plugin.get_name(), filename, plugin.get_version(), mtime))
+    items.sort()
+    return hashlib.sha1(json.dumps(items).encode()).hexdigest()
+
+
+class CapsIndex:
+
+    def __init__(self, entries: list[PadEntry], klass: dict[str, str], fingerprint: str) -> None:
+        self.entries = entries
+        self.klass = klass                     # 팩토리 → klass ("Codec/Decoder/Video" …)
+        self.fingerprint = fingerprint
+        self.rank = {e.factory: e.rank for e in entries}
+        # (방향, 미디어 타입) → 팩토리 집합
+        self._by_type: dict[tuple[int, str], set[str]] = {}
+        self._by_factory: dict[tuple[str, int], list[PadEntry]] = {}
+        # 팩토리 → sink 템플릿 caps (불러올 때 한 번만 파싱, None = ANY)
+        self._sink_caps: dict[str, list[Gst.Caps | None]] = {}
+        sink = int(Gst.PadDirection.SINK)
+        for e in entries:
+            self._by_type.setdefault((e.direction, e.media_type), set()).add(e.factory)
+            self._by_factory.setdefault((e.factory, e.direction), []).append(e)
+            if e.direction == sink:
+                self._sink_caps.setdefault(e.factory, []).append(
+                    None if e.caps == ANY else Gst.Caps.from_string(e.caps))
+        self._cache: dict[tuple, list[str]] = {}
+
+    # ---------- 만들기 / 저장 / 불러오기 ----------
+    @classmethod
+    def build(cls) -> "CapsIndex":
+        entries, klass = [], {}
+        registry = Gst.Registry.get()
+        for factory in registry.get_feature_list(Gst.ElementFactory):
+            name = factory.get_name()
+            rank = factory.get_rank()
+            klass[name] = factory.get_metadata("klass") or ""
+            for tmpl in factory.get_static_pad_templates():
+                caps = tmpl.get_caps()
+                common = (name, rank, int(tmpl.direction), int(tmpl.presence), tmpl.name_template)
+                if caps.is_any():
+                    entries.append(PadEntry(*common, ANY, "", ANY))
+                    continue
+                for i in range(caps.get_size()):
+                    structure = caps.get_structure(i)
+                    features = caps.get_features(i)
+                    one = Gst.Caps.new_empty()
+                    one.append_structure_full(structure.copy(), features.copy() if features else None)
+                    entries.append(PadEntry(*common, structure.get_name(),
+                                            features.to_string() if features else SYSTEM_MEMORY,
+                                            one.to_string()))
+        return cls(entries, klass, _plugin_fingerprint())
+
+    def save(self, path: str = INDEX_PATH) -> None:
+        data = {"fingerprint": self.fingerprint, "klass": self.klass,
+                "entries": [list(e.__dict__.values()) for e in self.entries]}
+        tmp = path + ".part"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = INDEX_PATH, rebuild: bool = False) -> "CapsIndex":
+        """저장된 인덱스가 현재 레지스트리와 맞으면 그대로, 아니면 새로 만들어 저장"""
+        Gst.init(None)
+        fingerprint = _plugin_fingerprint()
+        if not rebuild and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("fingerprint") == fingerprint:
+                    return cls([PadEntry(*e) for e in data["entries"]], data["klass"], fingerprint)
+            except (OSError, ValueError, TypeError):
+                pass
+        index = cls.build()
+        index.save(path)
+        return index
+
+    # ---------- 질의 ----------
+    def factories(self, direction: Gst.PadDirection, media_type: str,
+                  features: str = SYSTEM_MEMORY, include_any: bool = False) -> set[str]:
+        found = set(self._by_type.get((int(direction), media_type), ()))
+        if features is not None:
+            found = {f for f in found
+                     if any(e.features == features for e in self._by_factory[(f, int(direction))])}
+        if include_any:
+            found |= self._by_type.get((int(direction), ANY), set())
+        return found
+
+    def find(self, sink: str | None = None, src: str | None = None, klass: str | None = None,
+             features: str = SYSTEM_MEMORY, caps: Gst.Caps | None = None) -> list[str]:
+        """
+        sink 타입을 받고 src 타입을 내보내는 팩토리 (rank 높은 순).
+        klass 는 부분 문자열 ("Converter", "Decoder" …).
+        caps 를 주면 후보의 sink 템플릿과 실제로 교집합이 있는지까지 확인한다.
+        """
+        key = (sink, src, klass, features)
+        names = self._cache.get(key)
+        if names is None:
+            found = None
+            if sink:
+                found = self.factories(Gst.PadDirection.SINK, sink, features)
+            if src:
+                out = self.factories(Gst.PadDirection.SRC, src, features)
+                found = out if found is None else found & out
+            found = found or set()
+            if klass:
+                found = {f for f in found if klass in self.klass.get(f, "")}
+            names = sorted(found, key=lambda f: (-self.rank.get(f, 0), f))
+            self._cache[key] = names
+        if caps is not None:
+            names = [f for f in names if self.accepts(f, caps)]
+        return names
+
+    def accepts(self, factory: str, caps: Gst.Caps) -> bool:
+        for template in self._sink_caps.get(factory, ()):
+            if template is None or template.can_intersect(caps):
+                return True
+        return False
+
+    def find_converter(self, from_type: str, to_type: str, caps: Gst.Caps | None = None) -> str | None:
+        """
+        from_type → to_type 로 바꾸는 요소 하나 (같은 종류 안에서는 rank 순).
+        변환기(audioconvert 등은 rank NONE) > rank 있는 디코더 > 그 외
+        """
+        candidates = self.find(sink=from_type, src=to_type, caps=caps)
+        for name in candidates:
+            if "Converter" in self.klass.get(name, ""):
+                return name
+        for name in candidates:
+            if "Decoder" in self.klass.get(name, "") and self.rank.get(name, 0) > int(Gst.Rank.NONE):
+                return name
+        return candidates[0] if candidates else None
+
+    def describe(self, factory: str) -> list[str]:
+        lines = []
+        for direction in (Gst.PadDirection.SINK, Gst.PadDirection.SRC):
+            for e in self._by_factory.get((factory, int(direction)), ()):
+                lines.append(f"{direction.value_nick:>4} {e.template:<10} {e.caps}")
+        return lines
+
+
+if __name__ == "__main__":
+    Gst.init(None)
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        t0 = time.perf_counter()
+        index = CapsIndex.build()
+        t1 = time.perf_counter()
+        index.save()
+        t2 = time.perf_counter()
+        index = CapsIndex.load()
+        t3 = time.perf_counter()
+        print(f"build {1000 * (t1 - t0):.1f} ms ({len(index.entries)} pad entries), "
+              f"save {1000 * (t2 - t1):.1f} ms, load {1000 * (t3 - t2):.1f} ms")
+        queries = [("video/x-h264", "video/x-raw"), ("audio/x-vorbis", "audio/x-raw"),
+                   ("video/x-raw", "video/x-raw"), ("audio/x-raw", "audio/x-raw")]
+        n = 10000
+        t0 = time.perf_counter()
+        for i in range(n):
+            index.find_converter(*queries[i % len(queries)])
+        per = (time.perf_counter() - t0) / n
+        print(f"find_converter: {per * 1e6:.2f} µs/query")
+        sys.exit(0)
+
+    index = CapsIndex.load()
+    from_type = sys.argv[1] if len(sys.argv) > 1 else "video/x-h264"
+    to_type = sys.argv[2] if len(sys.argv) > 2 else "video/x-raw"
+    print(f"{from_type} → {to_type}: best = {index.find_converter(from_type, to_type)}")
+    for name in index.find(sink=from_type, src=to_type):
+        print(f"  {index.rank[name]:4d}  {name:<24} {index.klass.get(name, '')}")
+    sys.exit(0)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+미디어 정보 탐색 서비스 (GstPbutils.Discoverer 병렬 + 디스크 캐시)
+— ch5 의 _analyze_streams 처럼 재생 중인 playbin 에 태그를 묻는 대신
+  Discoverer 로 코덱/해상도/언어/비트레이트/길이를 뽑는다
+— 워커(스레드 또는 프로세스)마다 Discoverer 하나, N 개 동시 실행
+— 결과는 sqlite 에 path + mtime + size 를 키로 저장 → 바뀌지 않은 파일은 다시 열지 않는다
+  실패는 에러 키로 저장하고, 확정된 것(플러그인 없음 · 디먹스/디코딩 오류)은 계속 캐시, 타임아웃 등은 FAILURE_TTL 뒤에 다시 연다
+— files/s 보고
+
+    python discovery.py ~/recordings --workers 8
+    python discovery.py ~/recordings --mode process --workers 4
+"""
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GstPbutils", "1.0")
+from gi.repository import Gst, GstPbutils, GLib
+
+CACHE_PATH = os.environ.get("GST_DISCOVERY_CACHE",
+                            os.path.join(tempfile.gettempdir(), "gst-discovery.sqlite"))
+MEDIA_EXTENSIONS = (".mp4", ".mkv", ".webm", ".mov", ".ts", ".avi", ".ogg", ".mp3", ".wav", ".flac")
+# 에러는 메시지 대신 안정된 키로 저장: DiscovererResult nick 또는 "<도메인>:<코드 nick>"
+# 다시 열어도 같은 결과인 실패 — 파일이 안 바뀌면 다시 열지 않는다. 나머지(타임아웃, 리소스 오류)는 일시적
+DEFINITIVE_ERRORS = (GstPbutils.DiscovererResult.MISSING_PLUGINS.value_nick,
+                     GstPbutils.DiscovererResult.ERROR.value_nick,
+                     "core:missing-plugin")
+DEFINITIVE_DOMAINS = ("stream",)     # 디먹스 · 디코딩 · 포맷 오류 = 파일 자체의 문제
+FAILURE_TTL = 600.0          # 일시적 실패를 캐시에 두는 시간 (초)
+_ERROR_DOMAINS = {
+    "gst-core-error-quark": ("core", Gst.CoreError),
+    "gst-library-error-quark": ("library", Gst.LibraryError),
+    "gst-resource-error-quark": ("resource", Gst.ResourceError),
+    "gst-stream-error-quark": ("stream", Gst.StreamError),
+}
+
+
+def error_key(e: GLib.Error) -> str:
+    """GLib.Error → "stream:decode" 같은 키 (메시지 문구 · 경로는 빼고)"""
+    domain, enum = _ERROR_DOMAINS.get(e.domain, (e.domain, None))
+    try:
+        code = enum(e.code).value_nick if enum else str(e.code)
+    except ValueError:
+        code = str(e.code)
+    return f"{domain}:{code}"
+
+
+def is_definitive(error: str) -> bool:
+    return error in DEFINITIVE_ERRORS or error.split(":", 1)[0] in DEFINITIVE_DOMAINS
+
+
+# ---------- Discoverer 결과 → dict ----------
+def _tag(tags: Gst.TagList | None, getter: str, name: str):
+    if tags is None:
+        return None
+    ok, value = getattr(tags, getter)(name)
+    return value if ok else None
+
+
+def _codec(info: GstPbutils.DiscovererStreamInfo) -> str:
+    caps = info.get_caps()
+    return GstPbutils.pb_utils_get_codec_description(caps) if caps else "unknown"
+
+
+def info_to_dict(info: GstPbutils.DiscovererInfo) -> dict:
+    container = None
+    top = info.get_stream_info()
+    if isinstance(top, GstPbutils.DiscovererContainerInfo):
+        container = _codec(top)
+    result = {
+        "uri": info.get_uri(),
+        "duration_s": info.get_duration() / Gst.SECOND,
+        "seekable": info.get_seekable(),
+        "live": info.get_live(),
+        "container": container,
+        "video": [], "audio": [], "subtitles": [],
+    }
+    for v in info.get_video_streams():
+        fps_d = v.get_framerate_denom()
+        result["video"].append({
+            "codec": _codec(v), "width": v.get_width(), "height": v.get_height(),
+            "fps": v.get_framerate_num() / fps_d if fps_d else 0.0,
+            "bitrate": v.get_bitrate() or _tag(v.get_tags(), "get_uint", Gst.TAG_BITRATE),
+            "interlaced": v.is_interlaced(),
+        })
+    for a in info.get_audio_streams():
+        result["audio"].append({
+            "codec": _codec(a), "channels": a.get_channels(), "rate": a.get_sample_rate(),
+            "bitrate": a.get_bitrate() or _tag(a.get_tags(), "get_uint", Gst.TAG_BITRATE),
+            "language": a.get_language(),
+        })
+    for s in info.get_subtitle_streams():
+        result["subtitles"].append({"language": s.get_language()})
+    return result
+
+
+# ---------- 워커 ----------
+_local = threading.local()
+
+
+def _discoverer(timeout: float) -> GstPbutils.Discoverer:
+    """스레드(프로세스 모드면 프로세스)마다 하나씩 만들어 재사용"""
+    d = getattr(_local, "discoverer", None)
+    if d is None:
+        Gst.init(None)
+        GstPbutils.pb_utils_init()       # 코덱 설명 · 설치 도우미 메시지용
+        d = GstPbutils.Discoverer.new(int(timeout * Gst.SECOND))
+        _local.discoverer = d
+    return d
+
+
+def probe(path: str, timeout: float = 10.0) -> tuple[str, dict | None, str | None]:
+    """(path, 결과, 에러 키). 예외 대신 문자열 — 프로세스 풀로 넘기기 쉽게."""
+    try:
+        info = _discoverer(timeout).discover_uri(Gst.filename_to_uri(os.path.abspath(path)))
+    except GLib.Error as e:      # Discoverer 의 ERROR 결과도 여기로 (손상된 파일, 타임아웃 등)
+        return path, None, error_key(e)
+    except Exception as e:
+        return path, None, f"python:{type(e).__name__}"
+    if info.get_result() != GstPbutils.DiscovererResult.OK:
+        return path, None, info.get_result().value_nick
+    return path, info_to_dict(info), None
+
+
+# ---------- 캐시 ----------
+class DiscoveryCache:
+
+    def __init__(self, path: str = CACHE_PATH, failure_ttl: float = FAILURE_TTL) -> None:
+        self.failure_ttl = failure_ttl
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS media ("
+            " path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER,"
+            " info TEXT, error TEXT, probed_at REAL)")
+
+    def get(self, path: str, st: os.stat_result) -> tuple[dict | None, str | None] | None:
+        row = self.db.execute("SELECT mtime_ns, size, info, error, probed_at FROM media WHERE path = ?",
+                              (path,)).fetchone()
+        if row is None or row[0] != st.st_mtime_ns or row[1] != st.st_size:
+            return None
+        error = row[3]
+        if error is not None and not is_definitive(error) \
+                and time.time() - (row[4] or 0) > self.failure_ttl:
+            return None                  # 일시적 실패는 TTL 이 지나면 다시 연다
+        return (json.loads(row[2]) if row[2] else None), error
+
+    def put(self, path: str, st: os.stat_result, info: dict | None, error: str | None) -> None:
+        self.db.execute("INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?, ?)",
+                        (path, st.st_mtime_ns, st.st_size, json.dumps(info) if info else None,
+                         error, time.time()))
+
+    def commit(self) -> None:
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
+
+
+class DiscoveryService:
+
+    def __init__(self, cache_path: str = CACHE_PATH, workers: int = os.cpu_count() or 4,
+                 mode: str = "thread", timeout: float = 10.0, failure_ttl: float = FAILURE_TTL) -> None:
+        self.cache = DiscoveryCache(cache_path, failure_ttl)
+        self.workers = workers
+        self.mode = mode
+        self.timeout = timeout
+        self.last_stats: dict = {}
+
+    def discover(self, paths: list[str]) -> dict[str, dict]:
+        """{path: 결과 또는 {"error": …}}. 캐시에 맞는 항목은 파일을 열지 않는다."""
+        t0 = time.monotonic()
+        results, todo, stats = {}, {}, {"files": len(paths), "cached": 0, "probed": 0, "errors": 0}
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                results[path] = {"error": str(e)}
+                stats["errors"] += 1
+                continue
+            hit = self.cache.get(path, st)
+            if hit is not None:
+                info, error = hit
+                results[path] = info if info else {"error": error}
+                stats["cached"] += 1
+            else:
+                todo[path] = st
+
+        if todo:
+            if self.mode == "process":
+                # GStreamer 스레드가 떠 있는 프로세스를 fork 하지 않도록 spawn
+                pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+            with pool:
+                futures = [pool.submit(probe, path, self.timeout) for path in todo]
+                for n, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                    path, info, error = future.result()
+                    self.cache.put(path, todo[path], info, error)   # sqlite 는 이 스레드에서만
+                    results[path] = info if info else {"error": error}
+                    stats["probed"] += 1
+                    stats["errors"] += error is not None
+                    if n % 100 == 0:
+                        self.cache.commit()
+            self.cache.commit()
+
+        elapsed = time.monotonic() - t0
+        stats.update(elapsed_s=round(elapsed, 3), files_per_s=len(paths) / elapsed if elapsed else 0.0)
+        self.last_stats = stats
+        return results
+
+    def close(self) -> None:
+        self.cache.close()
+
+
+def walk(roots: list[str]) -> list[str]:
+    paths = []
+    for root in roots:
+        if os.path.isfile(root):
+            paths.append(root)
+            continue
+        for dirpath, _dirs, files in os.walk(root):
+            paths += [os.path.join(dirpath, f) for f in files if f.lower().endswith(MEDIA_EXTENSIONS)]
+    return sorted(paths)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="parallel GstDiscoverer with a persistent cache")
+    parser.add_argument("roots", nargs="*", help="files or directories (default: generated media)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--mode", choices=("thread", "process"), default="thread")
+    parser.add_argument("--cache", default=CACHE_PATH)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    Gst.init(None)
+    if not args.roots:
+        import local_media
+        local_media.webm_clip()
+        local_media.mp4_clip()
+        args.roots = [local_media.MEDIA_DIR]
+
+    service = DiscoveryService(args.cache, args.workers, args.mode, args.timeout)
+    results = service.discover(walk(args.roots))
+    if args.verbose:
+        for path, info in results.items():
+            print(path, json.dumps(info, ensure_ascii=False))
+    s = service.last_stats
+    print(f"{s['files']} files ({s['cached']} cached, {s['probed']} probed, {s['errors']} errors) "
+          f"in {s['elapsed_s']:.2f} s → {s['files_per_s']:.1f} files/s "
+          f"[{args.mode} × {args.workers}]")
+    service.close()
+    sys.exit(0)
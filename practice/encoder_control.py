@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+x264enc 적응형 프리셋 컨트롤러
+— 스트림(카메라)별 실제 인코딩 fps 와 인코더 앞 queue 레벨을 측정
+— 전체 CPU 예산 안에서 speed-preset / bitrate / threads 를 한 단계씩 조정
+— 모든 결정은 decisions 에 남기고, log_path 가 있으면 JSONL 로도 기록
+  사람이 읽는 한 줄은 logging("encoder_control") 으로, 누적 결정 수와 현재 설정은
+  prometheus_lines() 로 (telemetry.PrometheusEndpoint 에 add)
+"""
+import json
+import logging
+import os
+import time
+from collections import deque
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gst, GLib
+
+# x264enc speed-preset 사다리 (빠름 → 느림, 느릴수록 화질/압축 ↑ CPU ↑)
+SPEED_PRESETS = (
+    "ultrafast", "superfast", "veryfast", "faster", "fast",
+    "medium", "slow", "slower", "veryslow",
+)
+
+BITRATE_STEP = 0.15      # bitrate 한 단계 = 15 %
+BEHIND_RATIO = 0.95      # 출력 fps 가 입력의 95 % 미만이면 실시간 미달
+QUEUE_HIGH   = 0.5       # 인코더 앞 queue 가 절반 이상 차면 밀리는 중
+QUEUE_LOW    = 0.1
+UPGRADE_HEADROOM = 0.7   # CPU 가 예산의 70 % 미만일 때만 화질을 올림
+AUTO_THREADS = 0         # x264enc threads=0: 코어 수에 맞춰 인코더가 정함
+
+log = logging.getLogger("encoder_control")
+
+
+def _queue_fill(queue: Gst.Element) -> float:
+    """queue 의 채움 비율(0~1). 제한이 걸린 축 중 가장 많이 찬 값."""
+    fill = 0.0
+    for cur, limit in (("current-level-buffers", "max-size-buffers"),
+                       ("current-level-bytes", "max-size-bytes"),
+                       ("current-level-time", "max-size-time")):
+        max_val = queue.get_property(limit)
+        if max_val:
+            fill = max(fill, queue.get_property(cur) / max_val)
+    return fill
+
+
+class EncoderStream:
+    """컨트롤러가 관리하는 인코더 하나(카메라 하나)의 상태"""
+
+    def __init__(self, name: str, encoder: Gst.Element, queue: Gst.Element | None,
+                 target_fps: float | None, min_bitrate: int, max_bitrate: int | None,
+                 max_preset: str | None, reconfigure: bool) -> None:
+        self.name = name
+        self.encoder = encoder
+        self.queue = queue
+        self.target_fps = target_fps
+        self.reconfigure = reconfigure
+
+        self.preset = encoder.get_property("speed-preset").value_nick
+        # 처음 설정된 프리셋보다 느린(비싼) 쪽으로는 올리지 않는다
+        self.max_preset = max_preset or self.preset
+        self.bitrate = encoder.get_property("bitrate")
+        self.min_bitrate = min_bitrate
+        self.max_bitrate = max_bitrate or self.bitrate
+        # 0(auto) 은 그대로 둔다 — 늘릴 때는 먼저 구체적인 값으로 고정한 뒤 한 단계씩
+        self.threads = encoder.get_property("threads")
+
+        # 스트리밍 스레드에서 증가, 메인 루프에서 읽기만 함 (GIL 로 충분)
+        self.frames_in = 0
+        self.frames_out = 0
+        self._last_in = 0
+        self._last_out = 0
+        self.in_fps = 0.0
+        self.out_fps = 0.0
+        self.fill = 0.0
+        self._pending = None   # 적용 대기 중인 재설정 (blocking probe id)
+
+        sink = encoder.get_static_pad("sink")
+        src = encoder.get_static_pad("src")
+        sink.add_probe(Gst.PadProbeType.BUFFER, self._count_in)
+        src.add_probe(Gst.PadProbeType.BUFFER, self._count_out)
+
+    def _count_in(self, _pad, _info):
+        self.frames_in += 1
+        return Gst.PadProbeReturn.OK
+
+    def _count_out(self, _pad, _info):
+        self.frames_out += 1
+        return Gst.PadProbeReturn.OK
+
+    def sample(self, dt: float) -> None:
+        self.in_fps = (self.frames_in - self._last_in) / dt
+        self.out_fps = (self.frames_out - self._last_out) / dt
+        self._last_in, self._last_out = self.frames_in, self.frames_out
+        self.fill = _queue_fill(self.queue) if self.queue else 0.0
+
+    @property
+    def idle(self) -> bool:
+        # 밸브가 닫혀 있거나 아직 데이터가 안 들어온 경우
+        return self.in_fps == 0 and self.fill == 0
+
+    @property
+    def behind(self) -> bool:
+        target = self.target_fps or self.in_fps
+        return self.out_fps < target * BEHIND_RATIO or self.fill >= QUEUE_HIGH
+
+    @property
+    def preset_idx(self) -> int:
+        return SPEED_PRESETS.index(self.preset)
+
+
+class EncoderController:
+    """
+    주기적으로 모든 스트림을 측정해 한 틱에 최대 한 단계씩만 조정한다.
+
+    - 실시간 미달 스트림은 CPU 예산과 관계없이 먼저 낮춘다 (preset ↑빠르게 → bitrate ↓)
+    - 프로세스 CPU 가 예산을 넘으면 가장 비싼 프리셋의 스트림을 하나 낮춘다
+    - 여유가 충분하면 가장 낮게 떨어진 스트림을 하나 되돌린다
+    - threads 는 실시간 미달인데 CPU 여유가 있을 때만 늘린다.
+      auto(0) 인 인코더는 먼저 코어를 스트림 수로 나눈 값으로 고정하고, 그다음부터 하나씩
+
+    bitrate 는 PLAYING 중에도 바뀌지만 speed-preset/threads 는 x264enc 가 READY 에서만
+    받으므로, 인코더 입력을 blocking probe 로 막고 READY 로 내렸다가 다시 올린다.
+    reconfigure=False 인 스트림은 bitrate 만 조정한다.
+    """
+
+    def __init__(self, cpu_budget: float = 0.8, interval: float = 2.0,
+                 log_path: str | None = None, max_decisions: int = 10000) -> None:
+        Gst.init(None)
+        self.cpu_budget = cpu_budget        # 전체 코어 대비 비율 (0~1)
+        self.interval = interval
+        self.log_path = log_path
+        self.streams: dict[str, EncoderStream] = {}
+        self.decisions: deque = deque(maxlen=max_decisions)
+        self.counts: dict[tuple[str, str], int] = {}    # (스트림, 속성) → 결정 수
+        self.cpu = 0.0
+        self._ncpu = os.cpu_count() or 1
+        self._timer_id = None
+        self._last_wall = None
+        self._last_cpu = None
+        self._log = open(log_path, "a", encoding="utf-8") if log_path else None
+
+    # ---------- 등록 ----------
+    def add_stream(self, name: str, encoder: Gst.Element, queue: Gst.Element | None = None,
+                   target_fps: float | None = None, min_bitrate: int = 500,
+                   max_bitrate: int | None = None, max_preset: str | None = None,
+                   reconfigure: bool = True) -> EncoderStream:
+        if name in self.streams:
+            raise ValueError(f"stream '{name}' already registered")
+        stream = EncoderStream(name, encoder, queue, target_fps,
+                               min_bitrate, max_bitrate, max_preset, reconfigure)
+        self.streams[name] = stream
+        return stream
+
+    def remove_stream(self, name: str) -> None:
+        self.streams.pop(name, None)
+
+    # ---------- 실행 ----------
+    def start(self) -> None:
+        if self._timer_id is None:
+            self._last_wall = time.monotonic()
+            self._last_cpu = time.process_time()
+            self._timer_id = GLib.timeout_add(int(self.interval * 1000), self._tick)
+
+    def stop(self) -> None:
+        if self._timer_id is not None:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = None
+        if self._log:
+            self._log.close()
+            self._log = None
+
+    def _tick(self) -> bool:
+        now, cpu_now = time.monotonic(), time.process_time()
+        dt = now - self._last_wall
+        if dt <= 0:
+            return True
+        self.cpu = (cpu_now - self._last_cpu) / (dt * self._ncpu)
+        self._last_wall, self._last_cpu = now, cpu_now
+
+        active = []
+        for stream in self.streams.values():
+            stream.sample(dt)
+            if not stream.idle and stream._pending is None:
+                active.append(stream)
+        if not active:
+            return True
+
+        # 1) 실시간 미달 스트림은 전부 한 단계씩 낮춘다
+        behind = [s for s in active if s.behind]
+        for s in behind:
+            if self.cpu < self.cpu_budget and s.reconfigure and s.threads == AUTO_THREADS:
+                share = max(1, self._ncpu // len(active))
+                self._apply(s, "threads", share, "behind, cpu headroom (pin auto threads)")
+            elif self.cpu < self.cpu_budget and s.reconfigure and s.threads < self._ncpu:
+                self._apply(s, "threads", s.threads + 1, "behind, cpu headroom")
+            else:
+                self._degrade(s, "behind real-time")
+        if behind:
+            return True
+
+        # 2) 예산 초과 → 가장 비싼 스트림 하나만 낮춘다
+        if self.cpu > self.cpu_budget:
+            worst = max(active, key=lambda s: (s.preset_idx, s.bitrate))
+            self._degrade(worst, f"cpu {self.cpu:.2f} > budget {self.cpu_budget:.2f}")
+            return True
+
+        # 3) 여유가 있으면 가장 많이 떨어진 스트림 하나를 되돌린다
+        if self.cpu < self.cpu_budget * UPGRADE_HEADROOM:
+            calm = [s for s in active if s.fill < QUEUE_LOW]
+            if calm:
+                best = min(calm, key=lambda s: (s.preset_idx, s.bitrate))
+                self._upgrade(best, f"cpu {self.cpu:.2f} < {UPGRADE_HEADROOM:.0%} of budget")
+        return True
+
+    # ---------- 결정 ----------
+    def _degrade(self, s: EncoderStream, reason: str) -> None:
+        if s.reconfigure and s.preset_idx > 0:
+            self._apply(s, "speed-preset", SPEED_PRESETS[s.preset_idx - 1], reason)
+        elif s.bitrate > s.min_bitrate:
+            new = max(s.min_bitrate, int(s.bitrate * (1 - BITRATE_STEP)))
+            self._apply(s, "bitrate", new, reason)
+        else:
+            self._record(s, "none", None, None, reason + " (already at floor)")
+
+    def _upgrade(self, s: EncoderStream, reason: str) -> None:
+        if s.bitrate < s.max_bitrate:
+            new = min(s.max_bitrate, int(s.bitrate * (1 + BITRATE_STEP)) + 1)
+            self._apply(s, "bitrate", new, reason)
+        elif s.reconfigure and s.preset_idx < SPEED_PRESETS.index(s.max_preset):
+            self._apply(s, "speed-preset", SPEED_PRESETS[s.preset_idx + 1], reason)
+
+    def _apply(self, s: EncoderStream, prop: str, value, reason: str) -> None:
+        old = {"speed-preset": s.preset, "bitrate": s.bitrate, "threads": s.threads}[prop]
+        self._record(s, prop, old, value, reason)
+        if prop == "bitrate":
+            s.bitrate = value
+        elif prop == "speed-preset":
+            s.preset = value
+        else:
+            s.threads = value
+
+        pspec = s.encoder.find_property(prop)
+        if pspec.flags & Gst.PARAM_MUTABLE_PLAYING:
+            Gst.util_set_object_arg(s.encoder, prop, str(value))
+        else:
+            self._reconfigure(s, prop, value)
+
+    def _reconfigure(self, s: EncoderStream, prop: str, value) -> None:
+        """인코더 입력을 막고 READY 로 내려서 속성을 바꾼 뒤 다시 링크한다."""
+        sink = s.encoder.get_static_pad("sink")
+        peer = sink.get_peer()
+        if peer is None or s.encoder.get_state(0)[1] < Gst.State.READY:
+            Gst.util_set_object_arg(s.encoder, prop, str(value))
+            return
+
+        def _apply_blocked():
+            peer.unlink(sink)
+            s.encoder.set_state(Gst.State.READY)
+            Gst.util_set_object_arg(s.encoder, prop, str(value))
+            # 재링크하면 stream-start/caps/segment 같은 sticky 이벤트가 다시 전달된다
+            peer.link(sink)
+            s.encoder.sync_state_with_parent()
+            peer.remove_probe(s._pending)
+            s._pending = None
+            return False
+
+        def _blocked(_pad, _info):
+            GLib.idle_add(_apply_blocked)
+            return Gst.PadProbeReturn.OK
+
+        s._pending = peer.add_probe(Gst.PadProbeType.BLOCK_DOWNSTREAM, _blocked)
+
+    def _record(self, s: EncoderStream, param: str, old, new, reason: str) -> None:
+        decision = {
+            "ts": time.time(),
+            "stream": s.name,
+            "param": param,
+            "old": old,
+            "new": new,
+            "reason": reason,
+            "in_fps": round(s.in_fps, 2),
+            "out_fps": round(s.out_fps, 2),
+            "queue_fill": round(s.fill, 3),
+            "cpu": round(self.cpu, 3),
+        }
+        self.decisions.append(decision)
+        self.counts[(s.name, param)] = self.counts.get((s.name, param), 0) + 1
+        if self._log:
+            self._log.write(json.dumps(decision) + "\n")
+            self._log.flush()
+        if param == "threads" and old == AUTO_THREADS:
+            old = "auto"
+        log.info("%s: %s %s → %s (%s)", s.name, param, old, new, reason)
+
+    def summary(self) -> dict:
+        return {
+            name: {"preset": s.preset, "bitrate": s.bitrate, "threads": s.threads,
+                   "in_fps": s.in_fps, "out_fps": s.out_fps, "queue_fill": s.fill}
+            for name, s in self.streams.items()
+        }
+
+    def prometheus_lines(self) -> str:
+        """telemetry.PrometheusEndpoint 용. 현재 설정과 누적 결정 수."""
+        streams = list(self.streams.values())
+        lines = ["# TYPE gst_encoder_bitrate_kbps gauge"]
+        lines += [f'gst_encoder_bitrate_kbps{{stream="{s.name}"}} {s.bitrate}' for s in streams]
+        lines.append("# TYPE gst_encoder_preset_index gauge")
+        lines += [f'gst_encoder_preset_index{{stream="{s.name}",preset="{s.preset}"}} {s.preset_idx}'
+                  for s in streams]
+        lines.append("# TYPE gst_encoder_threads gauge")      # 0 = auto
+        lines += [f'gst_encoder_threads{{stream="{s.name}"}} {s.threads}' for s in streams]
+        lines.append("# TYPE gst_encoder_decisions_total counter")
+        lines += [f'gst_encoder_decisions_total{{stream="{name}",param="{param}"}} {n}'
+                  for (name, param), n in list(self.counts.items())]
+        lines.append("# TYPE gst_encoder_cpu_ratio gauge")
+        lines.append(f"gst_encoder_cpu_ratio {self.cpu:.4f}")
+        return "\n".join(lines) + "\n"
+
+
+# ---------- 데모: videotestsrc 카메라 N 대를 하나의 CPU 예산으로 ----------
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format="[%(name)s] %(message)s")
+    Gst.init(None)
+    n_cams = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    controller = EncoderController(cpu_budget=0.8, log_path="encoder_decisions.jsonl")
+    pipeline = Gst.Pipeline.new("encoder-control-demo")
+
+    for i in range(n_cams):
+        bin_ = Gst.parse_bin_from_description(
+            f"videotestsrc is-live=true pattern=ball ! "
+            f"video/x-raw,width=1280,height=720,framerate=30/1 ! "
+            f"queue name=q{i} ! x264enc name=enc{i} tune=zerolatency speed-preset=medium "
+            f"bitrate=4000 key-int-max=30 ! h264parse ! fakesink sync=false",
+            False)
+        pipeline.add(bin_)
+        controller.add_stream(f"cam{i}", bin_.get_by_name(f"enc{i}"), bin_.get_by_name(f"q{i}"))
+
+    pipeline.set_state(Gst.State.PLAYING)
+    controller.start()
+    loop = GLib.MainLoop()
+    GLib.timeout_add_seconds(60, loop.quit)
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        pass
+    controller.stop()
+    pipeline.set_state(Gst.State.NULL)
+    print(json.dumps(controller.summary(), indent=2))
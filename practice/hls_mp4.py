@@ -1,6 +1,12 @@
-import gi, threading, requests
+import gi, threading
 gi.require_version('Gst', '1.0')
 from gi.repository import Gst, GObject
+from pipeline_control import CommandQueue, attach_branch, detach_branch
+from queue_policy import BEST_EFFORT, RECORD, BranchPolicies
+from bootstrap import lazy_import
+from keyframe_index import build as build_keyframe_index
+
+requests = lazy_import("requests")
 Gst.init(None)
 
 class StreamRecorder:
@@ -23,6 +29,11 @@ class StreamRecorder:
                           Gst.ElementFactory.make("autovideosink"))
         # 녹화
         qr = Gst.ElementFactory.make("queue"); qr.set_property("flush-on-eos", False)
+
+        # 디스플레이는 밀리면 버리고, 녹화는 버리지 않음
+        self.policies = BranchPolicies()
+        self.policies.apply("display", qd, BEST_EFFORT)
+        self.policies.apply("record", qr, RECORD)
         cvr = Gst.ElementFactory.make("videoconvert")
         enc = Gst.ElementFactory.make("x264enc"); enc.set_property("tune", "zerolatency")
         parser = Gst.ElementFactory.make("h264parse")
@@ -30,17 +41,36 @@ class StreamRecorder:
         self.split.set_property("location", out_pattern)
         self.split.set_property("muxer-factory", "mp4mux")
         self.split.set_property("async-finalize", True)
+        # 녹화를 다시 켤 때 조각 번호가 이어지도록
+        self._next_index = 0
+        self.split.connect("format-location", self._on_format_location)
 
         # ─── Add & Link static parts ───────────────────────────
-        for e in (self.src, self.tee, qd, cvd, sinkd,
-                  qr, cvr, enc, parser, self.split):
+        for e in (self.src, self.tee, qd, cvd, sinkd):
             self.pipeline.add(e)
 
         # 모니터 브랜치
         qd.link(cvd); cvd.link(sinkd)
+        self._display_queue = qd
+
+        # 녹화 브랜치 (start_recording 때 파이프라인에 붙이고 stop_recording 때 뗀다)
+        self._record = [qr, cvr, enc, parser, self.split]
+
+        # 닫힌 조각마다 키프레임 인덱스(.kidx)를 백그라운드에서 만든다
+        bus = self.pipeline.get_bus()
+        bus.add_signal_watch()
+        bus.connect("message::element", self._on_element_message)
 
-        # 녹화 브랜치 (tee pad는 start_recording 때 연결)
-        qr.link(cvr); cvr.link(enc); enc.link(parser); parser.link(self.split)
+    def _on_element_message(self, _bus, msg):
+        s = msg.get_structure()
+        if s and s.get_name() == "splitmuxsink-fragment-closed":
+            location = s.get_string("location")
+            threading.Thread(target=build_keyframe_index, args=(location,),
+                             name="kidx", daemon=True).start()
+
+    def _on_format_location(self, _split, fragment_id):
+        self._next_index = fragment_id + 1
+        return self.split.get_property("location") % fragment_id
 
     # pad-added: src → tee
     def _on_pad_added(self, _, pad):
@@ -51,7 +81,7 @@ class StreamRecorder:
     def start_playback(self):
         # tee → 모니터 pad
         disp_pad = self.tee.request_pad_simple("src_%u")
-        disp_pad.link(self.pipeline.get_by_name("queue0").get_static_pad("sink"))
+        disp_pad.link(self._display_queue.get_static_pad("sink"))
         self.pipeline.set_state(Gst.State.PLAYING)
         print("▶ PLAY")
 
@@ -60,34 +90,24 @@ class StreamRecorder:
         print("■ STOP")
 
     # ─── Record control ──────────────────────────────────────
+    # 메인 루프 스레드에서 불려야 한다 → 다른 스레드에서는 CommandQueue.submit() 으로
     def start_recording(self):
         if self._rec_pad:
             print("녹화 중입니다.")
             return
-        self._rec_pad = self.tee.request_pad_simple("src_%u")
-        self._rec_pad.link(self.pipeline.get_by_name("queue1").get_static_pad("sink"))
+        self.split.set_property("start-index", self._next_index)
+        self._rec_pad = attach_branch(self.pipeline, self.tee, self._record)
         print("⏺ REC ON")
 
     def stop_recording(self):
         if not self._rec_pad:
             print("녹화가 켜져 있지 않습니다.")
-            return
-        # 1) 해당 브랜치 BLOCK
-        def _block_cb(pad, _info):
-            pad.send_event(Gst.Event.new_eos())
-            return Gst.PadProbeReturn.REMOVE
-        self._rec_pad.add_probe(Gst.PadProbeType.BLOCK_DOWNSTREAM, _block_cb)
-
-        # 2) splitmuxsink 가 파일 닫을 때까지 대기
-        bus = self.pipeline.get_bus()
-        bus.timed_pop_filtered(Gst.CLOCK_TIME_NONE,
-                               Gst.MessageType.EOS | Gst.MessageType.ERROR)
-
-        # 3) 브랜치 해제
-        self._rec_pad.unlink(self.pipeline.get_by_name("queue1").get_static_pad("sink"))
-        self.tee.release_request_pad(self._rec_pad)
+            return None
+        # tee pad 가 쉬는 순간 떼고 EOS 를 흘려 splitmuxsink 가 파일을 닫은 뒤 정리
+        done = detach_branch(self.pipeline, self.tee, self._rec_pad, self._record)
         self._rec_pad = None
-        print("⏹ REC OFF (파일 닫힘 완료)")
+        done.add_done_callback(lambda _f: print("⏹ REC OFF (파일 닫힘 완료)"))
+        return done
 
 # ─── Demo run ────────────────────────────────────────────────
 if __name__ == "__main__":
@@ -99,14 +119,16 @@ if __name__ == "__main__":
 
     rec = StreamRecorder(uri)
     rec.start_playback()
+    control = CommandQueue()
 
-    # 2초 뒤 녹화 ON, 8초 뒤 녹화 OFF
-    threading.Timer(2, rec.start_recording).start()
-    threading.Timer(4, rec.stop_recording).start()
+    # 2초 뒤 녹화 ON, 4초 뒤 녹화 OFF (타이머 스레드 → 메인 루프로 명령 전달)
+    threading.Timer(2, control.submit, (rec.start_recording,)).start()
+    threading.Timer(4, control.submit, (rec.stop_recording,)).start()
 
     loop = GObject.MainLoop()
     try:
         loop.run()
     except KeyboardInterrupt:
+        print(control.stats())
         rec.stop_playback()
         loop.quit()
@@ -1,11 +1,17 @@
 import gi
 import time
 import threading
-import requests
 
 gi.require_version('Gst', '1.0')
 from gi.repository import Gst, GObject
 
+from branch_profile import DISPLAY, default_threads
+from pipeline_control import CommandQueue, attach_branch, detach_branch
+from queue_policy import BEST_EFFORT, RECORD, BranchPolicies
+from bootstrap import lazy_import
+
+requests = lazy_import("requests")
+
 Gst.init(None)
 
 class StreamRecorder:
@@ -18,20 +24,25 @@ class StreamRecorder:
         self.src.set_property("uri", uri)
         self.tee = Gst.ElementFactory.make("tee", "tee")
         self.queue_display = Gst.ElementFactory.make("queue", "queue_display")
-        self.convert_display = Gst.ElementFactory.make("videoconvert", "convert_display")
+        # 디스플레이는 작은 크기로 줄인 뒤 변환 (videorate → videoscale → videoconvert)
+        self.convert_display = DISPLAY.make_elements("display")
         self.sink_display = Gst.ElementFactory.make("autovideosink", "sink_display")
 
+        # 디스플레이는 밀리면 프레임을 버림 (녹화 브랜치를 막지 않게)
+        self.policies = BranchPolicies()
+        self.policies.apply("display", self.queue_display, BEST_EFFORT)
+
         # 요소 추가
-        for el in [self.src, self.tee, self.queue_display, self.convert_display, self.sink_display]:
+        for el in [self.src, self.tee, self.queue_display, *self.convert_display, self.sink_display]:
             self.pipeline.add(el)
 
         # uridecodebin pad 연결 (비디오만 처리)
         self.src.connect("pad-added", self.on_pad_added)
 
         # 디스플레이 분기 연결
-        self.tee.link(self.queue_display)
-        self.queue_display.link(self.convert_display)
-        self.convert_display.link(self.sink_display)
+        display_chain = [self.tee, self.queue_display, *self.convert_display, self.sink_display]
+        for upstream, downstream in zip(display_chain, display_chain[1:]):
+            upstream.link(downstream)
 
         # 녹화 관련 변수
         self.recording_elements = []
@@ -53,38 +64,27 @@ class StreamRecorder:
     def start_recording(self, filename="output.mp4"):
         print("⏺ 녹화 시작")
         queue_rec = Gst.ElementFactory.make("queue", "queue_rec")
+        self.policies.apply("record", queue_rec, RECORD)
         convert_rec = Gst.ElementFactory.make("videoconvert", "convert_rec")
+        convert_rec.set_property("n-threads", default_threads())
         encoder = Gst.ElementFactory.make("x264enc", "encoder")
         muxer = Gst.ElementFactory.make("mp4mux", "muxer")
         sink = Gst.ElementFactory.make("filesink", "sink_rec")
         sink.set_property("location", filename)
         
 
-        for el in [queue_rec, convert_rec, encoder, muxer, sink]:
-            self.pipeline.add(el)
-
-        queue_rec.link(convert_rec)
-        convert_rec.link(encoder)
-        encoder.link(muxer)
-        muxer.link(sink)
-
-        tee_record_src= Gst.Element.request_pad_simple(self.tee, "src_%u")
-        sink_pad = queue_rec.get_static_pad("sink")
-        tee_record_src.link(sink_pad)
-
-        for el in [queue_rec, convert_rec, encoder, muxer, sink]:
-            el.sync_state_with_parent()
+        branch = [queue_rec, convert_rec, encoder, muxer, sink]
+        tee_record_src = attach_branch(self.pipeline, self.tee, branch)
 
-        self.recording_elements = [queue_rec, convert_rec, encoder, muxer, sink, tee_record_src]
+        self.recording_elements = branch + [tee_record_src]
         print(f"'{filename}' 저장 중...")
 
     def stop_recording(self):
         print("⏹ 녹화 중지")
-        for el in self.recording_elements[:-1]:  # 마지막은 tee_pad
-            el.set_state(Gst.State.NULL)
-            self.pipeline.remove(el)
-        self.tee.release_request_pad(self.recording_elements[-1])
+        # tee pad 가 쉬는 순간 떼고, EOS 로 mp4mux 가 파일을 마무리한 뒤 요소를 제거
+        branch, tee_pad = self.recording_elements[:-1], self.recording_elements[-1]
         self.recording_elements = []
+        return detach_branch(self.pipeline, self.tee, tee_pad, branch)
 
 # 사용 예시
 if __name__ == "__main__":
@@ -95,13 +95,15 @@ if __name__ == "__main__":
     uri_ex = response_data[0].get("cctvurl")
     recorder = StreamRecorder(uri_ex)
     recorder.start()
+    control = CommandQueue()
 
-    # 5초 후 녹화 시작
-    threading.Timer(5, recorder.start_recording).start()
+    # 5초 후 녹화 시작 (타이머 스레드 → 메인 루프에서 실행)
+    threading.Timer(5, control.submit, (recorder.start_recording,)).start()
 
-    # 15초 후 녹화 종료 + 전체 종료
+    # 10초 후 녹화 종료 (파일이 닫히면 Future 완료)
     def stop_all():
-        recorder.stop_recording()
+        control.submit(recorder.stop_recording).result()
+        print(f"녹화 명령 지연: {control.stats()}")
     threading.Timer(10, stop_all).start()
 
     # GLib 메인 루프 실행
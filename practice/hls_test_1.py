@@ -1,13 +1,23 @@
+import logging
+
 import gi
 gi.require_version('Gst', '1.0')
 gi.require_version('GObject', '2.0')
 from gi.repository import Gst, GObject
-import requests
+
+from branch_profile import DISPLAY, RECORD as RECORD_PROFILE, BranchCpuMeter
+from encoder_control import EncoderController
+from low_latency import LOW_LATENCY
+from queue_policy import BEST_EFFORT, RECORD as RECORD_QUEUE, BranchPolicies
+from telemetry import PipelineTelemetry, PrometheusEndpoint
+from bootstrap import lazy_import
+
+requests = lazy_import("requests")
 
 Gst.init(None)  # Initialize GStreamer
 
 class HLSRecorder:
-    def __init__(self, hls_url, output_pattern="recording_%05d.mp4"):
+    def __init__(self, hls_url, output_pattern="recording_%05d.mp4", latency_profile=None):
         # Create GStreamer pipeline
         self.pipeline = Gst.Pipeline.new("hls_recorder_pipeline")
         if not self.pipeline:
@@ -25,29 +35,39 @@ class HLSRecorder:
         # self.src.set_property("keep-alive", True)
 
         # Elements for video processing
-        self.videoconvert = Gst.ElementFactory.make("videoconvert", "videoconvert")
+        # Decoded frames go to the tee untouched; each branch scales/converts only as far as it needs
         self.tee = Gst.ElementFactory.make("tee", "tee")
-        if not self.videoconvert or not self.tee:
-            raise RuntimeError("Failed to create videoconvert or tee")
+        if not self.tee:
+            raise RuntimeError("Failed to create tee")
 
         # Elements for playback branch
         self.queue_display = Gst.ElementFactory.make("queue", "queue_display")
         self.videosink = Gst.ElementFactory.make("autovideosink", "videosink")
         if not self.queue_display or not self.videosink:
             raise RuntimeError("Failed to create display queue or video sink")
-        # Optionally, set queue properties for display (e.g., leaky or max sizes) if needed:
-        # self.queue_display.set_property("max-size-buffers", 0)
-        # self.queue_display.set_property("max-size-bytes", 0)
-        # self.queue_display.set_property("max-size-time", 0)
+        # Display only needs a small preview: drop frames and downscale before converting
+        self.display_convert = DISPLAY.make_elements("display")
 
         # Elements for recording branch
         self.queue_record = Gst.ElementFactory.make("queue", "queue_record")
         self.valve = Gst.ElementFactory.make("valve", "record_valve")
+        # Full-resolution I420 for the encoder; sits after the valve so it idles while not recording
+        self.record_convert = RECORD_PROFILE.make_elements("record")
         self.x264enc = Gst.ElementFactory.make("x264enc", "x264enc")
         self.h264parse = Gst.ElementFactory.make("h264parse", "h264parse")
         self.splitmuxsink = Gst.ElementFactory.make("splitmuxsink", "splitmuxsink")
         if not self.queue_record or not self.valve or not self.x264enc or not self.h264parse or not self.splitmuxsink:
             raise RuntimeError("Failed to create one or more recording elements")
+        # Queue policies: the display may drop frames, the recording branch never does
+        self.policies = BranchPolicies()
+        display_policy = latency_profile.queue if latency_profile and latency_profile.queue else BEST_EFFORT
+        self.policies.apply("display", self.queue_display, display_policy)
+        # Optional low-latency display: sink sync/max-lateness, pipeline latency, decoder threading
+        if latency_profile:
+            latency_profile.apply(self.pipeline)
+            latency_profile.apply_sink(self.videosink)
+        self.policies.apply("record", self.queue_record, RECORD_QUEUE)
+
         # Configure recording elements
         self.valve.set_property("drop", True)  # start with valve closed (not recording)
         # Forward caps (sticky events) even when drop=TRUE, to ensure encoder can negotiate format
@@ -71,10 +91,10 @@ class HLSRecorder:
 
         # Add all elements to the pipeline
         elements = [
-            self.src, self.hlsdemux, self.decodebin,
-            self.videoconvert, self.tee,
-            self.queue_display, self.videosink,
-            self.queue_record, self.valve, self.x264enc, self.h264parse, self.splitmuxsink
+            self.src, self.hlsdemux, self.decodebin, self.tee,
+            self.queue_display, *self.display_convert, self.videosink,
+            self.queue_record, self.valve, *self.record_convert,
+            self.x264enc, self.h264parse, self.splitmuxsink
         ]
         for elem in elements:
             self.pipeline.add(elem)
@@ -88,22 +108,23 @@ class HLSRecorder:
         # Once HLS demux outputs data, we link to decodebin (which will also link dynamically)
         # decodebin will in turn output raw video on pad-added signal
 
-        # Link post-decode elements (will complete linking in decodebin pad-added callback)
-        # videoconvert -> tee
-        if not self.videoconvert.link(self.tee):
-            raise RuntimeError("Failed to link videoconvert -> tee")
-        # Tee branches: tee -> queue_display -> videosink
+        # Link post-decode elements (decodebin -> tee is linked in the pad-added callback)
+        # Tee branches: tee -> queue_display -> rate/scale/convert -> videosink
         if not self.tee.link(self.queue_display):
             raise RuntimeError("Failed to link tee -> queue_display")
-        if not self.queue_display.link(self.videosink):
-            raise RuntimeError("Failed to link queue_display -> videosink")
-        # tee -> queue_record -> valve -> x264enc -> h264parse -> splitmuxsink
+        display_chain = [self.queue_display, *self.display_convert, self.videosink]
+        for upstream, downstream in zip(display_chain, display_chain[1:]):
+            if not upstream.link(downstream):
+                raise RuntimeError(f"Failed to link {upstream.get_name()} -> {downstream.get_name()}")
+        # tee -> queue_record -> valve -> convert -> x264enc -> h264parse -> splitmuxsink
         if not self.tee.link(self.queue_record):
             raise RuntimeError("Failed to link tee -> queue_record (record branch)")
         if not self.queue_record.link(self.valve):
             raise RuntimeError("Failed to link queue_record -> valve")
-        if not self.valve.link(self.x264enc):
-            raise RuntimeError("Failed to link valve -> x264enc")
+        record_chain = [self.valve, *self.record_convert, self.x264enc]
+        for upstream, downstream in zip(record_chain, record_chain[1:]):
+            if not upstream.link(downstream):
+                raise RuntimeError(f"Failed to link {upstream.get_name()} -> {downstream.get_name()}")
         if not self.x264enc.link(self.h264parse):
             raise RuntimeError("Failed to link x264enc -> h264parse")
         if not self.h264parse.link(self.splitmuxsink):
@@ -139,9 +160,9 @@ class HLSRecorder:
         struct = caps.get_structure(0)
         pad_type = struct.get_name()
         if pad_type.startswith("video/"):  # It's raw video
-            # Link decodebin's video output to videoconvert -> (then to tee and onward)
-            if not pad.link(self.videoconvert.get_static_pad("sink")) == Gst.PadLinkReturn.OK:
-                print("Warning: Failed to link decoded video pad to videoconvert")
+            # Link decodebin's video output straight to the tee; branches convert on their own
+            if not pad.link(self.tee.get_static_pad("sink")) == Gst.PadLinkReturn.OK:
+                print("Warning: Failed to link decoded video pad to tee")
         elif pad_type.startswith("audio/"):  # It's audio (we don't need audio)
             # Link audio pad to fakesink to consume it (avoid stalling decodebin)
             fakesink = Gst.ElementFactory.make("fakesink", None)
@@ -244,13 +265,40 @@ if __name__ == "__main__":
     response_data = response_json.get("response").get('data')
     print(response_data)
     uri_ex = response_data[0].get("cctvurl")
-    recorder = HLSRecorder(uri_ex)
+    recorder = HLSRecorder(uri_ex, latency_profile=LOW_LATENCY)
     try:
         recorder.start_pipeline()
     except RuntimeError as e:
         print(f"Pipeline error: {e}")
         exit(1)
 
+    # Keep the encoder real-time: step speed-preset/bitrate/threads within the CPU budget
+    logging.basicConfig(level=logging.INFO, format="[%(name)s] %(message)s")
+    encoder_control = EncoderController(cpu_budget=0.8, log_path="encoder_decisions.jsonl")
+    encoder_control.add_stream("cam0", recorder.x264enc, recorder.queue_record)
+    encoder_control.start()
+
+    # Per-branch CPU (each queue's streaming thread runs its whole branch)
+    branch_cpu = BranchCpuMeter()
+    branch_cpu.watch("display", recorder.queue_display)
+    branch_cpu.watch("record", recorder.queue_record)
+
+    def on_branch_cpu():
+        for name, cpu in sorted(branch_cpu.sample().items()):
+            print(f"[INFO] {name} branch: {cpu * 100:.1f}% CPU, "
+                  f"{recorder.policies.drops(name)} dropped")
+        return True
+    GObject.timeout_add_seconds(5, on_branch_cpu)
+
+    # Queue levels, latency and branch drops on http://localhost:9108/metrics
+    telemetry = PipelineTelemetry(recorder.pipeline, jsonl_path="telemetry.jsonl")
+    metrics = PrometheusEndpoint(9108)
+    metrics.add(telemetry)
+    metrics.add(recorder.policies)
+    metrics.add(encoder_control)
+    metrics.start()
+    telemetry.start()
+
     # Run main loop to handle the pipeline events
     loop = GObject.MainLoop()
     # You could integrate external triggers here, e.g., timers or user input to start/stop recording:
@@ -272,4 +320,7 @@ if __name__ == "__main__":
         loop.run()
     except KeyboardInterrupt:
         print("Interrupted by user, stopping...")
+        encoder_control.stop()
+        telemetry.stop()
+        metrics.stop()
         recorder.stop_pipeline()
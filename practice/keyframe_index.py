@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+키프레임 시크 인덱스 (사이드카 파일)
+— 파일을 한 번 훑어서 비디오 키프레임의 PTS 와 바이트 오프셋을 <파일>.kidx 에 저장
+  (헤더 + int64 배열 두 개, array.tofile / fromfile 로 그대로 읽고 씀)
+— 이후 시크/썸네일/구간 자르기는 컨테이너를 다시 파싱하지 않고 bisect 로 O(log n)
+— 오프셋: 디먹서가 pull 모드로 읽는 filesrc src pad 에 probe 를 걸어,
+  키프레임이 나오기 직전에 마지막으로 읽은 위치를 쓴다 (qtdemux/matroskademux 는 샘플 단위로 읽는다)
+— 빌드 처리량(MB/s) 보고
+
+    python keyframe_index.py clip-000.mp4 clip-001.mp4      # 인덱스 만들기(있으면 재사용)
+    python keyframe_index.py clip-000.mp4 --lookup 12.5
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_right
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+MAGIC = b"KIDX"
+VERSION = 1
+# magic, version, 원본 크기, 원본 mtime(ns), 키프레임 수, duration(ns)
+HEADER = struct.Struct("<4sIqqqq")
+
+
+def sidecar_path(path: str) -> str:
+    return path + ".kidx"
+
+
+class KeyframeIndex:
+
+    def __init__(self, path: str, pts: array, offsets: array, duration: int = -1) -> None:
+        self.path = path
+        self.pts = pts               # array('q'), 오름차순 ns
+        self.offsets = offsets       # array('q'), 같은 순서의 바이트 오프셋
+        self.duration = duration
+
+    def __len__(self) -> int:
+        return len(self.pts)
+
+    # ---------- 질의 ----------
+    def lookup(self, position: int) -> tuple[int, int] | None:
+        """
+        position(ns) 이전(같거나 앞)의 마지막 키프레임 (pts, offset). 맨 앞보다 앞이면 첫 키프레임.
+        키프레임이 하나도 없으면(소리만 있는 파일, 키프레임 플래그가 없는 스트림) None.
+        """
+        if not self.pts:
+            return None
+        i = max(0, bisect_right(self.pts, position) - 1)
+        return self.pts[i], self.offsets[i]
+
+    def next_after(self, position: int) -> tuple[int, int] | None:
+        i = bisect_right(self.pts, position)
+        return (self.pts[i], self.offsets[i]) if i < len(self.pts) else None
+
+    def span(self, start: int, stop: int) -> tuple[int, int]:
+        """[start, stop] 을 재인코딩 없이 자를 때의 키프레임 경계 (시작 pts, 끝 pts 또는 -1)"""
+        found = self.lookup(start)
+        if found is None:
+            raise ValueError(f"{self.path}: no keyframes in the index, cannot cut on keyframes")
+        first, _ = found
+        after = self.next_after(stop)
+        return first, after[0] if after else -1
+
+    def seek(self, pipeline: Gst.Element, position: int) -> bool:
+        """
+        position 직전 키프레임으로 정확히 시크 → 디코더가 버릴 프레임 없이 바로 출력.
+        인덱스가 비어 있으면 보통 시크(디먹서가 키프레임을 찾는다).
+        """
+        found = self.lookup(position)
+        if found is None:
+            return pipeline.seek_simple(Gst.Format.TIME, Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT, position)
+        return pipeline.seek_simple(Gst.Format.TIME, Gst.SeekFlags.FLUSH | Gst.SeekFlags.ACCURATE, found[0])
+
+    # ---------- 저장 / 불러오기 ----------
+    def save(self) -> None:
+        st = os.stat(self.path)
+        tmp = sidecar_path(self.path) + ".part"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, st.st_size, st.st_mtime_ns, len(self.pts), self.duration))
+            self.pts.tofile(f)
+            self.offsets.tofile(f)
+        os.replace(tmp, sidecar_path(self.path))
+
+    @classmethod
+    def load(cls, path: str) -> "KeyframeIndex | None":
+        """사이드카가 없거나 원본이 바뀌었으면 None"""
+        try:
+            st = os.stat(path)
+            with open(sidecar_path(path), "rb") as f:
+                magic, version, size, mtime, count, duration = HEADER.unpack(f.read(HEADER.size))
+                if magic != MAGIC or version != VERSION or size != st.st_size or mtime != st.st_mtime_ns:
+                    return None
+                pts, offsets = array("q"), array("q")
+                pts.fromfile(f, count)
+                offsets.fromfile(f, count)
+        except (OSError, EOFError, struct.error):
+            return None
+        return cls(path, pts, offsets, duration)
+
+    @classmethod
+    def open(cls, path: str) -> "KeyframeIndex":
+        return cls.load(path) or build(path)
+
+
+def build(path: str, save: bool = True) -> KeyframeIndex:
+    """filesrc ! parsebin 으로 비디오 스트림을 디코딩 없이 끝까지 읽어 인덱스를 만든다."""
+    Gst.init(None)
+    pipeline = Gst.Pipeline.new("kidx")
+    src = Gst.ElementFactory.make("filesrc")
+    src.set_property("location", path)
+    parse = Gst.ElementFactory.make("parsebin")
+    for e in (src, parse):
+        pipeline.add(e)
+    src.link(parse)
+
+    last_read = [0]
+    entries: list[tuple[int, int]] = []
+
+    def _on_read(_pad, info):
+        buf = info.get_buffer()
+        if buf is not None and buf.offset != Gst.BUFFER_OFFSET_NONE:
+            last_read[0] = buf.offset
+        return Gst.PadProbeReturn.OK
+
+    # pull 모드(getrange)와 push 모드 모두에서 읽은 위치를 본다
+    src.get_static_pad("src").add_probe(
+        Gst.PadProbeType.BUFFER | Gst.PadProbeType.PUSH | Gst.PadProbeType.PULL, _on_read)
+
+    def _on_keyframe(_pad, info):
+        buf = info.get_buffer()
+        if not buf.has_flags(Gst.BufferFlags.DELTA_UNIT) and buf.pts != Gst.CLOCK_TIME_NONE:
+            entries.append((buf.pts, last_read[0]))
+        return Gst.PadProbeReturn.OK
+
+    def _on_pad_added(_parse, pad):
+        caps = pad.get_current_caps() or pad.query_caps(None)
+        sink = Gst.ElementFactory.make("fakesink")
+        sink.set_property("sync", False)
+        pipeline.add(sink)
+        sink.sync_state_with_parent()
+        if caps.get_structure(0).get_name().startswith("video/"):
+            pad.add_probe(Gst.PadProbeType.BUFFER, _on_keyframe)
+        pad.link(sink.get_static_pad("sink"))
+
+    parse.connect("pad-added", _on_pad_added)
+
+    pipeline.set_state(Gst.State.PLAYING)
+    msg = pipeline.get_bus().timed_pop_filtered(
+        Gst.CLOCK_TIME_NONE, Gst.MessageType.EOS | Gst.MessageType.ERROR)
+    ok, duration = pipeline.query_duration(Gst.Format.TIME)
+    pipeline.set_state(Gst.State.NULL)
+    if msg.type == Gst.MessageType.ERROR:
+        err, dbg = msg.parse_error()
+        raise RuntimeError(f"{path}: {err.message} ({dbg or 'none'})")
+
+    entries.sort()
+    index = KeyframeIndex(path, array("q", (p for p, _ in entries)), array("q", (o for _, o in entries)),
+                          duration if ok else -1)
+    if save:
+        index.save()
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="build / query keyframe sidecar indexes")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--rebuild", action="store_true")
+    parser.add_argument("--lookup", type=float, default=None, help="seconds")
+    args = parser.parse_args()
+    Gst.init(None)
+
+    total_bytes, total_time = 0, 0.0
+    for path in args.files:
+        t0 = time.perf_counter()
+        index = None if args.rebuild else KeyframeIndex.load(path)
+        cached = index is not None
+        if index is None:
+            index = build(path)
+        elapsed = time.perf_counter() - t0
+        size = os.path.getsize(path)
+        if not cached:
+            total_bytes += size
+            total_time += elapsed
+        print(f"{path}: {len(index)} keyframes, sidecar {os.path.getsize(sidecar_path(path))} B, "
+              f"{'loaded' if cached else 'built'} in {elapsed * 1000:.1f} ms"
+              + ("" if cached else f" ({size / 1e6 / elapsed:.1f} MB/s)"))
+        if args.lookup is not None:
+            t0 = time.perf_counter()
+            found = index.lookup(int(args.lookup * Gst.SECOND))
+            per = time.perf_counter() - t0
+            if found is None:
+                print(f"  {args.lookup:.3f}s → no keyframes in this file")
+                continue
+            pts, offset = found
+            print(f"  {args.lookup:.3f}s → keyframe {pts / Gst.SECOND:.3f}s @ byte {offset} "
+                  f"({per * 1e6:.1f} µs)")
+    if total_time:
+        print(f"build throughput: {total_bytes / 1e6 / total_time:.1f} MB/s")
+    sys.exit(0)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+벤치마크/테스트용 로컬 미디어
+— 네트워크 URI(sintel_trailer-480p.webm, CCTV HLS) 대신 쓸 파일을 videotestsrc/audiotestsrc 로 생성
+— 한 번 만든 파일은 MEDIA_DIR 에 캐시해서 재사용
+— ThrottledHTTPServer: MEDIA_DIR 을 대역폭 제한(구간별로 바꿀 수 있음) + Range 지원으로 서빙
+"""
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+from media_cache import parse_range
+
+MEDIA_DIR = os.environ.get("GST_BENCH_MEDIA", os.path.join(tempfile.gettempdir(), "gst-bench-media"))
+
+
+def run_to_eos(pipeline: Gst.Pipeline, timeout: int = 300) -> None:
+    """PLAYING → EOS 까지 돌리고 NULL. 에러면 RuntimeError."""
+    if pipeline.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+        pipeline.set_state(Gst.State.NULL)
+        raise RuntimeError("Unable to set the pipeline to the playing state.")
+    bus = pipeline.get_bus()
+    msg = bus.timed_pop_filtered(timeout * Gst.SECOND, Gst.MessageType.ERROR | Gst.MessageType.EOS)
+    pipeline.set_state(Gst.State.NULL)
+    if msg is None:
+        raise RuntimeError(f"timed out after {timeout}s")
+    if msg.type == Gst.MessageType.ERROR:
+        err, dbg = msg.parse_error()
+        raise RuntimeError(f"{msg.src.get_name()}: {err.message} ({dbg or 'none'})")
+
+
+def generate(filename: str, description: str, force: bool = False) -> str:
+    """description 끝에 filesink 를 붙여 filename 을 만든다 (이미 있으면 그대로)."""
+    Gst.init(None)
+    os.makedirs(MEDIA_DIR, exist_ok=True)
+    path = os.path.join(MEDIA_DIR, filename)
+    if os.path.exists(path) and not force:
+        return path
+    tmp = path + ".part"
+    run_to_eos(Gst.parse_launch(f"{description} ! filesink location={tmp}"))
+    os.replace(tmp, path)
+    return path
+
+
+def webm_clip(seconds: int = 10, width: int = 854, height: int = 480, fps: int = 24) -> str:
+    """sintel_trailer-480p.webm 대역 (VP8 + Vorbis)"""
+    frames = seconds * fps
+    return generate(
+        f"clip-{width}x{height}-{fps}-{seconds}s.webm",
+        f"webmmux name=mux "
+        f"videotestsrc num-buffers={frames} pattern=smpte ! "
+        f"video/x-raw,width={width},height={height},framerate={fps}/1 ! "
+        f"vp8enc deadline=1 keyframe-max-dist={fps * 2} ! queue ! mux. "
+        f"audiotestsrc num-buffers={seconds * 44100 // 1024} samplesperbuffer=1024 ! "
+        f"audio/x-raw,rate=44100,channels=2 ! audioconvert ! vorbisenc ! queue ! mux. mux.")
+
+
+def mp4_clip(seconds: int = 10, width: int = 1280, height: int = 720, fps: int = 30,
+             gop: int = 30, name: str | None = None) -> str:
+    """CCTV 녹화 조각 대역 (H.264 MP4, 소리 없음)"""
+    frames = seconds * fps
+    return generate(
+        name or f"clip-{width}x{height}-{fps}-{seconds}s-gop{gop}.mp4",
+        f"videotestsrc num-buffers={frames} pattern=ball ! "
+        f"video/x-raw,width={width},height={height},framerate={fps}/1 ! "
+        f"x264enc tune=zerolatency speed-preset=ultrafast key-int-max={gop} ! h264parse ! mp4mux")
+
+
+def file_uri(path: str) -> str:
+    return Gst.filename_to_uri(os.path.abspath(path))
+
+
+# ---------- 대역폭 제한 HTTP 서버 ----------
+class _ThrottledHandler(http.server.SimpleHTTPRequestHandler):
+    """GET/HEAD + 단일 Range. 응답 본문은 서버의 현재 rate 에 맞춰 조금씩 보낸다."""
+
+    CHUNK = 16 * 1024
+
+    def __init__(self, request, client_address, server):
+        super().__init__(request, client_address, server, directory=server.directory)
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return None
+        size = os.path.getsize(path)
+        try:
+            byte_range = parse_range(self.headers.get("Range", ""), size)
+        except ValueError:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.end_headers()
+            return None
+        if byte_range:
+            start, end = byte_range
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            start, end = 0, size - 1
+            self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        f = open(path, "rb")
+        f.seek(start)
+        self._remaining = end - start + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        while self._remaining > 0:
+            data = source.read(min(self.CHUNK, self._remaining))
+            if not data:
+                break
+            self.server.throttle(len(data))
+            try:
+                outputfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                break
+            self._remaining -= len(data)
+            self.server.bytes_sent += len(data)
+
+
+class ThrottledHTTPServer(http.server.ThreadingHTTPServer):
+    """
+    directory 를 http://127.0.0.1:<port>/ 로 서빙. rate 는 전체 연결 합계 바이트/초 (0 = 무제한).
+    profile=[(초, rate), …] 를 주면 시작 후 그 순서대로 rate 를 바꾸고 마지막 구간을 유지한다.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, directory: str = MEDIA_DIR, rate: float = 0, port: int = 0,
+                 profile: list[tuple[float, float]] | None = None) -> None:
+        super().__init__(("127.0.0.1", port), _ThrottledHandler)
+        self.directory = directory
+        self.rate = rate
+        self.profile = profile
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._next_send = time.monotonic()
+        self._started = None
+        self._thread = None
+
+    def url(self, filename: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/{os.path.basename(filename)}"
+
+    def current_rate(self) -> float:
+        if not self.profile or self._started is None:
+            return self.rate
+        elapsed = time.monotonic() - self._started
+        for seconds, rate in self.profile:
+            if elapsed < seconds:
+                return rate
+            elapsed -= seconds
+        return self.profile[-1][1]
+
+    def throttle(self, nbytes: int) -> None:
+        """토큰 버킷 대신 '다음 전송 가능 시각'을 당겨 가며 연결들이 대역폭을 나눠 쓴다."""
+        rate = self.current_rate()
+        if rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_send)
+            self._next_send = start + nbytes / rate
+        if start > now:
+            time.sleep(start - now)
+
+    def start(self) -> "ThrottledHTTPServer":
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self.serve_forever, name="throttled-http", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    Gst.init(None)
+    for p in (webm_clip(), mp4_clip()):
+        print(f"{os.path.getsize(p) / 1e6:8.2f} MB  {p}")
+    sys.exit(0)
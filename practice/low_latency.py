@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+저지연 라이브 화면 프로파일 + glass-to-glass 측정
+— 기본값(싱크 sync=true, 기본 queue 크기, 디코더 프레임 스레딩, rtspsrc latency 2 초)이 쌓여서
+  CCTV 화면이 실제보다 몇 초씩 늦어진다
+— LatencyProfile: 파이프라인 latency, 화면 싱크 sync / max-lateness, leaky 화면 queue(최신 프레임만),
+  소스 jitterbuffer latency, 디코더 스레딩을 한 곳에서 지정해서 적용
+— 측정: 로컬 videotestsrc 프레임 위쪽에 벽시계(µs)를 흑백 막대 코드로 찍어
+  인코딩 → RTP/UDP → 프로파일을 적용한 수신 파이프라인 → 싱크가 그릴 때(handoff) 다시 읽는다
+  → 종단 간 지연 p50/p95/p99
+
+    python low_latency.py                     # default vs low-latency 비교
+    python low_latency.py --seconds 20 --latency-ms 0 40 100
+"""
+import argparse
+import sys
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gst, GLib
+
+from queue_policy import QueuePolicy
+
+
+class LatencyProfile:
+    """
+    화면 브랜치 하나와 그 파이프라인에 적용할 지연 설정. None 인 항목은 건드리지 않는다.
+
+    latency_ms: pipeline.set_latency — 요소들이 보고한 latency 대신 이 값만큼만 싱크가 기다린다
+        (None = 보고된 latency 그대로. 소스 · 디코더 latency 보다 작으면 모든 프레임이 그만큼 늦게 도착한다)
+    max_lateness_ms: sync=true 일 때 이보다 늦은 프레임은 그리지 않고 버림
+        (latency_ms 를 정하면 그보다 커야 한다 — 아니면 프레임이 전부 버려진다)
+    queue: 화면 queue 정책 (leaky downstream 이면 밀릴 때 오래된 프레임부터 버림 = 최신 프레임만)
+    source_latency_ms: rtspsrc / rtpjitterbuffer 의 latency
+    decoder_threads: 디코더 스레드 수. 프레임 스레딩은 스레드 수만큼 프레임 지연이 생긴다
+    """
+
+    def __init__(self, name: str, latency_ms: int | None = None, sync: bool = True,
+                 max_lateness_ms: int | None = None, queue: QueuePolicy | None = None,
+                 source_latency_ms: int | None = None, decoder_threads: int | None = None) -> None:
+        if sync and latency_ms is not None and max_lateness_ms is not None:
+            shortfall = max(latency_ms, (source_latency_ms or 0) - latency_ms)
+            if max_lateness_ms <= shortfall:
+                raise ValueError(f"{name}: max_lateness_ms {max_lateness_ms} must exceed the configured "
+                                 f"latency ({latency_ms} ms, source {source_latency_ms} ms)")
+        self.name = name
+        self.latency_ms = latency_ms
+        self.sync = sync
+        self.max_lateness_ms = max_lateness_ms
+        self.queue = queue
+        self.source_latency_ms = source_latency_ms
+        self.decoder_threads = decoder_threads
+
+    # ---------- 적용 ----------
+    def apply(self, pipeline: Gst.Pipeline) -> None:
+        """파이프라인 latency 와 (지금/나중에 생기는) 소스 · 디코더 설정"""
+        if self.latency_ms is not None:
+            pipeline.set_latency(self.latency_ms * Gst.MSECOND)
+        it = pipeline.iterate_recurse()
+        while True:
+            ret, element = it.next()
+            if ret == Gst.IteratorResult.OK:
+                self._tune(element)
+            elif ret == Gst.IteratorResult.RESYNC:
+                it.resync()
+            else:
+                break
+        pipeline.connect("deep-element-added", lambda _p, _bin, element: self._tune(element))
+
+    def apply_queue(self, queue: Gst.Element) -> None:
+        if self.queue is not None:
+            self.queue.apply(queue)
+
+    def apply_sink(self, sink: Gst.Element) -> None:
+        """화면 싱크. autovideosink 같은 bin 이면 안쪽 실제 싱크가 생길 때 적용."""
+        if isinstance(sink, Gst.Bin) and not sink.find_property("max-lateness"):
+            sink.connect("deep-element-added", lambda _b, _sub, element: self._tune_sink(element))
+            for element in sink.iterate_sinks():
+                self._tune_sink(element)
+            return
+        self._tune_sink(sink)
+
+    def _tune_sink(self, sink: Gst.Element) -> None:
+        if not isinstance(sink, Gst.BaseSink):
+            return
+        sink.set_property("sync", self.sync)
+        if self.max_lateness_ms is not None:
+            sink.set_property("max-lateness", self.max_lateness_ms * Gst.MSECOND)
+            sink.set_property("qos", True)       # 늦은 프레임을 디코더가 미리 건너뛰게
+        if sink.find_property("drop") and sink.find_property("max-buffers"):
+            sink.set_property("drop", True)      # appsink: 최신 하나만
+            sink.set_property("max-buffers", 1)
+
+    def _tune(self, element: Gst.Element) -> None:
+        factory = element.get_factory()
+        if factory is None:
+            return
+        if self.source_latency_ms is not None and factory.get_name() in ("rtspsrc", "rtpjitterbuffer") \
+                and element.find_property("latency"):
+            element.set_property("latency", self.source_latency_ms)
+        if self.decoder_threads is not None and factory.list_is_type(Gst.ELEMENT_FACTORY_TYPE_DECODER):
+            if element.find_property("max-threads"):
+                element.set_property("max-threads", self.decoder_threads)
+            if element.find_property("thread-type"):
+                Gst.util_set_object_arg(element, "thread-type", "slice")   # 프레임 스레딩 지연 없음
+
+
+# 지금 practice/ 화면 브랜치와 같은 설정 (비교 기준)
+DEFAULT = LatencyProfile("default")
+# 최신 프레임 우선: 싱크는 보고된 latency(jitterbuffer 50 ms + 디코더)만큼 기다리고
+# 그보다 40 ms 넘게 늦으면 버림, queue 는 한 프레임
+LOW_LATENCY = LatencyProfile(
+    "low-latency", latency_ms=None, sync=True, max_lateness_ms=40,
+    queue=QueuePolicy(leaky="downstream", max_buffers=1, max_bytes=0, max_time=0, priority=-5),
+    source_latency_ms=50, decoder_threads=1)
+# 도착하는 대로 그림 (clock 무시). 지연은 가장 낮지만 움직임이 고르지 않을 수 있다
+AS_FAST_AS_POSSIBLE = LatencyProfile(
+    "no-sync", sync=False,
+    queue=QueuePolicy(leaky="downstream", max_buffers=1, max_bytes=0, max_time=0, priority=-5),
+    source_latency_ms=0, decoder_threads=1)
+
+
+# ---------- 막대 코드 타임스탬프 ----------
+BITS = 48              # µs, 약 8.9 년 주기
+BAR_WIDTH = 12         # 한 비트의 가로 픽셀 (인코딩 손실에 견디도록 넓게)
+BAR_HEIGHT = 16
+WIDTH, HEIGHT, FPS = 640, 480, 30
+
+
+def _now_us() -> int:
+    return time.clock_gettime_ns(time.CLOCK_MONOTONIC) // 1000 % (1 << BITS)
+
+
+def stamp(frame: bytearray, value: int, stride: int = WIDTH) -> None:
+    """I420 Y 평면 맨 위 BAR_HEIGHT 줄에 value 를 흑(0)/백(1) 막대로"""
+    for bit in range(BITS):
+        luma = 235 if value >> (BITS - 1 - bit) & 1 else 16
+        bar = bytes((luma,)) * BAR_WIDTH
+        for row in range(BAR_HEIGHT):
+            start = row * stride + bit * BAR_WIDTH
+            frame[start:start + BAR_WIDTH] = bar
+
+
+def read_stamp(data: bytes, stride: int = WIDTH) -> int:
+    """막대 가운데 줄 가운데 픽셀만 보고 문턱값 128"""
+    row = BAR_HEIGHT // 2 * stride
+    value = 0
+    for bit in range(BITS):
+        value = value << 1 | (data[row + bit * BAR_WIDTH + BAR_WIDTH // 2] > 128)
+    return value
+
+
+# ---------- 측정 ----------
+class GlassToGlass:
+    """
+    송신: videotestsrc is-live ! appsink  → (파이썬에서 찍기) →  appsrc ! x264enc ! rtph264pay ! udpsink
+    수신: udpsrc ! rtpjitterbuffer ! depay ! h264parse ! avdec_h264 ! queue ! videoconvert ! fakesink
+    수신 쪽에 profile 을 적용하고, fakesink 가 프레임을 그리는 시점(handoff)에 읽은 값과 비교한다.
+    """
+
+    def __init__(self, profile: LatencyProfile, port: int = 5600) -> None:
+        self.profile = profile
+        self.latencies_ms: list[float] = []
+        self.unreadable = 0
+        caps = f"video/x-raw,format=I420,width={WIDTH},height={HEIGHT},framerate={FPS}/1"
+        self.capture = Gst.parse_launch(
+            f"videotestsrc is-live=true pattern=ball ! {caps} ! "
+            f"appsink name=cap emit-signals=true max-buffers=1 drop=true sync=false")
+        self.sender = Gst.parse_launch(
+            f"appsrc name=src is-live=true format=time do-timestamp=true caps=\"{caps}\" ! "
+            f"x264enc tune=zerolatency speed-preset=ultrafast key-int-max={FPS} ! "
+            f"rtph264pay config-interval=-1 pt=96 ! udpsink host=127.0.0.1 port={port} sync=false")
+        self.receiver = Gst.parse_launch(
+            f"udpsrc port={port} caps=\"application/x-rtp,media=video,encoding-name=H264,"
+            f"clock-rate=90000,payload=96\" ! rtpjitterbuffer ! rtph264depay ! h264parse ! "
+            f"avdec_h264 ! queue name=display_queue ! videoconvert ! video/x-raw,format=I420 ! "
+            f"fakesink name=display signal-handoffs=true")
+        self.appsrc = self.sender.get_by_name("src")
+        self.capture.get_by_name("cap").connect("new-sample", self._on_capture)
+        display = self.receiver.get_by_name("display")
+        display.connect("handoff", self._on_render)
+        profile.apply(self.receiver)
+        profile.apply_queue(self.receiver.get_by_name("display_queue"))
+        profile.apply_sink(display)
+
+    def _on_capture(self, appsink):
+        sample = appsink.emit("pull-sample")
+        ok, info = sample.get_buffer().map(Gst.MapFlags.READ)
+        if not ok:
+            return Gst.FlowReturn.OK
+        frame = bytearray(info.data)
+        sample.get_buffer().unmap(info)
+        stamp(frame, _now_us())
+        self.appsrc.emit("push-buffer", Gst.Buffer.new_wrapped(bytes(frame)))
+        return Gst.FlowReturn.OK
+
+    def _on_render(self, _sink, buf, _pad):
+        now = _now_us()
+        ok, info = buf.map(Gst.MapFlags.READ)
+        if not ok:
+            return
+        sent = read_stamp(info.data)
+        buf.unmap(info)
+        delta = (now - sent) % (1 << BITS)
+        if delta > 10_000_000:            # 10 초 넘게 = 잘못 읽음
+            self.unreadable += 1
+            return
+        self.latencies_ms.append(delta / 1000)
+
+    def run(self, seconds: float) -> dict:
+        for p in (self.receiver, self.sender, self.capture):
+            if p.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+                raise RuntimeError(f"{self.profile.name}: unable to set PLAYING")
+        loop = GLib.MainLoop()
+        GLib.timeout_add(int(seconds * 1000), loop.quit)
+        loop.run()
+        for p in (self.capture, self.sender, self.receiver):
+            p.set_state(Gst.State.NULL)
+        return self.report()
+
+    def report(self) -> dict:
+        values = sorted(self.latencies_ms[FPS:])           # 첫 1 초(협상 · 첫 키프레임)는 제외
+        if not values:
+            raise RuntimeError(f"{self.profile.name}: no frames rendered "
+                               f"({len(self.latencies_ms)} total, {self.unreadable} unreadable) — "
+                               f"max-lateness below the latency drops every frame")
+        pct = lambda q: values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+        return {"profile": self.profile.name, "frames": len(values), "unreadable": self.unreadable,
+                "p50_ms": pct(0.5), "p95_ms": pct(0.95), "p99_ms": pct(0.99),
+                "max_ms": values[-1] if values else 0.0}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="low-latency display profile + glass-to-glass latency")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--latency-ms", type=int, nargs="*", default=[],
+                        help="extra low-latency runs with these pipeline latencies")
+    args = parser.parse_args()
+
+    Gst.init(None)
+    profiles = [DEFAULT, LOW_LATENCY, AS_FAST_AS_POSSIBLE]
+    for ms in args.latency_ms:
+        # 설정한 latency(또는 그보다 긴 소스 latency) 위에 LOW_LATENCY 와 같은 40 ms 여유
+        lateness = max(ms, LOW_LATENCY.source_latency_ms) + LOW_LATENCY.max_lateness_ms
+        profiles.append(LatencyProfile(f"low-latency/{ms}ms", latency_ms=ms, sync=True, max_lateness_ms=lateness,
+                                       queue=LOW_LATENCY.queue, source_latency_ms=LOW_LATENCY.source_latency_ms,
+                                       decoder_threads=1))
+    for i, profile in enumerate(profiles):
+        r = GlassToGlass(profile, port=5600 + i).run(args.seconds)
+        print(f"{r['profile']:>20}: p50 {r['p50_ms']:7.1f} ms  p95 {r['p95_ms']:7.1f} ms  "
+              f"p99 {r['p99_ms']:7.1f} ms  max {r['max_ms']:7.1f} ms  "
+              f"({r['frames']} frames, {r['unreadable']} unreadable)")
+    sys.exit(0)
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+원격 미디어 로컬 디스크 캐시 (playbin 앞에 두는 캐싱 HTTP 프록시)
+— cached_uri(uri) 가 돌려주는 http://127.0.0.1:<port>/<sha1(uri)> 를 playbin 에 주면
+  프록시가 원본을 블록(기본 1 MiB) 단위 Range 요청으로 받아 디스크에 저장
+— 다시 재생하면 디스크에서, 일부만 받아 둔 파일로 seek 하면 없는 블록만 원본에서
+— 바이트 예산을 넘으면 가장 오래 안 쓴 블록부터 지운다 (LRU)
+— 블록 hit/miss, 원본/캐시 바이트, 제거 수 통계
+
+    python media_cache.py              # 대역폭 제한 로컬 서버를 원본으로 두 번 재생 + seek
+"""
+import hashlib
+import http.server
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+
+CACHE_DIR = os.environ.get("GST_MEDIA_CACHE", os.path.join(tempfile.gettempdir(), "gst-media-cache"))
+BLOCK_SIZE = 1 << 20
+DEFAULT_BUDGET = 2 << 30
+
+
+def cache_key(uri: str) -> str:
+    return hashlib.sha1(uri.encode()).hexdigest()
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """단일 `Range: bytes=` 헤더 → (start, end) (end 포함). 헤더가 없거나 형식이 다르면 None (전체 200).
+    만족할 수 없는 범위(start >= size, end < start)는 ValueError → 호출한 쪽이 416 으로 답한다.
+    local_media.ThrottledHTTPServer 도 같은 함수를 쓴다."""
+    match = re.match(r"bytes=(\d*)-(\d*)$", header)
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    if match.group(1):
+        start = int(match.group(1))
+        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+    else:                                            # bytes=-N (마지막 N 바이트)
+        start, end = max(0, size - int(match.group(2))), size - 1
+    if start >= size or end < start:
+        raise ValueError(f"unsatisfiable range {header!r} for {size} bytes")
+    return start, end
+
+
+class BlockCache:
+    """<dir>/<key>/meta.json + <dir>/<key>/<블록 번호> 파일들. LRU 는 메모리에, 시작할 때 디스크에서 복원."""
+
+    def __init__(self, directory: str = CACHE_DIR, budget: int = DEFAULT_BUDGET) -> None:
+        self.directory = directory
+        self.budget = budget
+        self.total = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0,
+                      "bytes_from_cache": 0, "bytes_from_upstream": 0}
+        self._lru: OrderedDict[tuple[str, int], int] = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        blocks = []
+        for key in os.listdir(self.directory):
+            sub = os.path.join(self.directory, key)
+            if not os.path.isdir(sub):
+                continue
+            for name in os.listdir(sub):
+                if name.isdigit():
+                    st = os.stat(os.path.join(sub, name))
+                    blocks.append((st.st_atime, key, int(name), st.st_size))
+        for _, key, index, size in sorted(blocks):
+            self._lru[(key, index)] = size
+            self.total += size
+
+    def _path(self, key: str, index: int | None = None) -> str:
+        return os.path.join(self.directory, key, "meta.json" if index is None else str(index))
+
+    # ---------- 메타데이터 ----------
+    def meta(self, key: str) -> dict | None:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set_meta(self, key: str, meta: dict) -> None:
+        os.makedirs(os.path.join(self.directory, key), exist_ok=True)
+        tmp = self._path(key) + ".part"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._path(key))
+
+    # ---------- 블록 ----------
+    def get(self, key: str, index: int) -> bytes | None:
+        with self._lock:
+            if (key, index) not in self._lru:
+                return None
+            self._lru.move_to_end((key, index))
+        try:
+            with open(self._path(key, index), "rb") as f:
+                data = f.read()
+        except OSError:
+            with self._lock:
+                self.total -= self._lru.pop((key, index), 0)
+            return None
+        with self._lock:
+            self.stats["hits"] += 1
+            self.stats["bytes_from_cache"] += len(data)
+        return data
+
+    def put(self, key: str, index: int, data: bytes) -> None:
+        path = self._path(key, index)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".part", "wb") as f:
+            f.write(data)
+        os.replace(path + ".part", path)
+        with self._lock:
+            self.stats["misses"] += 1
+            self.stats["bytes_from_upstream"] += len(data)
+            self.total += len(data) - self._lru.pop((key, index), 0)
+            self._lru[(key, index)] = len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self.total > self.budget and len(self._lru) > 1:
+            (key, index), size = self._lru.popitem(last=False)
+            self.total -= size
+            self.stats["evictions"] += 1
+            try:
+                os.remove(self._path(key, index))
+            except OSError:
+                pass
+
+    def summary(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {**self.stats, "hit_ratio": self.stats["hits"] / lookups if lookups else 0.0,
+                    "cached_bytes": self.total, "blocks": len(self._lru)}
+
+
+class _ProxyHandler(http.server.BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._serve(body=False)
+
+    def do_GET(self):
+        self._serve(body=True)
+
+    def _serve(self, body: bool) -> None:
+        server: CachingProxy = self.server
+        key = self.path.lstrip("/").split("?", 1)[0]
+        try:
+            meta = server.describe(key)
+        except KeyError:
+            self.send_error(404)
+            return
+        except OSError as e:
+            self.send_error(502, str(e))
+            return
+
+        size = meta["size"]
+        try:
+            byte_range = parse_range(self.headers.get("Range", ""), size)
+        except ValueError:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.end_headers()
+            return
+        if byte_range:
+            start, end = byte_range
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            start, end = 0, size - 1
+            self.send_response(200)
+        self.send_header("Content-Type", meta.get("type", "application/octet-stream"))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if not body:
+            return
+
+        block = server.block_size
+        pos = start
+        try:
+            while pos <= end:
+                index = pos // block
+                data = server.block(key, index)
+                chunk = data[pos - index * block:end - index * block + 1]
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                pos += len(chunk)
+        except OSError:
+            pass                     # playbin 이 seek 하면서 연결을 끊거나 원본이 끊긴 경우
+
+
+class CachingProxy(http.server.ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, directory: str = CACHE_DIR, budget: int = DEFAULT_BUDGET,
+                 block_size: int = BLOCK_SIZE, port: int = 0) -> None:
+        super().__init__(("127.0.0.1", port), _ProxyHandler)
+        self.cache = BlockCache(directory, budget)
+        self.block_size = block_size
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._thread = None
+
+    def uri(self, remote: str) -> str:
+        """remote 대신 playbin 에 줄 로컬 URI"""
+        key = cache_key(remote)
+        if self.cache.meta(key) is None:
+            self.cache.set_meta(key, {"uri": remote})
+        return f"http://127.0.0.1:{self.server_address[1]}/{key}"
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def describe(self, key: str) -> dict:
+        """크기/타입을 모르면 첫 블록을 받아 오면서 알아낸다."""
+        meta = self.cache.meta(key)
+        if meta is None:
+            raise KeyError(key)
+        if "size" not in meta:
+            self.block(key, 0)
+            meta = self.cache.meta(key)
+        return meta
+
+    def block(self, key: str, index: int) -> bytes:
+        data = self.cache.get(key, index)
+        if data is not None:
+            return data
+        with self._lock_for(key):        # 같은 파일을 동시에 두 번 받지 않도록
+            data = self.cache.get(key, index)
+            if data is not None:
+                return data
+            return self._fetch(key, index)
+
+    def _fetch(self, key: str, index: int) -> bytes:
+        meta = self.cache.meta(key)
+        first = index * self.block_size
+        request = urllib.request.Request(
+            meta["uri"], headers={"Range": f"bytes={first}-{first + self.block_size - 1}"})
+        with urllib.request.urlopen(request, timeout=30) as resp:
+            if "size" not in meta:
+                content_range = resp.headers.get("Content-Range", "")
+                size = int(content_range.rsplit("/", 1)[1]) if "/" in content_range \
+                    else int(resp.headers.get("Content-Length", 0))
+                meta.update(size=size, type=resp.headers.get("Content-Type", "application/octet-stream"))
+                self.cache.set_meta(key, meta)
+            if resp.status == 206:
+                data = resp.read()
+                self.cache.put(key, index, data)
+                return data
+            # Range 를 모르는 원본: 처음부터 받으면서 모든 블록을 채운다
+            wanted = b""
+            i = 0
+            while True:
+                data = resp.read(self.block_size)
+                if not data:
+                    break
+                self.cache.put(key, i, data)
+                if i == index:
+                    wanted = data
+                i += 1
+            return wanted
+
+    def start(self) -> "CachingProxy":
+        self._thread = threading.Thread(target=self.serve_forever, name="media-cache", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+_default: CachingProxy | None = None
+_default_lock = threading.Lock()
+
+
+def cached_uri(uri: str) -> str:
+    """http(s) URI 면 프로세스 공용 프록시를 띄우고 캐시 URI 로 바꾼다. 그 외(file:// 등)는 그대로."""
+    global _default
+    if not uri.startswith(("http://", "https://")) or os.environ.get("GST_MEDIA_CACHE_DISABLE"):
+        return uri
+    with _default_lock:
+        if _default is None:
+            _default = CachingProxy().start()
+    return _default.uri(uri)
+
+
+def default_stats() -> dict:
+    return _default.cache.summary() if _default else {}
+
+
+# ---------- 데모: 대역폭 제한 로컬 서버를 원본으로 ----------
+if __name__ == "__main__":
+    import gi
+
+    gi.require_version("Gst", "1.0")
+    from gi.repository import Gst
+
+    import local_media
+
+    Gst.init(None)
+    clip = local_media.webm_clip()
+    origin = local_media.ThrottledHTTPServer(rate=os.path.getsize(clip) / 4).start()   # 약 4 초에 전송
+    proxy = CachingProxy(os.path.join(tempfile.mkdtemp(), "cache"), block_size=256 * 1024).start()
+    uri = proxy.uri(origin.url(clip))
+
+    def play(seek_to: float | None = None) -> float:
+        playbin = Gst.ElementFactory.make("playbin", None)
+        playbin.set_property("uri", uri)
+        playbin.set_property("video-sink", Gst.ElementFactory.make("fakesink", None))
+        playbin.set_property("audio-sink", Gst.ElementFactory.make("fakesink", None))
+        for sink in ("video-sink", "audio-sink"):
+            playbin.get_property(sink).set_property("sync", False)
+        t0 = time.monotonic()
+        playbin.set_state(Gst.State.PAUSED)
+        playbin.get_state(Gst.CLOCK_TIME_NONE)
+        if seek_to is not None:
+            playbin.seek_simple(Gst.Format.TIME, Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT,
+                                int(seek_to * Gst.SECOND))
+        playbin.set_state(Gst.State.PLAYING)
+        msg = playbin.get_bus().timed_pop_filtered(
+            120 * Gst.SECOND, Gst.MessageType.EOS | Gst.MessageType.ERROR)
+        playbin.set_state(Gst.State.NULL)
+        if msg is None or msg.type == Gst.MessageType.ERROR:
+            raise RuntimeError(msg.parse_error()[0].message if msg else "timed out")
+        return time.monotonic() - t0
+
+    print(f"seek into uncached middle: {play(seek_to=6.0):6.2f} s  {proxy.cache.summary()}")
+    print(f"first full play (partly cached): {play():6.2f} s  {proxy.cache.summary()}")
+    print(f"second play (cached):            {play():6.2f} s  {proxy.cache.summary()}")
+    proxy.stop()
+    origin.stop()
+    sys.exit(0)
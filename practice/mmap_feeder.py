@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+mmap 한 원시 파일을 appsrc 로 복사 없이 내보내기
+— ch8 의 appsrc 는 파이썬에서 만든 샘플만 넣는다. 녹음/원시 영상 덤프를 다시 틀려면
+  파일 → bytes → Gst.Buffer 로 두 번 복사해야 한다
+— 파일을 mmap 하고 gst_buffer_new_wrapped_full 로 매핑의 한 조각을 가리키는 버퍼를 만들어
+  gst_app_src_push_buffer 로 넘긴다 (ctypes: PyGObject 로 부르면 bytes 를 C 배열로 복사하므로)
+  ctypes 로 라이브러리를 못 찾으면 복사 방식으로
+— PTS/duration 은 caps 에서: 오디오는 rate 와 bpf, 영상은 framerate 와 프레임 크기
+— 읽을 구간 앞쪽은 MADV_WILLNEED, 지나간 구간은 MADV_DONTNEED → RSS 가 파일 크기만큼 늘지 않는다
+  (ACCESS_COPY 매핑이고 쓰지 않으므로, 아직 쓰이는 버퍼가 가리키는 페이지는 파일에서 다시 읽힌다)
+— loop (PTS 는 계속 증가), seek (appsrc seek-data 또는 seek())
+— 벤치마크: 복사 없는 방식 vs 복사 방식 GB/s 와 RSS 추이
+
+    python mmap_feeder.py --size-mb 1024 --seconds 10
+"""
+import argparse
+import ctypes
+import ctypes.util
+import json
+import mmap
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GstAudio", "1.0")
+gi.require_version("GstVideo", "1.0")
+from gi.repository import Gst, GstAudio, GstVideo, GLib
+
+GST_MEMORY_FLAG_READONLY = 1 << 1
+FLOW_OK, FLOW_FLUSHING = 0, -2
+JOIN_TIMEOUT = 5.0
+
+
+# ---------- ctypes ----------
+class _GstMiniObject(ctypes.Structure):
+    _fields_ = [("type", ctypes.c_size_t), ("refcount", ctypes.c_int), ("lockstate", ctypes.c_int),
+                ("flags", ctypes.c_uint), ("copy", ctypes.c_void_p), ("dispose", ctypes.c_void_p),
+                ("free", ctypes.c_void_p), ("priv_uint", ctypes.c_uint), ("priv_pointer", ctypes.c_void_p)]
+
+
+class _GstBuffer(ctypes.Structure):
+    _fields_ = [("mini_object", _GstMiniObject), ("pool", ctypes.c_void_p),
+                ("pts", ctypes.c_uint64), ("dts", ctypes.c_uint64), ("duration", ctypes.c_uint64),
+                ("offset", ctypes.c_uint64), ("offset_end", ctypes.c_uint64)]
+
+
+def _load_native():
+    """(gst_buffer_new_wrapped_full, gst_app_src_push_buffer) 또는 None"""
+    try:
+        gst = ctypes.CDLL(ctypes.util.find_library("gstreamer-1.0") or "libgstreamer-1.0.so.0")
+        app = ctypes.CDLL(ctypes.util.find_library("gstapp-1.0") or "libgstapp-1.0.so.0")
+    except OSError:
+        return None
+    wrap = gst.gst_buffer_new_wrapped_full
+    wrap.restype = ctypes.POINTER(_GstBuffer)
+    wrap.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_size_t, ctypes.c_size_t,
+                     ctypes.c_void_p, ctypes.c_void_p]
+    push = app.gst_app_src_push_buffer
+    push.restype = ctypes.c_int
+    push.argtypes = [ctypes.c_void_p, ctypes.POINTER(_GstBuffer)]
+    return wrap, push
+
+
+def _gobject_pointer(obj) -> int:
+    get = ctypes.pythonapi.PyCapsule_GetPointer
+    get.restype = ctypes.c_void_p
+    get.argtypes = [ctypes.py_object, ctypes.c_char_p]
+    return get(obj.__gpointer__, None)
+
+
+def _timing(caps: Gst.Caps) -> tuple[int, int, int]:
+    """caps → (단위 바이트, 초당 단위 분자, 분모). 오디오 단위 = 샘플 프레임, 영상 = 프레임."""
+    name = caps.get_structure(0).get_name()
+    if name == "audio/x-raw":
+        info = GstAudio.AudioInfo.new_from_caps(caps)
+        return info.bpf, info.rate, 1
+    if name == "video/x-raw":
+        info = GstVideo.VideoInfo.new_from_caps(caps)
+        return info.size, info.fps_n, info.fps_d
+    raise ValueError(f"raw audio/video caps required, got {name}")
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * mmap.PAGESIZE
+
+
+class MmapFeeder:
+
+    def __init__(self, appsrc: Gst.Element, path: str, caps: Gst.Caps, loop: bool = False,
+                 chunk_bytes: int = 1 << 20, readahead: int = 64 << 20, zero_copy: bool = True) -> None:
+        """
+        chunk_bytes: 오디오 버퍼 크기(단위 바이트의 배수로 내림). 영상은 항상 한 프레임.
+        readahead: 앞으로 읽을 구간 힌트 크기, 같은 크기만큼 뒤쪽은 매핑에서 내린다
+        zero_copy: False 면 복사 방식 (비교용)
+        """
+        self.appsrc = appsrc
+        self.path = path
+        self.loop = loop
+        self.readahead = readahead
+        self.unit, self.rate_n, self.rate_d = _timing(caps)
+        video = caps.get_structure(0).get_name() == "video/x-raw"
+        self.chunk = self.unit if video else max(self.unit, chunk_bytes // self.unit * self.unit)
+        self.native = _load_native() if zero_copy else None
+        self.pushed_bytes = 0
+        self.pushed_buffers = 0
+
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self.size = size // self.unit * self.unit         # 남는 꼬리(한 단위 미만)는 버림
+        if not self.size:
+            raise ValueError(f"{path}: smaller than one unit ({self.unit} bytes)")
+        # ACCESS_COPY: 쓰기 가능한 private 매핑이라 ctypes 로 주소를 얻을 수 있고, 파일은 바뀌지 않는다
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_COPY)
+        self._anchor = ctypes.c_char.from_buffer(self._mm)    # 살아 있는 동안 매핑을 닫지 못하게
+        self._base = ctypes.addressof(self._anchor)
+        self._appsrc_ptr = _gobject_pointer(appsrc) if self.native else None
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._mm.madvise(mmap.MADV_SEQUENTIAL)
+
+        self._lock = threading.Lock()
+        self._offset = 0
+        self._base_units = 0           # loop 로 지나간 단위 수 (PTS 가 되돌아가지 않게)
+        self._hinted = 0               # WILLNEED 를 건 끝
+        self._dropped = 0              # DONTNEED 를 건 끝
+        self._running = False
+        self._thread: threading.Thread | None = None
+
+        appsrc.set_property("caps", caps)
+        appsrc.set_property("format", Gst.Format.TIME)
+        appsrc.set_property("block", True)                 # 가득 차면 push 가 기다린다
+        appsrc.set_property("max-bytes", 4 * self.chunk)
+        Gst.util_set_object_arg(appsrc, "stream-type", "seekable")
+        appsrc.connect("seek-data", self._on_seek_data)
+
+    # ---------- 위치 ----------
+    def _time(self, units: int) -> int:
+        if not self.rate_n:
+            return Gst.CLOCK_TIME_NONE
+        return Gst.util_uint64_scale(units * self.rate_d, Gst.SECOND, self.rate_n)
+
+    def seek(self, position: int) -> None:
+        """position(ns) 부터 다시. PTS 도 position 부터."""
+        units = Gst.util_uint64_scale(position, self.rate_n, Gst.SECOND * self.rate_d) if self.rate_n else 0
+        with self._lock:
+            self._offset = min(units * self.unit, self.size - self.unit)
+            self._base_units = 0
+            self._hinted = self._dropped = self._offset // mmap.PAGESIZE * mmap.PAGESIZE
+
+    def _on_seek_data(self, _appsrc, offset) -> bool:
+        self.seek(offset)             # format=TIME 이면 offset 은 ns
+        return True
+
+    def _advise(self, offset: int) -> None:
+        if not hasattr(mmap, "MADV_WILLNEED"):
+            return
+        if offset + self.readahead // 2 >= self._hinted:
+            start = offset // mmap.PAGESIZE * mmap.PAGESIZE
+            length = min(self.readahead, len(self._mm) - start)
+            if length > 0:
+                self._mm.madvise(mmap.MADV_WILLNEED, start, length)
+            self._hinted = start + self.readahead
+        behind = (offset - self.readahead) // mmap.PAGESIZE * mmap.PAGESIZE
+        if behind - self._dropped >= self.readahead:
+            self._mm.madvise(mmap.MADV_DONTNEED, self._dropped, behind - self._dropped)
+            self._dropped = behind
+
+    # ---------- push ----------
+    def _next(self) -> tuple[int, int, int] | None:
+        """(파일 오프셋, 크기, PTS 단위) 또는 끝이면 None"""
+        with self._lock:
+            if self._offset >= self.size:
+                if not self.loop:
+                    return None
+                self._base_units += self.size // self.unit
+                self._offset = 0
+                self._hinted = self._dropped = 0
+            offset = self._offset
+            size = min(self.chunk, self.size - offset)
+            self._offset += size
+            units = self._base_units + offset // self.unit
+            self._advise(offset)
+        return offset, size, units
+
+    def _push(self, offset: int, size: int, units: int) -> int:
+        pts = self._time(units)
+        duration = self._time(units + size // self.unit) - pts if self.rate_n else Gst.CLOCK_TIME_NONE
+        if self.native:
+            wrap, push = self.native
+            buf = wrap(GST_MEMORY_FLAG_READONLY, self._base + offset, size, 0, size, None, None)
+            buf.contents.pts = pts
+            buf.contents.duration = duration
+            buf.contents.offset = units
+            return push(self._appsrc_ptr, buf)           # 소유권이 appsrc 로 넘어간다
+        buf = Gst.Buffer.new_wrapped(self._mm[offset:offset + size])
+        buf.pts, buf.duration, buf.offset = pts, duration, units
+        return int(self.appsrc.emit("push-buffer", buf))
+
+    def _run(self) -> None:
+        while self._running:
+            item = self._next()
+            if item is None:
+                self.appsrc.emit("end-of-stream")
+                return
+            ret = self._push(*item)
+            if ret == FLOW_FLUSHING:
+                if not self._running:
+                    return
+                time.sleep(0.001)      # 시크 중 — seek-data 가 새 위치를 넣어 준다
+                continue
+            if ret != FLOW_OK:
+                return
+            self.pushed_bytes += item[1]
+            self.pushed_buffers += 1
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="mmap-feeder", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> bool:
+        """
+        push 스레드를 끝낸다. block=True 로 가득 찬 appsrc 에서 기다리는 push 는
+        end-of-stream 으로 깨운다. 스레드가 끝났으면 True.
+        """
+        self._running = False
+        if self._thread is None:
+            return True
+        if self._thread.is_alive():
+            self.appsrc.emit("end-of-stream")
+            self._thread.join(timeout=JOIN_TIMEOUT)
+        return not self._thread.is_alive()
+
+    def close(self) -> None:
+        """
+        파이프라인을 NULL 로 내린 뒤에 부른다 (그래야 매핑을 가리키는 버퍼가 남지 않는다).
+        스레드가 아직 살아 있으면 매핑을 쓰고 있을 수 있으므로 풀지 않고 남겨 둔다.
+        """
+        if not self.stop():
+            print(f"mmap-feeder: push thread still running, leaving {self.path} mapped", file=sys.stderr)
+            return
+        del self._anchor
+        self._mm.close()
+        self._file.close()
+
+
+# ---------- 벤치마크 ----------
+BENCH_CAPS = "audio/x-raw,format=S16LE,rate=48000,channels=2,layout=interleaved"
+
+
+def make_file(size_mb: int) -> str:
+    path = os.path.join(tempfile.gettempdir(), f"mmap-feeder-{size_mb}mb.raw")
+    if os.path.exists(path) and os.path.getsize(path) == size_mb << 20:
+        return path
+    block = os.urandom(1 << 20)
+    with open(path + ".part", "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+    os.replace(path + ".part", path)
+    return path
+
+
+def run_one(path: str, zero_copy: bool, seconds: float, chunk: int, sink: str) -> dict:
+    Gst.init(None)
+    pipeline = Gst.parse_launch(f"appsrc name=src ! {sink}")
+    feeder = MmapFeeder(pipeline.get_by_name("src"), path, Gst.Caps.from_string(BENCH_CAPS),
+                        loop=True, chunk_bytes=chunk, zero_copy=zero_copy)
+    rss = [_rss_bytes()]
+    pipeline.set_state(Gst.State.PLAYING)
+    feeder.start()
+    t0 = time.monotonic()
+    loop = GLib.MainLoop()
+
+    def sample():
+        rss.append(_rss_bytes())
+        return True
+
+    GLib.timeout_add(200, sample)
+    GLib.timeout_add(int(seconds * 1000), loop.quit)
+    loop.run()
+    elapsed = time.monotonic() - t0
+    pushed = feeder.pushed_bytes
+    feeder.stop()
+    pipeline.set_state(Gst.State.NULL)
+    feeder.close()
+    return {"mode": "zero-copy" if feeder.native else "copy", "gb_per_s": pushed / elapsed / 1e9,
+            "buffers": feeder.pushed_buffers, "rss_start_mb": rss[0] / 1e6,
+            "rss_max_mb": max(rss) / 1e6, "rss_end_mb": rss[-1] / 1e6}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="mmap-backed zero-copy appsrc feeder benchmark")
+    parser.add_argument("--file", help="raw S16LE 48 kHz stereo file (default: generated)")
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--chunk-kb", type=int, default=1024)
+    parser.add_argument("--sink", default="fakesink sync=false",
+                        help="downstream (fakesink does not read the data; try checksumsink)")
+    parser.add_argument("--run-one", choices=("zero-copy", "copy"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    path = args.file or make_file(args.size_mb)
+    if args.run_one:
+        print(json.dumps(run_one(path, args.run_one == "zero-copy", args.seconds, args.chunk_kb << 10, args.sink)))
+        sys.exit(0)
+
+    # RSS 가 섞이지 않도록 방식마다 새 프로세스
+    for mode in ("zero-copy", "copy"):
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-one", mode, "--file", path,
+                               "--seconds", str(args.seconds), "--chunk-kb", str(args.chunk_kb),
+                               "--sink", args.sink], capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{mode:>9}: ERROR {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{mode:>9} ({r['mode']}): {r['gb_per_s']:6.2f} GB/s  {r['buffers']} buffers  "
+              f"RSS {r['rss_start_mb']:.0f} → max {r['rss_max_mb']:.0f} → {r['rss_end_mb']:.0f} MB")
+    sys.exit(0)
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+여러 카메라를 파이프라인 하나의 compositor 모자이크로
+— uri_src_test.py / hls_test.py 처럼 카메라마다 프로세스 + autovideosink 를 띄우는 대신
+  입력마다 uridecodebin → 작은 타일 크기로 줄이고(videorate 로 먼저 프레임을 버려 변환량도 줄임)
+  compositor 의 고정 격자에 배치, 출력은 하나
+— 배경은 is-live 검은 videotestsrc → compositor 가 live 로 동작해서 고정 fps 로 계속 출력
+  (latency 안에 못 온 입력은 기다리지 않고 이전 프레임, 아직 안 온 입력은 ignore-inactive-pads,
+   stale_ms 넘게 끊긴 입력은 검은 칸)
+— 입력 에러(카메라 끊김)는 그 타일만 떼어 내고 retry 초 뒤 다시 붙인다
+— 벤치마크: 4/16/36 타일 모자이크 한 프로세스 vs 카메라마다 프로세스(N 개) CPU/RSS
+
+    python mosaic.py uri1 uri2 …              # 화면에 모자이크
+    python mosaic.py --bench 4 16 36          # 생성한 클립으로 비교
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gst, GLib
+
+
+def grid(n: int, columns: int | None = None) -> tuple[int, int]:
+    """타일 n 개의 (열, 행). columns 를 안 주면 정사각형에 가깝게."""
+    columns = columns or math.ceil(math.sqrt(n))
+    return columns, math.ceil(n / columns)
+
+
+class _Tile:
+
+    def __init__(self, index: int, uri: str) -> None:
+        self.index = index
+        self.uri = uri
+        self.bin: Gst.Bin | None = None
+        self.comp_pad: Gst.Pad | None = None
+        self.frames = 0
+        self.errors = 0
+        self.retry_id = 0
+
+
+class Mosaic:
+
+    def __init__(self, uris: list[str], tile_width: int = 320, tile_height: int = 180, fps: int = 15,
+                 columns: int | None = None, latency_ms: int = 200, stale_ms: int = 2000,
+                 retry: float = 5.0, sink: Gst.Element | None = None) -> None:
+        """
+        latency_ms: compositor 가 늦은 입력을 기다리는 최대 시간 (지나면 이전 프레임으로 출력)
+        stale_ms: 입력이 이만큼 끊기면 마지막 프레임 대신 검은 배경 (max-last-buffer-repeat)
+        retry: 에러난 입력을 다시 붙이기까지 초 (0 이면 다시 붙이지 않음)
+        """
+        self.uris = list(uris)
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.fps = fps
+        self.columns, self.rows = grid(len(uris), columns)
+        self.latency_ms = latency_ms
+        self.stale_ms = stale_ms
+        self.retry = retry
+        self.tiles = [_Tile(i, uri) for i, uri in enumerate(self.uris)]
+        self.output_frames = 0
+        self._t_start = None
+        self.pipeline: Gst.Pipeline | None = None
+        self._build(sink)
+
+    # ---------- 구성 ----------
+    def _build(self, sink: Gst.Element | None) -> None:
+        width, height = self.columns * self.tile_width, self.rows * self.tile_height
+        pipeline = Gst.Pipeline.new("mosaic")
+        bg = Gst.ElementFactory.make("videotestsrc", "background")
+        bg.set_property("pattern", "black")
+        bg.set_property("is-live", True)
+        bg_caps = Gst.ElementFactory.make("capsfilter", None)
+        bg_caps.set_property("caps", Gst.Caps.from_string(
+            f"video/x-raw,width={width},height={height},framerate={self.fps}/1"))
+        self.comp = Gst.ElementFactory.make("compositor", "comp")
+        self.comp.set_property("background", "black")
+        self.comp.set_property("latency", self.latency_ms * Gst.MSECOND)
+        if self.comp.find_property("ignore-inactive-pads"):           # GStreamer 1.20+
+            self.comp.set_property("ignore-inactive-pads", True)
+        convert = Gst.ElementFactory.make("videoconvert", None)
+        self.sink = sink or Gst.ElementFactory.make("autovideosink", "sink")
+        for e in (bg, bg_caps, self.comp, convert, self.sink):
+            pipeline.add(e)
+        bg.link(bg_caps)
+        bg_pad = self.comp.request_pad_simple("sink_%u")
+        bg_pad.set_property("zorder", 0)
+        bg_caps.get_static_pad("src").link(bg_pad)
+        self.comp.link(convert)
+        convert.link(self.sink)
+        self.comp.get_static_pad("src").add_probe(Gst.PadProbeType.BUFFER, self._on_output)
+
+        bus = pipeline.get_bus()
+        bus.add_signal_watch()
+        bus.connect("message::error", self._on_error)
+        self.pipeline = pipeline
+        for tile in self.tiles:
+            self._attach(tile)
+
+    def _attach(self, tile: _Tile) -> None:
+        """tile 입력을 bin 으로 만들어 compositor 에 붙인다. 재생 중이면 상태를 맞춘다."""
+        b = Gst.Bin.new(f"tile-{tile.index}")
+        src = Gst.ElementFactory.make("uridecodebin", None)
+        src.set_property("uri", tile.uri)
+        queue = Gst.ElementFactory.make("queue", None)
+        queue.set_property("max-size-buffers", 3)      # 파일 입력은 compositor 속도로 디코딩되게 (leaky 아님)
+        queue.set_property("max-size-bytes", 0)
+        queue.set_property("max-size-time", 0)
+        rate = Gst.ElementFactory.make("videorate", None)
+        rate.set_property("drop-only", True)        # 부족한 프레임은 compositor 가 반복
+        scale = Gst.ElementFactory.make("videoscale", None)
+        convert = Gst.ElementFactory.make("videoconvert", None)
+        caps = Gst.ElementFactory.make("capsfilter", None)
+        caps.set_property("caps", Gst.Caps.from_string(
+            f"video/x-raw,width={self.tile_width},height={self.tile_height},"
+            f"pixel-aspect-ratio=1/1,framerate={self.fps}/1"))
+        chain = (queue, rate, scale, convert, caps)
+        for e in (src,) + chain:
+            b.add(e)
+        Gst.Element.link_many(*chain)
+        b.add_pad(Gst.GhostPad.new("src", caps.get_static_pad("src")))
+        src.connect("pad-added", self._on_pad_added, b, queue)
+        if len(self.tiles) > 4:
+            # 타일이 많으면 디코더마다 코어 수만큼 스레드를 만들지 않게
+            src.connect("deep-element-added", self._on_decoder_added)
+
+        pad = self.comp.request_pad_simple("sink_%u")
+        pad.set_property("xpos", tile.index % self.columns * self.tile_width)
+        pad.set_property("ypos", tile.index // self.columns * self.tile_height)
+        pad.set_property("zorder", 1)
+        if pad.find_property("max-last-buffer-repeat"):
+            pad.set_property("max-last-buffer-repeat", self.stale_ms * Gst.MSECOND)
+        self.pipeline.add(b)
+        b.get_static_pad("src").link(pad)
+        b.get_static_pad("src").add_probe(Gst.PadProbeType.BUFFER, self._on_tile_buffer, tile)
+        tile.bin, tile.comp_pad = b, pad
+        if self.pipeline.get_state(0)[1] != Gst.State.NULL:
+            b.sync_state_with_parent()
+
+    def _detach(self, tile: _Tile) -> None:
+        if tile.bin is None:
+            return
+        tile.bin.set_state(Gst.State.NULL)
+        self.pipeline.remove(tile.bin)
+        self.comp.release_request_pad(tile.comp_pad)
+        tile.bin, tile.comp_pad = None, None
+
+    @staticmethod
+    def _on_pad_added(_src, pad, b: Gst.Bin, queue: Gst.Element) -> None:
+        caps = pad.get_current_caps() or pad.query_caps(None)
+        if caps.get_structure(0).get_name().startswith("video/"):
+            if not queue.get_static_pad("sink").is_linked():
+                pad.link(queue.get_static_pad("sink"))
+            return
+        sink = Gst.ElementFactory.make("fakesink", None)     # 오디오 등은 버린다
+        sink.set_property("sync", False)
+        sink.set_property("async", False)
+        b.add(sink)
+        sink.sync_state_with_parent()
+        pad.link(sink.get_static_pad("sink"))
+
+    @staticmethod
+    def _on_decoder_added(_bin, _sub, element) -> None:
+        factory = element.get_factory()
+        if factory and factory.list_is_type(Gst.ELEMENT_FACTORY_TYPE_DECODER) \
+                and element.find_property("max-threads"):
+            element.set_property("max-threads", 1)
+
+    # ---------- 측정 ----------
+    def _on_output(self, _pad, _info):
+        self.output_frames += 1
+        return Gst.PadProbeReturn.OK
+
+    @staticmethod
+    def _on_tile_buffer(_pad, _info, tile: _Tile):
+        tile.frames += 1
+        return Gst.PadProbeReturn.OK
+
+    # ---------- 에러: 그 타일만 ----------
+    def _tile_of(self, obj: Gst.Object) -> _Tile | None:
+        while obj is not None:
+            for tile in self.tiles:
+                if obj is tile.bin:
+                    return tile
+            obj = obj.get_parent()
+        return None
+
+    def _on_error(self, _bus, msg) -> None:
+        tile = self._tile_of(msg.src)
+        if tile is None:
+            err, dbg = msg.parse_error()
+            print(f"Error received from element {msg.src.get_name()}: {err.message}")
+            print(f"Debugging information: {dbg or 'none'}")
+            return
+        tile.errors += 1
+        print(f"tile {tile.index} ({tile.uri}): {msg.parse_error()[0].message} — detached")
+        GLib.idle_add(self._drop_tile, tile)      # 에러를 낸 요소의 스레드가 아닌 곳에서 NULL
+
+    def _drop_tile(self, tile: _Tile) -> bool:
+        self._detach(tile)
+        if self.retry > 0 and not tile.retry_id:
+            tile.retry_id = GLib.timeout_add(int(self.retry * 1000), self._retry_tile, tile)
+        return False
+
+    def _retry_tile(self, tile: _Tile) -> bool:
+        tile.retry_id = 0
+        self._attach(tile)
+        return False
+
+    # ---------- 실행 ----------
+    def start(self) -> None:
+        self._t_start = time.monotonic()
+        if self.pipeline.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+            raise RuntimeError("Unable to set the pipeline to the playing state.")
+
+    def stop(self) -> None:
+        for tile in self.tiles:
+            if tile.retry_id:
+                GLib.source_remove(tile.retry_id)
+                tile.retry_id = 0
+        self.pipeline.set_state(Gst.State.NULL)
+        self.pipeline.get_bus().remove_signal_watch()
+
+    def stats(self) -> dict:
+        elapsed = max(1e-6, time.monotonic() - (self._t_start or time.monotonic()))
+        return {
+            "tiles": len(self.tiles),
+            "grid": f"{self.columns}x{self.rows}",
+            "output_fps": self.output_frames / elapsed,
+            "tile_fps_min": min((t.frames / elapsed for t in self.tiles), default=0.0),
+            "tile_errors": sum(t.errors for t in self.tiles),
+        }
+
+
+# ---------- 벤치마크 ----------
+def _usage(ru0, t0) -> dict:
+    ru1 = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = (ru1.ru_utime - ru0.ru_utime) + (ru1.ru_stime - ru0.ru_stime)
+    return {"cpu_s": cpu, "wall_s": time.monotonic() - t0,
+            "rss_peak_mb": ru1.ru_maxrss * 1024 / 1e6}                 # Linux: KiB
+
+
+def run_one(mode: str, uris: list[str], seconds: float) -> dict:
+    """
+    mode="mosaic": 모든 uri 를 한 모자이크로, "single": uri 하나를 원래 해상도 그대로
+    (uri_src_test 의 autovideosink 자리에 sync=true fakesink). seconds 동안 돌리고 자원 사용량.
+    """
+    Gst.init(None)
+    sink = Gst.ElementFactory.make("fakesink", None)
+    sink.set_property("sync", True)
+    ru0, t0 = resource.getrusage(resource.RUSAGE_SELF), time.monotonic()
+    loop = GLib.MainLoop()
+    if mode == "mosaic":
+        mosaic = Mosaic(uris, sink=sink, retry=0)
+        mosaic.start()
+        GLib.timeout_add(int(seconds * 1000), loop.quit)
+        loop.run()
+        result = mosaic.stats()
+        mosaic.stop()
+    else:
+        pipeline = Gst.parse_launch(f"uridecodebin uri={uris[0]} ! videoconvert ! queue ! fakesink sync=true")
+        pipeline.set_state(Gst.State.PLAYING)
+        GLib.timeout_add(int(seconds * 1000), loop.quit)
+        loop.run()
+        pipeline.set_state(Gst.State.NULL)
+        result = {}
+    result.update(_usage(ru0, t0))
+    return result
+
+
+def _spawn(mode: str, uris: list[str], seconds: float) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), "--run-one", mode,
+                             "--seconds", str(seconds)] + uris, stdout=subprocess.PIPE, text=True)
+
+
+def _collect(proc: subprocess.Popen) -> dict:
+    out, _ = proc.communicate()
+    if proc.returncode != 0:
+        return {"error": f"exit {proc.returncode}"}
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def bench(counts: list[int], uri: str, seconds: float) -> dict:
+    """타일 n 개: 모자이크 프로세스 1 개 vs 프로세스 n 개 (동시에 실행, CPU/RSS 합계)"""
+    results = {}
+    for n in counts:
+        mosaic = _collect(_spawn("mosaic", [uri] * n, seconds))
+        singles = [_collect(p) for p in [_spawn("single", [uri], seconds) for _ in range(n)]]
+        ok = [s for s in singles if "error" not in s]
+        results[n] = {
+            "mosaic": mosaic,
+            "separate": {
+                "processes": n, "failed": n - len(ok),
+                "cpu_s": sum(s["cpu_s"] for s in ok),
+                "wall_s": max((s["wall_s"] for s in ok), default=0.0),
+                "rss_peak_mb": sum(s["rss_peak_mb"] for s in ok),      # 프로세스마다 따로 → 합
+            },
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="multi-camera compositor mosaic")
+    parser.add_argument("uris", nargs="*")
+    parser.add_argument("--tile", default="320x180")
+    parser.add_argument("--fps", type=int, default=15)
+    parser.add_argument("--columns", type=int, default=None)
+    parser.add_argument("--latency-ms", type=int, default=200)
+    parser.add_argument("--bench", type=int, nargs="*", help="tile counts to benchmark (e.g. 4 16 36)")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_one(args.run_one, args.uris, args.seconds)))
+        sys.exit(0)
+
+    Gst.init(None)
+    if args.bench is not None:
+        import local_media
+        uri = args.uris[0] if args.uris else local_media.file_uri(
+            local_media.mp4_clip(seconds=int(args.seconds) + 5, width=1280, height=720, fps=30,
+                                 name=f"cam-720p-{int(args.seconds) + 5}s.mp4"))
+        for n, r in bench(args.bench or [4, 16, 36], uri, args.seconds).items():
+            m, s = r["mosaic"], r["separate"]
+            if "error" in m:
+                print(f"{n:>3} tiles: mosaic ERROR {m['error']}")
+                continue
+            print(f"{n:>3} tiles: mosaic   cpu {100 * m['cpu_s'] / m['wall_s']:7.1f} %  "
+                  f"rss {m['rss_peak_mb']:8.1f} MB  out {m['output_fps']:.1f} fps, "
+                  f"slowest tile {m['tile_fps_min']:.1f} fps")
+            print(f"{'':>10} separate cpu {100 * s['cpu_s'] / max(s['wall_s'], 1e-6):7.1f} %  "
+                  f"rss {s['rss_peak_mb']:8.1f} MB  ({s['processes']} processes, {s['failed']} failed)")
+        sys.exit(0)
+
+    if not args.uris:
+        parser.error("give camera URIs (or --bench)")
+    width, height = (int(v) for v in args.tile.split("x"))
+    mosaic = Mosaic(args.uris, width, height, args.fps, args.columns, args.latency_ms)
+    loop = GLib.MainLoop()
+    mosaic.pipeline.get_bus().connect("message::eos", lambda *_: loop.quit())
+    mosaic.start()
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        pass
+    print(mosaic.stats())
+    mosaic.stop()
+    sys.exit(0)
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+붙였다 뗄 수 있는 pad 처리량 측정기
+— 'element.pad' 이름으로 아무 pad 에나 붙임 (예: tee.src_0, audio_source.src, splitmuxsink.video)
+— buffers/s, bytes/s, PTS 지터, 도착 간격(최대/평균), DISCONT · DELTA_UNIT 비율
+— buffers/s · bytes/s 는 pad 뒤에 끼운 identity 의 stats(C 에서 셈)로 — 버퍼마다 파이썬이 돌지 않는다
+  (identity 에 stats 가 없는 GStreamer < 1.20 이면 probe 로 센다)
+— 지터 · 간격 · 플래그만 파이썬 probe. 누적은 스레드별 카운터(락 없음)에만 하고, 요약은 카운터 합산으로만 만든다
+— duty cycle 모드: window 초 동안만 probe 를 달고 나머지 시간엔 떼서 버퍼당 비용 0 (처리량은 계속 정확)
+— 최대 간격 · 최대 지터는 summary() 구간마다 새로 잰다
+
+    python pad_meter.py "videotestsrc ! tee name=t ! queue ! fakesink" t.src_0
+"""
+import threading
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gst, GLib
+
+_DISCONT = Gst.BufferFlags.DISCONT
+_DELTA = Gst.BufferFlags.DELTA_UNIT
+_NONE = Gst.CLOCK_TIME_NONE
+
+
+class _ThreadAcc:
+    """스트리밍 스레드 하나가 단독으로 쓰는 누적기. 다른 스레드는 읽기만 한다."""
+
+    __slots__ = ("buffers", "bytes", "discont", "delta", "gap_sum", "gap_max",
+                 "jitter_sum", "jitter_max", "last_arrival", "last_pts", "epoch")
+
+    def __init__(self) -> None:
+        self.buffers = 0
+        self.bytes = 0
+        self.discont = 0
+        self.delta = 0
+        self.gap_sum = 0          # 도착 간격 합 (ns)
+        self.gap_max = 0
+        self.jitter_sum = 0       # |도착 간격 - PTS 간격| 합 (ns)
+        self.jitter_max = 0
+        self.last_arrival = 0
+        self.last_pts = _NONE
+        self.epoch = 0            # 이 epoch 의 최대값만 유효 (summary() 마다 PadMeter 가 올린다)
+
+
+def resolve_pad(pipeline: Gst.Bin, spec: str) -> Gst.Pad:
+    """'element.pad' → Gst.Pad (bin 안쪽 요소도 이름으로 찾는다)"""
+    element_name, _, pad_name = spec.partition(".")
+    element = pipeline.get_by_name(element_name)
+    if element is None:
+        raise LookupError(f"no element named '{element_name}'")
+    pad = element.get_static_pad(pad_name) if pad_name else None
+    if pad is None:
+        names = [p.get_name() for p in element.pads]
+        raise LookupError(f"no pad '{pad_name}' on '{element_name}' (has {names})")
+    return pad
+
+
+class PadMeter:
+
+    def __init__(self, pad: Gst.Pad, name: str | None = None,
+                 window: float | None = None, period: float | None = None, native: bool = True) -> None:
+        self.pad = pad
+        self.name = name or f"{pad.get_parent_element().get_name()}.{pad.get_name()}"
+        self.window = window
+        self.period = period
+        self.native = native
+        self._counter: Gst.Element | None = None    # pad 뒤에 끼운 identity (stats 로 처리량)
+        self._accs: dict[int, _ThreadAcc] = {}
+        self._epoch = 0
+        self._probe_id = None
+        self._duty_id = None
+        self._metered = 0.0         # probe 가 달려 있던 누적 시간
+        self._attached_at = None
+        self._last = None           # 직전 summary() 시점의 합계
+        self._started_at = None
+
+    @classmethod
+    def attach_by_name(cls, pipeline: Gst.Bin, spec: str, **kwargs) -> "PadMeter":
+        meter = cls(resolve_pad(pipeline, spec), name=spec, **kwargs)
+        meter.start()
+        return meter
+
+    # ---------- probe ----------
+    def _on_buffer(self, _pad, info, _get_ident=threading.get_ident, _now=time.monotonic_ns):
+        acc = self._accs.get(_get_ident())
+        if acc is None:
+            acc = self._accs[_get_ident()] = _ThreadAcc()
+        now = _now()
+        if acc.epoch != self._epoch:      # 새 summary 구간: 최대값은 처음부터
+            acc.epoch = self._epoch
+            acc.gap_max = acc.jitter_max = 0
+
+        if info.type & Gst.PadProbeType.BUFFER_LIST:
+            blist = info.get_buffer_list()
+            n = blist.length()
+            acc.buffers += n
+            acc.bytes += blist.calculate_size()
+            buf = blist.get(n - 1) if n else None
+        else:
+            buf = info.get_buffer()
+            acc.buffers += 1
+            acc.bytes += buf.get_size()
+        if buf is None:
+            return Gst.PadProbeReturn.OK
+
+        flags = buf.get_flags()
+        if flags & _DISCONT:
+            acc.discont += 1
+        if flags & _DELTA:
+            acc.delta += 1
+
+        if acc.last_arrival:
+            gap = now - acc.last_arrival
+            acc.gap_sum += gap
+            if gap > acc.gap_max:
+                acc.gap_max = gap
+            pts = buf.pts
+            if pts != _NONE and acc.last_pts != _NONE:
+                jitter = abs(gap - (pts - acc.last_pts))
+                acc.jitter_sum += jitter
+                if jitter > acc.jitter_max:
+                    acc.jitter_max = jitter
+        acc.last_arrival = now
+        acc.last_pts = buf.pts
+        return Gst.PadProbeReturn.OK
+
+    # ---------- 붙이기 / 떼기 ----------
+    def _attach(self) -> None:
+        if self._probe_id is None:
+            self._probe_id = self.pad.add_probe(
+                Gst.PadProbeType.BUFFER | Gst.PadProbeType.BUFFER_LIST, self._on_buffer)
+            self._attached_at = time.monotonic()
+            # 창이 다시 열리면 이전 창과의 간격을 지터로 세지 않는다
+            for acc in list(self._accs.values()):
+                acc.last_arrival = 0
+                acc.last_pts = _NONE
+
+    def _detach(self) -> None:
+        if self._probe_id is not None:
+            self.pad.remove_probe(self._probe_id)
+            self._probe_id = None
+            self._metered += time.monotonic() - self._attached_at
+
+    # ---------- 네이티브 카운터 ----------
+    def _links(self) -> tuple[Gst.Pad, Gst.Pad] | None:
+        """(src, sink) — 측정할 pad 가 어느 쪽이든 그 링크의 양 끝"""
+        peer = self.pad.get_peer()
+        if peer is None:
+            return None
+        return (self.pad, peer) if self.pad.get_direction() == Gst.PadDirection.SRC else (peer, self.pad)
+
+    def _splice_counter(self) -> None:
+        """링크 사이에 identity 를 IDLE probe 로 끼운다 (pipeline_control.attach_branch 와 같은 방식)"""
+        links = self._links()
+        identity = Gst.ElementFactory.make("identity", None)
+        if links is None or identity is None or identity.find_property("stats") is None:
+            return
+        src, sink = links
+        parent = src.get_parent_element().get_parent()
+        identity.set_property("silent", True)
+        self._counter = identity
+
+        def _on_idle(_pad, _info):
+            parent.add(identity)
+            src.unlink(sink)
+            src.link(identity.get_static_pad("sink"))
+            identity.get_static_pad("src").link(sink)
+            identity.sync_state_with_parent()
+            return Gst.PadProbeReturn.REMOVE
+
+        src.add_probe(Gst.PadProbeType.IDLE, _on_idle)
+
+    def _remove_counter(self) -> None:
+        identity, self._counter = self._counter, None
+        if identity is None:
+            return
+        src = identity.get_static_pad("sink").get_peer()
+        sink = identity.get_static_pad("src").get_peer()
+        if src is None or sink is None:       # 아직 끼워지지 않았거나 이미 떨어졌다
+            return
+
+        def _on_idle(_pad, _info):
+            src.unlink(identity.get_static_pad("sink"))
+            identity.get_static_pad("src").unlink(sink)
+            src.link(sink)
+            GLib.idle_add(self._drop_counter, identity)
+            return Gst.PadProbeReturn.REMOVE
+
+        src.add_probe(Gst.PadProbeType.IDLE, _on_idle)
+
+    @staticmethod
+    def _drop_counter(identity: Gst.Element) -> bool:
+        identity.set_state(Gst.State.NULL)
+        parent = identity.get_parent()
+        if parent is not None:
+            parent.remove(identity)
+        return False
+
+    def _native_counts(self) -> tuple[int, int] | None:
+        if self._counter is None or self._counter.get_parent() is None:
+            return None
+        stats = self._counter.get_property("stats")
+        return stats.get_value("num-buffers"), stats.get_value("num-bytes")
+
+    def start(self) -> None:
+        self._started_at = time.monotonic()
+        if self.native and self._counter is None:
+            self._splice_counter()
+        self._attach()
+        if self.window and self.period and self._duty_id is None:
+            self._duty_id = GLib.timeout_add(int(self.window * 1000), self._close_window)
+
+    def stop(self) -> None:
+        if self._duty_id is not None:
+            GLib.source_remove(self._duty_id)
+            self._duty_id = None
+        self._detach()
+        self._remove_counter()
+
+    def _close_window(self) -> bool:
+        self._detach()
+        self._duty_id = GLib.timeout_add(int((self.period - self.window) * 1000), self._open_window)
+        return False
+
+    def _open_window(self) -> bool:
+        self._attach()
+        self._duty_id = GLib.timeout_add(int(self.window * 1000), self._close_window)
+        return False
+
+    # ---------- 요약 ----------
+    def totals(self) -> dict:
+        """스레드별 누적기를 합친다 (스레드 수만큼의 일, 버퍼 수와 무관). 최대값은 이번 구간 것만."""
+        t = {"buffers": 0, "bytes": 0, "discont": 0, "delta": 0,
+             "gap_sum": 0, "gap_max": 0, "jitter_sum": 0, "jitter_max": 0}
+        for acc in list(self._accs.values()):
+            t["buffers"] += acc.buffers
+            t["bytes"] += acc.bytes
+            t["discont"] += acc.discont
+            t["delta"] += acc.delta
+            t["gap_sum"] += acc.gap_sum
+            t["jitter_sum"] += acc.jitter_sum
+            if acc.epoch == self._epoch:
+                t["gap_max"] = max(t["gap_max"], acc.gap_max)
+                t["jitter_max"] = max(t["jitter_max"], acc.jitter_max)
+        metered = self._metered
+        if self._probe_id is not None:
+            metered += time.monotonic() - self._attached_at
+        t["metered_s"] = metered
+        t["wall_s"] = time.monotonic()
+        native = self._native_counts()
+        if native is not None:
+            t["native_buffers"], t["native_bytes"] = native
+        return t
+
+    def summary(self) -> dict:
+        """
+        직전 summary() 이후 구간의 요약. 처리량은 네이티브 카운터가 있으면 벽시계 기준,
+        없으면 probe 가 달려 있던 시간 기준. 간격 · 지터 · 비율은 probe 가 본 버퍼 기준.
+        """
+        cur = self.totals()
+        self._epoch += 1                  # 다음 구간의 최대값은 새로
+        prev, self._last = self._last, cur
+        if prev is None:
+            prev = dict.fromkeys(cur, 0)
+            prev["wall_s"] = self._started_at or cur["wall_s"]
+        n = cur["buffers"] - prev["buffers"]
+        gaps = max(n - 1, 1)
+        if "native_buffers" in cur and "native_buffers" in prev:
+            dt = cur["wall_s"] - prev["wall_s"]
+            buffers = cur["native_buffers"] - prev["native_buffers"]
+            nbytes = cur["native_bytes"] - prev["native_bytes"]
+        else:
+            dt = cur["metered_s"] - prev["metered_s"]
+            buffers, nbytes = n, cur["bytes"] - prev["bytes"]
+        return {
+            "pad": self.name,
+            "buffers_per_s": buffers / dt if dt > 0 else 0.0,
+            "bytes_per_s": nbytes / dt if dt > 0 else 0.0,
+            "mean_gap_ms": (cur["gap_sum"] - prev["gap_sum"]) / gaps / 1e6,
+            "max_gap_ms": cur["gap_max"] / 1e6,
+            "mean_jitter_ms": (cur["jitter_sum"] - prev["jitter_sum"]) / gaps / 1e6,
+            "max_jitter_ms": cur["jitter_max"] / 1e6,
+            "discont_ratio": (cur["discont"] - prev["discont"]) / n if n else 0.0,
+            "delta_ratio": (cur["delta"] - prev["delta"]) / n if n else 0.0,
+        }
+
+
+# ---------- 실행: launch 문자열의 pad 들을 측정 ----------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="measure throughput on element.pad")
+    parser.add_argument("launch")
+    parser.add_argument("pads", nargs="+", help="element.pad, e.g. t.src_0")
+    parser.add_argument("--window", type=float, default=None, help="meter only this many seconds ...")
+    parser.add_argument("--period", type=float, default=None, help="... out of every PERIOD seconds")
+    args = parser.parse_args()
+
+    Gst.init(None)
+    pipeline = Gst.parse_launch(args.launch)
+    # request pad(tee.src_%u 등)는 PAUSED 이후에 생기므로 먼저 preroll
+    pipeline.set_state(Gst.State.PAUSED)
+    pipeline.get_state(5 * Gst.SECOND)
+    meters = [PadMeter.attach_by_name(pipeline, spec, window=args.window, period=args.period)
+              for spec in args.pads]
+
+    def _report():
+        for m in meters:
+            s = m.summary()
+            print(f"{s['pad']:>20}: {s['buffers_per_s']:8.1f} buf/s {s['bytes_per_s'] / 1e6:8.2f} MB/s "
+                  f"gap {s['mean_gap_ms']:.2f}/{s['max_gap_ms']:.2f} ms "
+                  f"jitter {s['mean_jitter_ms']:.3f} ms discont {s['discont_ratio']:.3f} "
+                  f"delta {s['delta_ratio']:.3f}")
+        return True
+
+    pipeline.set_state(Gst.State.PLAYING)
+    GLib.timeout_add_seconds(1, _report)
+    loop = GLib.MainLoop()
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        pass
+    for m in meters:
+        m.stop()
+    pipeline.set_state(Gst.State.NULL)
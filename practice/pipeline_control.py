@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+외부 스레드에서 안전하게 파이프라인을 제어하는 명령 큐
+— threading.Timer / 웹 핸들러 등 아무 스레드에서 submit() → 파이프라인을 소유한
+  GLib 메인 컨텍스트에서 순서대로 실행
+— 토폴로지 변경(tee 브랜치 붙이기/떼기)은 IDLE probe 로 pad 가 쉬는 시점에 적용
+— 결과는 concurrent.futures.Future 로 돌려주고, 명령마다 enqueue → 적용 지연을 기록
+"""
+import concurrent.futures
+import threading
+import time
+from collections import deque
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gst, GLib
+
+
+def call_soon(context: GLib.MainContext | None, fn, *args) -> None:
+    """context(None 이면 기본 컨텍스트)의 다음 반복에서 fn(*args) 실행. 스레드 안전."""
+    def _once():
+        fn(*args)
+        return False
+
+    if context is None or context == GLib.MainContext.default():
+        GLib.idle_add(_once)
+    else:
+        source = GLib.Idle()
+        source.set_callback(_once)
+        source.attach(context)
+
+
+class CommandQueue:
+
+    def __init__(self, context: GLib.MainContext | None = None, history: int = 1000) -> None:
+        self.context = context
+        self.latencies: deque = deque(maxlen=history)   # (이름, enqueue→적용 초)
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, name: str | None = None) -> concurrent.futures.Future:
+        """
+        fn(*args) 을 메인 컨텍스트에서 실행한다.
+        fn 이 Future 를 돌려주면(비동기 토폴로지 변경) 그 Future 가 끝난 시점을 '적용'으로 본다.
+        """
+        result = concurrent.futures.Future()
+        name = name or getattr(fn, "__name__", "command")
+        enqueued = time.monotonic()
+
+        def _done(value=None, error=None):
+            with self._lock:
+                self.latencies.append((name, time.monotonic() - enqueued))
+            if error is not None:
+                result.set_exception(error)
+            else:
+                result.set_result(value)
+
+        def _run():
+            if not result.set_running_or_notify_cancel():
+                return
+            try:
+                value = fn(*args)
+            except Exception as e:
+                _done(error=e)
+                return
+            if isinstance(value, concurrent.futures.Future):
+                value.add_done_callback(
+                    lambda f: _done(error=f.exception()) if f.exception() else _done(f.result()))
+            else:
+                _done(value)
+
+        call_soon(self.context, _run)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_name: dict[str, list[float]] = {}
+            for name, latency in self.latencies:
+                by_name.setdefault(name, []).append(latency)
+        report = {}
+        for name, values in by_name.items():
+            values.sort()
+            report[name] = {
+                "count": len(values),
+                "p50_ms": values[len(values) // 2] * 1000,
+                "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))] * 1000,
+                "max_ms": values[-1] * 1000,
+            }
+        return report
+
+
+# ---------- 토폴로지 변경 (메인 컨텍스트에서 호출) ----------
+def attach_branch(pipeline: Gst.Pipeline, tee: Gst.Element, elements: list[Gst.Element]) -> Gst.Pad:
+    """
+    elements 를 순서대로 링크해 tee 뒤에 붙인다. 이미 파이프라인에 있는(정적) 브랜치면
+    add/link 는 건너뛰고 상태만 맞춘다. 새 request pad 는 아직 데이터가 흐르지 않으므로
+    바로 링크해도 안전하다.
+    """
+    for e in elements:
+        if e.get_parent() is None:
+            pipeline.add(e)
+    for src, sink in zip(elements, elements[1:]):
+        src_pad = src.get_static_pad("src")
+        if src_pad is None or not src_pad.is_linked():
+            if not src.link(sink):
+                raise RuntimeError(f"link failed: {src.get_name()} → {sink.get_name()}")
+    # 하류부터 올려야 상류가 먼저 데이터를 밀어 넣지 않는다
+    for e in reversed(elements):
+        e.sync_state_with_parent()
+
+    tee_pad = tee.request_pad_simple("src_%u")
+    if tee_pad.link(elements[0].get_static_pad("sink")) != Gst.PadLinkReturn.OK:
+        tee.release_request_pad(tee_pad)
+        raise RuntimeError(f"link failed: {tee.get_name()} → {elements[0].get_name()}")
+    return tee_pad
+
+
+def _eos_pads(element: Gst.Element) -> list[Gst.Pad]:
+    """EOS 가 '끝까지' 갔는지 확인할 pad 들. 싱크 bin(splitmuxsink 등)은 안쪽 싱크까지 내려간다."""
+    if isinstance(element, Gst.Bin):
+        pads = [p for sink in element.iterate_sinks() for p in _eos_pads(sink)]
+        if pads:
+            return pads
+    src = element.get_static_pad("src")
+    return [src] if src is not None else list(element.sinkpads)
+
+
+def detach_branch(pipeline: Gst.Pipeline, tee: Gst.Element, tee_pad: Gst.Pad,
+                  elements: list[Gst.Element], eos: bool = True, remove: bool = True,
+                  context: GLib.MainContext | None = None) -> concurrent.futures.Future:
+    """
+    tee_pad 가 쉬는 순간(IDLE probe) 브랜치를 떼어낸다.
+    eos=True 면 브랜치에 EOS 를 흘려 muxer/파일이 닫힌 다음 정리한다.
+    remove=False 면 요소는 파이프라인에 남기고 NULL 로만 내린다 (다시 attach 가능).
+    """
+    done = concurrent.futures.Future()
+    first_sink = elements[0].get_static_pad("sink")
+    waiting = []
+    lock = threading.Lock()
+
+    def _cleanup():
+        for e in elements:
+            e.set_state(Gst.State.NULL)
+            if remove:
+                pipeline.remove(e)
+        tee.release_request_pad(tee_pad)
+        done.set_result(None)
+
+    def _on_eos(pad, info):
+        if info.get_event().type != Gst.EventType.EOS:
+            return Gst.PadProbeReturn.PASS
+        with lock:
+            waiting.remove(pad)
+            last = not waiting
+        if last:
+            call_soon(context, _cleanup)
+        return Gst.PadProbeReturn.REMOVE
+
+    def _on_idle(pad, _info):
+        pad.unlink(first_sink)
+        if eos:
+            # 마지막 요소(싱크 bin 이면 그 안의 싱크들)까지 EOS 가 도착하면 정리
+            waiting.extend(_eos_pads(elements[-1]))
+            for watch in list(waiting):
+                watch.add_probe(Gst.PadProbeType.EVENT_DOWNSTREAM, _on_eos)
+            first_sink.send_event(Gst.Event.new_eos())
+        else:
+            call_soon(context, _cleanup)
+        return Gst.PadProbeReturn.REMOVE
+
+    tee_pad.add_probe(Gst.PadProbeType.IDLE, _on_idle)
+    return done
+
+
+# ---------- 데모: 다른 스레드에서 녹화 브랜치를 반복해서 붙였다 떼기 ----------
+if __name__ == "__main__":
+    Gst.init(None)
+    pipeline = Gst.parse_launch(
+        "videotestsrc is-live=true ! video/x-raw,width=640,height=360,framerate=30/1 ! "
+        "tee name=t ! queue ! fakesink sync=false")
+    tee = pipeline.get_by_name("t")
+    control = CommandQueue()
+    pipeline.set_state(Gst.State.PLAYING)
+
+    def _make_branch():
+        return [Gst.ElementFactory.make("queue"), Gst.ElementFactory.make("videoconvert"),
+                Gst.ElementFactory.make("x264enc"), Gst.ElementFactory.make("mp4mux"),
+                Gst.ElementFactory.make("fakesink")]
+
+    def _worker():
+        for _ in range(10):
+            branch = _make_branch()
+            pad = control.submit(attach_branch, pipeline, tee, branch).result()
+            time.sleep(0.5)
+            control.submit(detach_branch, pipeline, tee, pad, branch).result()
+        for name, s in control.stats().items():
+            print(f"{name:>14}: n={s['count']} p50={s['p50_ms']:.2f} ms "
+                  f"p95={s['p95_ms']:.2f} ms max={s['max_ms']:.2f} ms")
+        GLib.idle_add(loop.quit)
+
+    loop = GLib.MainLoop()
+    threading.Thread(target=_worker, daemon=True).start()
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        pass
+    pipeline.set_state(Gst.State.NULL)
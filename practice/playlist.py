@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+playbin 갭리스 플레이리스트
+— about-to-finish(스트리밍 스레드)에서 다음 URI 를 넣어 두면 playbin 이 현재 항목이 끝나기 전에
+  다음 항목을 프리롤하고, 디코더/싱크는 그대로 둔 채 이어서 재생
+— 싱크 pad 에서 항목 경계(STREAM_START 이벤트)를 보고
+  '항목 N 의 마지막 버퍼 끝 → 항목 N+1 첫 버퍼' 간격을 running time 과 벽시계 양쪽으로 기록
+
+    python playlist.py                       # 짧은 조각 100 개를 생성해서 이어 재생
+    python playlist.py clip-000.mp4 clip-001.mp4 …
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gst, GLib
+
+
+class _Boundary:
+    """싱크 pad 하나에서 본 버퍼 시간 (스트리밍 스레드에서만 갱신)"""
+
+    def __init__(self) -> None:
+        self.segment: Gst.Segment | None = None
+        self.last_end_rt = None        # 마지막 버퍼 끝의 running time
+        self.last_wall = None
+        self.pending = False           # STREAM_START 를 봤고 아직 첫 버퍼 전
+
+
+class Playlist:
+
+    def __init__(self, playbin: Gst.Element, uris: list[str], repeat: bool = False) -> None:
+        self.playbin = playbin
+        self.uris = list(uris)
+        self.repeat = repeat
+        self.current = 0               # 지금 싱크에 나오는 항목
+        self._queued = 0               # playbin 에 마지막으로 넣은 항목
+        self._lock = threading.Lock()
+        self.gaps_ms: list[float] = []       # running time 기준
+        self.wall_gaps_ms: list[float] = []  # 벽시계 기준 (sync=true 싱크일 때 의미 있음)
+        self.switches = 0
+        self._boundary = _Boundary()
+        self._probe_pad: Gst.Pad | None = None
+
+        playbin.set_property("uri", self.uris[0])
+        playbin.connect("about-to-finish", self._on_about_to_finish)
+
+    # ---------- 다음 항목 ----------
+    def _next_index(self, index: int) -> int | None:
+        if index + 1 < len(self.uris):
+            return index + 1
+        return 0 if self.repeat and self.uris else None
+
+    def _on_about_to_finish(self, playbin) -> None:
+        # 스트리밍 스레드: 여기서 uri 를 바꿔야 끊김 없이 이어진다. 아무것도 안 넣으면 EOS.
+        with self._lock:
+            nxt = self._next_index(self._queued)
+            if nxt is None:
+                return
+            self._queued = nxt
+        playbin.set_property("uri", self.uris[nxt])
+
+    def append(self, uri: str) -> None:
+        """재생 중에 항목 추가 (다음 about-to-finish 부터 반영)"""
+        with self._lock:
+            self.uris.append(uri)
+
+    # ---------- 간격 측정 ----------
+    def attach(self, sink_pad: Gst.Pad | None = None) -> None:
+        """
+        sink_pad(기본: video-sink, 없으면 audio-sink 의 sink pad)에서 경계를 잰다.
+        PAUSED 이전에 불러야 첫 SEGMENT 를 놓치지 않는다.
+        """
+        if sink_pad is None:
+            for prop in ("video-sink", "audio-sink"):
+                sink = self.playbin.get_property(prop)
+                if sink is not None:
+                    sink_pad = sink.get_static_pad("sink")
+                    break
+        if sink_pad is None:
+            raise RuntimeError("set video-sink or audio-sink on playbin (or pass a pad)")
+        sink_pad.add_probe(Gst.PadProbeType.BUFFER | Gst.PadProbeType.EVENT_DOWNSTREAM, self._on_probe)
+        self._probe_pad = sink_pad
+
+    def _on_probe(self, _pad, info):
+        b = self._boundary
+        if info.type & Gst.PadProbeType.EVENT_DOWNSTREAM:
+            event = info.get_event()
+            if event.type == Gst.EventType.SEGMENT:
+                b.segment = event.parse_segment()
+            elif event.type == Gst.EventType.STREAM_START and b.last_end_rt is not None:
+                b.pending = True
+            return Gst.PadProbeReturn.OK
+
+        buf = info.get_buffer()
+        if b.segment is None or buf.pts == Gst.CLOCK_TIME_NONE:
+            return Gst.PadProbeReturn.OK
+        start_rt = b.segment.to_running_time(Gst.Format.TIME, buf.pts)
+        now = time.monotonic()
+        if b.pending:
+            b.pending = False
+            self.gaps_ms.append((start_rt - b.last_end_rt) / Gst.MSECOND)
+            self.wall_gaps_ms.append((now - b.last_wall) * 1000)
+            with self._lock:
+                self.switches += 1
+                nxt = self._next_index(self.current)
+                self.current = nxt if nxt is not None else self.current
+        end = buf.pts + buf.duration if buf.duration != Gst.CLOCK_TIME_NONE else buf.pts
+        b.last_end_rt = b.segment.to_running_time(Gst.Format.TIME, end)
+        b.last_wall = now
+        return Gst.PadProbeReturn.OK
+
+    def stats(self) -> dict:
+        def _pct(values, q):
+            values = sorted(values)
+            return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+        return {
+            "items": len(self.uris),
+            "switches": self.switches,
+            "gap_ms_p50": _pct(self.gaps_ms, 0.5),
+            "gap_ms_p95": _pct(self.gaps_ms, 0.95),
+            "gap_ms_max": max(self.gaps_ms, default=0.0),
+            "wall_gap_ms_p50": _pct(self.wall_gaps_ms, 0.5),
+            "wall_gap_ms_max": max(self.wall_gaps_ms, default=0.0),
+        }
+
+
+# ---------- 데모 ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="gapless playbin playlist")
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--count", type=int, default=100, help="generated fragments (no files given)")
+    parser.add_argument("--sync", action="store_true", help="real-time sinks (wall-clock gaps)")
+    args = parser.parse_args()
+
+    import local_media
+
+    Gst.init(None)
+    files = args.files or [local_media.mp4_clip(seconds=1, width=320, height=240, fps=30, gop=30,
+                                                name=f"frag-{i:03d}.mp4") for i in range(args.count)]
+    uris = [local_media.file_uri(f) if os.path.exists(f) else f for f in files]
+
+    playbin = Gst.ElementFactory.make("playbin", None)
+    vsink = Gst.ElementFactory.make("fakesink", None)
+    vsink.set_property("sync", args.sync)
+    playbin.set_property("video-sink", vsink)
+    asink = Gst.ElementFactory.make("fakesink", None)
+    asink.set_property("sync", args.sync)
+    playbin.set_property("audio-sink", asink)
+    playlist = Playlist(playbin, uris)
+    playlist.attach()
+
+    loop = GLib.MainLoop()
+    bus = playbin.get_bus()
+    bus.add_signal_watch()
+    bus.connect("message::eos", lambda *_: loop.quit())
+    bus.connect("message::error", lambda _bus, msg: (print(msg.parse_error()[0].message), loop.quit()))
+
+    t0 = time.monotonic()
+    playbin.set_state(Gst.State.PLAYING)
+    loop.run()
+    playbin.set_state(Gst.State.NULL)
+    elapsed = time.monotonic() - t0
+    s = playlist.stats()
+    print(f"{s['switches']}/{s['items'] - 1} switches in {elapsed:.1f} s  "
+          f"gap p50 {s['gap_ms_p50']:.2f} ms, p95 {s['gap_ms_p95']:.2f} ms, max {s['gap_ms_max']:.2f} ms  "
+          f"(wall p50 {s['wall_gap_ms_p50']:.2f} ms, max {s['wall_gap_ms_max']:.2f} ms)")
+    sys.exit(0)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+트레이서 기반 요소별 지연 / 처리 시간 프로파일러
+— GStreamer latency(flags=pipeline+element) 트레이서, GstShark 의 proctime · queuelevel 트레이서를 켬
+— 같은 프로세스(Gst.init 전에 profile()) 또는 자식 프로세스(profile([...]))에서 동작
+— 트레이서 로그를 요소별 히스토그램으로 모아 종료 시 순위 리포트를 씀
+
+    python profiler.py ch7/ch7.py               # 자식 프로세스로 실행 후 리포트
+    python profiler.py practice/hls_test_1.py -o hls_profile.txt
+
+코드 안에서는 (Gst.init 보다 먼저):
+
+    import profiler
+    profiler.profile()                           # 종료 시 profile_report.txt
+"""
+import atexit
+import json
+import math
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+
+DEFAULT_TRACERS = "latency(flags=pipeline+element);proctime;queuelevel"
+
+_FIELD = re.compile(r'([\w-]+)=\((\w+)\)("(?:[^"\\]|\\.)*"|[^,;]*)')
+_CLOCK = re.compile(r"^(\d+):(\d+):(\d+)\.(\d+)$")
+_INT_TYPES = {"guint64", "gint64", "uint64", "int64", "guint", "gint", "uint", "int", "ulong", "long"}
+
+
+def _to_value(kind: str, raw: str):
+    raw = raw.strip()
+    if raw.startswith('"'):
+        raw = raw[1:-1]
+    if kind in _INT_TYPES:
+        return int(raw)
+    m = _CLOCK.match(raw)
+    if m:   # GstShark 는 시간을 "0:00:00.001234567" 문자열로 찍는다
+        h, mi, s, frac = m.groups()
+        return ((int(h) * 60 + int(mi)) * 60 + int(s)) * 1_000_000_000 + int(frac.ljust(9, "0")[:9])
+    return raw
+
+
+def parse_tracer_line(line: str):
+    """'... GST_TRACER :0:: latency, a=(string)b, ...;' → ('latency', {a: b, ...})"""
+    marker = line.find("GST_TRACER")
+    if marker < 0:
+        return None
+    body = line[marker:].split(":: ", 1)
+    if len(body) != 2:
+        return None
+    name, _, fields = body[1].partition(",")
+    return name.strip(), {k: _to_value(t, v) for k, t, v in _FIELD.findall(fields)}
+
+
+class Histogram:
+    """로그 스케일 히스토그램 (옥타브당 4 칸, 단위 ns). 백분위는 칸 경계로 근사."""
+
+    SUB = 4
+
+    def __init__(self) -> None:
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value: int) -> None:
+        b = int(math.log2(value) * self.SUB) if value > 0 else 0
+        self.buckets[b] = self.buckets.get(b, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = self.count * pct / 100
+        seen = 0
+        for b in sorted(self.buckets):
+            seen += self.buckets[b]
+            if seen >= rank:
+                return min(2 ** ((b + 1) / self.SUB), self.max)
+        return float(self.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "total_ns": self.total, "mean_ns": self.mean,
+                "p50_ns": self.percentile(50), "p95_ns": self.percentile(95),
+                "p99_ns": self.percentile(99), "max_ns": self.max}
+
+
+class Profile:
+    """트레이서 레코드를 (종류, 대상) 별 히스토그램으로 모은다."""
+
+    def __init__(self) -> None:
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+
+    def _hist(self, kind: str, target: str) -> Histogram:
+        key = (kind, target)
+        if key not in self.histograms:
+            self.histograms[key] = Histogram()
+        return self.histograms[key]
+
+    def add(self, name: str, fields: dict) -> None:
+        if name == "element-latency":
+            self._hist("element-latency", fields.get("element", "?")).add(fields["time"])
+        elif name == "latency":
+            path = f'{fields.get("src-element", "?")} → {fields.get("sink-element", "?")}'
+            self._hist("pipeline-latency", path).add(fields["time"])
+        elif name == "proctime":
+            self._hist("proctime", fields.get("element", "?")).add(fields["time"])
+        elif name == "queuelevel":
+            self._hist("queuelevel-buffers", fields.get("queue", "?")).add(fields.get("size_buffers", 0))
+
+    def feed(self, lines) -> "Profile":
+        for line in lines:
+            parsed = parse_tracer_line(line)
+            if parsed is None:
+                continue
+            name, fields = parsed
+            if "time" in fields or name == "queuelevel":
+                self.add(name, fields)
+        return self
+
+    def ranked(self) -> list[tuple[str, str, Histogram]]:
+        # 시간 계열은 총합 순, queue 레벨은 p95 순
+        timed = [(k, t, h) for (k, t), h in self.histograms.items() if k != "queuelevel-buffers"]
+        levels = [(k, t, h) for (k, t), h in self.histograms.items() if k == "queuelevel-buffers"]
+        timed.sort(key=lambda r: r[2].total, reverse=True)
+        levels.sort(key=lambda r: r[2].percentile(95), reverse=True)
+        return timed + levels
+
+    def report(self) -> str:
+        lines = [f"{'kind':<18} {'element':<40} {'count':>8} {'mean':>10} {'p50':>10} "
+                 f"{'p95':>10} {'p99':>10} {'max':>10} {'total':>10}"]
+        for kind, target, h in self.ranked():
+            if kind == "queuelevel-buffers":
+                scale, unit, total = 1, "", "-"
+            else:
+                scale, unit, total = 1e6, "ms", f"{h.total / 1e9:.3f}s"
+
+            def fmt(v):
+                return f"{v / scale:.3f}{unit}" if unit else f"{v:.0f}"
+            lines.append(f"{kind:<18} {target[:40]:<40} {h.count:>8} {fmt(h.mean):>10} "
+                         f"{fmt(h.percentile(50)):>10} {fmt(h.percentile(95)):>10} "
+                         f"{fmt(h.percentile(99)):>10} {fmt(h.max):>10} {total:>10}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        return {f"{k}:{t}": h.to_dict() for k, t, h in self.ranked()}
+
+
+def parse_log(path: str) -> Profile:
+    with open(path, errors="replace") as f:
+        return Profile().feed(f)
+
+
+def tracer_env(log_path: str, tracers: str = DEFAULT_TRACERS, env: dict | None = None) -> dict:
+    env = dict(os.environ if env is None else env)
+    env["GST_TRACERS"] = tracers
+    debug = env.get("GST_DEBUG")
+    env["GST_DEBUG"] = f"{debug},GST_TRACER:7" if debug else "GST_TRACER:7"
+    env["GST_DEBUG_FILE"] = log_path
+    env["GST_DEBUG_NO_COLOR"] = "1"
+    return env
+
+
+def write_report(log_path: str, report_path: str) -> Profile:
+    profile = parse_log(log_path)
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(profile.report())
+    with open(os.path.splitext(report_path)[0] + ".json", "w", encoding="utf-8") as f:
+        json.dump(profile.to_dict(), f, indent=2)
+    return profile
+
+
+def profile(argv: list[str] | None = None, report_path: str = "profile_report.txt",
+            tracers: str = DEFAULT_TRACERS, log_path: str | None = None) -> Profile | None:
+    """
+    argv 가 있으면 자식 프로세스로 실행하고 끝나면 리포트를 돌려준다.
+    없으면 현재 프로세스에 트레이서를 켜고, 종료 시(atexit) 리포트를 쓴다.
+    현재 프로세스 모드는 Gst.init() 보다 먼저 불러야 한다.
+    """
+    log_path = log_path or os.path.join(tempfile.gettempdir(), f"gst-tracer-{os.getpid()}.log")
+
+    if argv:
+        proc = subprocess.Popen(argv, env=tracer_env(log_path, tracers))
+        try:
+            proc.wait()
+        except KeyboardInterrupt:
+            proc.send_signal(signal.SIGINT)   # 자식도 정상 종료 경로(파이프라인 NULL)를 타게 한다
+            proc.wait()
+        return write_report(log_path, report_path)
+
+    if "gi.repository.Gst" in sys.modules:
+        from gi.repository import Gst
+        if Gst.is_initialized():
+            print("profiler: Gst is already initialized, tracers will not be active", file=sys.stderr)
+    os.environ.update(tracer_env(log_path, tracers))
+    atexit.register(write_report, log_path, report_path)
+    return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="per-element latency / processing-time profile")
+    parser.add_argument("script", help="python script to run (e.g. ch7/ch7.py)")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    parser.add_argument("-o", "--output", default="profile_report.txt")
+    parser.add_argument("--tracers", default=DEFAULT_TRACERS)
+    parser.add_argument("--parse", action="store_true", help="only parse an existing tracer log")
+    opts = parser.parse_args()
+
+    if opts.parse:
+        result = write_report(opts.script, opts.output)
+    else:
+        result = profile([sys.executable, opts.script, *opts.args], opts.output, opts.tracers)
+    print(result.report())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+tee 브랜치별 queue 정책 (load shedding)
+— leaky(no/upstream/downstream), max-size-buffers/bytes/time, 우선순위를 선언적으로 지정
+— best-effort 브랜치는 막히는 대신 프레임을 버려서 녹화 브랜치를 멈추지 않게 함
+— overrun 시그널로 브랜치별 드롭 수를 세고 dict / Prometheus 텍스트로 내보냄
+"""
+import os
+import threading
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+LEAKY_MODES = ("no", "upstream", "downstream")
+
+
+class QueuePolicy:
+    """
+    queue 하나에 적용할 정책.
+
+    priority 는 0 이 보통, 음수일수록 덜 중요한 브랜치다. 음수 priority 는 그 queue 의
+    스트리밍 스레드 nice 값으로 적용된다(Linux). 양수는 권한이 있을 때만 적용된다.
+    """
+
+    def __init__(self, leaky: str = "no", max_buffers: int = 200, max_bytes: int = 10 * 1024 * 1024,
+                 max_time: int = Gst.SECOND, priority: int = 0) -> None:
+        if leaky not in LEAKY_MODES:
+            raise ValueError(f"leaky must be one of {LEAKY_MODES}, got '{leaky}'")
+        if leaky != "no" and not (max_buffers or max_bytes or max_time):
+            # 제한이 하나도 없으면 절대 차지 않으므로 leaky 가 의미 없다
+            raise ValueError("a leaky queue needs at least one max-size limit")
+        self.leaky = leaky
+        self.max_buffers = max_buffers
+        self.max_bytes = max_bytes
+        self.max_time = max_time
+        self.priority = priority
+
+    def apply(self, queue: Gst.Element) -> None:
+        Gst.util_set_object_arg(queue, "leaky", self.leaky)
+        queue.set_property("max-size-buffers", self.max_buffers)
+        queue.set_property("max-size-bytes", self.max_bytes)
+        queue.set_property("max-size-time", self.max_time)
+        # overrun/underrun 시그널을 받으려면 silent 가 꺼져 있어야 한다
+        queue.set_property("silent", False)
+
+
+# 녹화: 절대 버리지 않고 넉넉히 (대신 막힐 수 있음)
+RECORD = QueuePolicy(leaky="no", max_buffers=0, max_bytes=0, max_time=3 * Gst.SECOND, priority=10)
+# 화면/비주얼라이저: 최신 몇 프레임만, 밀리면 오래된 것부터 버림
+BEST_EFFORT = QueuePolicy(leaky="downstream", max_buffers=2, max_bytes=0, max_time=0, priority=-5)
+# 분석/수집: 들어오는 새 버퍼를 버려서 상류를 절대 막지 않음
+SAMPLING = QueuePolicy(leaky="upstream", max_buffers=5, max_bytes=0, max_time=0, priority=-10)
+
+
+class _BranchStats:
+    def __init__(self, name: str, queue: Gst.Element, policy: QueuePolicy) -> None:
+        self.name = name
+        self.queue = queue
+        self.policy = policy
+        self.overruns = 0
+        self.underruns = 0
+        self.drops = 0
+
+
+class BranchPolicies:
+    """브랜치 이름 → (queue, 정책, 카운터). 적용과 내보내기를 한 곳에서."""
+
+    def __init__(self) -> None:
+        self.branches: dict[str, _BranchStats] = {}
+
+    def apply(self, name: str, queue: Gst.Element, policy: QueuePolicy) -> None:
+        policy.apply(queue)
+        stats = _BranchStats(name, queue, policy)
+        self.branches[name] = stats
+        queue.connect("overrun", self._on_overrun, stats)
+        queue.connect("underrun", self._on_underrun, stats)
+        if policy.priority:
+            self._set_thread_priority(queue, policy.priority)
+
+    # 스트리밍 스레드에서 호출됨 (queue 락은 풀린 상태)
+    @staticmethod
+    def _on_overrun(_queue, stats: _BranchStats) -> None:
+        stats.overruns += 1
+        if stats.policy.leaky != "no":
+            # leaky queue 는 overrun 한 번에 버퍼 하나를 버린다
+            stats.drops += 1
+
+    @staticmethod
+    def _on_underrun(_queue, stats: _BranchStats) -> None:
+        stats.underruns += 1
+
+    @staticmethod
+    def _set_thread_priority(queue: Gst.Element, priority: int) -> None:
+        if not hasattr(os, "setpriority"):
+            return
+
+        def _first_buffer(_pad, _info):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), -priority)
+            except OSError:
+                pass   # 우선순위를 올리려면(음수 nice) 권한이 필요하다
+            return Gst.PadProbeReturn.REMOVE
+
+        queue.get_static_pad("src").add_probe(Gst.PadProbeType.BUFFER, _first_buffer)
+
+    def drops(self, name: str) -> int:
+        return self.branches[name].drops
+
+    def snapshot(self) -> dict:
+        return {
+            name: {
+                "leaky": s.policy.leaky,
+                "priority": s.policy.priority,
+                "overruns": s.overruns,
+                "underruns": s.underruns,
+                "drops": s.drops,
+                "level_buffers": s.queue.get_property("current-level-buffers"),
+            }
+            for name, s in self.branches.items()
+        }
+
+    def prometheus_lines(self) -> str:
+        lines = [
+            "# HELP gst_branch_dropped_buffers_total Buffers dropped by a leaky branch queue.",
+            "# TYPE gst_branch_dropped_buffers_total counter",
+        ]
+        for name, s in self.branches.items():
+            lines.append(f'gst_branch_dropped_buffers_total{{branch="{name}",leaky="{s.policy.leaky}"}} {s.drops}')
+        lines += [
+            "# HELP gst_branch_overruns_total Times a branch queue was full.",
+            "# TYPE gst_branch_overruns_total counter",
+        ]
+        for name, s in self.branches.items():
+            lines.append(f'gst_branch_overruns_total{{branch="{name}"}} {s.overruns}')
+        return "\n".join(lines) + "\n"
+
+    def print_summary(self) -> None:
+        for name, s in self.branches.items():
+            print(f"{name:>12}: leaky={s.policy.leaky:<10} drops={s.drops:<6} overruns={s.overruns}")
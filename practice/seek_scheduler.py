@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+슬라이더용 시크 스케줄러
+— 시크가 진행 중이면 새 요청은 '마지막 목표'만 남기고 버린다 (coalescing)
+— 드래그 중에는 FLUSH | KEY_UNIT | SNAP_NEAREST (가까운 키프레임, 빠름),
+  손을 떼면 FLUSH | ACCURATE 한 번 (정확한 위치)
+— 시크 → ASYNC_DONE(싱크가 새 위치의 첫 프레임을 받음)까지 지연을 기록
+— 버스 메시지는 handle(msg) 로 넘겨 준다 (BufferingController 와 같은 방식)
+
+    python seek_scheduler.py          # 긴 로컬 파일에서 드래그 흉내: seek_simple 매번 vs 스케줄러
+"""
+import sys
+import time
+from collections import deque
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gst, GLib
+
+DRAG_FLAGS = Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT | Gst.SeekFlags.SNAP_NEAREST
+FINAL_FLAGS = Gst.SeekFlags.FLUSH | Gst.SeekFlags.ACCURATE
+
+
+class SeekScheduler:
+
+    def __init__(self, pipeline: Gst.Element, min_interval: float = 0.0,
+                 timeout: float = 2.0, history: int = 200) -> None:
+        """
+        min_interval: 시크 사이 최소 간격(초). 0 이면 이전 시크가 끝나자마자 다음 시크
+        timeout: ASYNC_DONE 이 오지 않을 때(READY 상태 등) 진행 중 표시를 푸는 시간
+        """
+        self.pipeline = pipeline
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.latencies: deque = deque(maxlen=history)   # (final 여부, 초)
+        self.requested = 0
+        self.issued = 0
+        self.coalesced = 0
+        self.failed = 0
+        self._pending: tuple[int, bool] | None = None
+        self._in_flight: tuple[float, bool] | None = None   # (시작 시각, final)
+        self._last_issue = 0.0
+        self._timer_id = 0
+
+    # ---------- 요청 ----------
+    def request(self, position: int, final: bool = False) -> None:
+        """position(ns) 으로 시크. final=True 면 ACCURATE. 메인 루프 스레드에서 호출."""
+        self.requested += 1
+        if self._pending is not None:
+            self.coalesced += 1           # 아직 보내지 않은 목표는 새 목표로 대체
+        self._pending = (position, final)
+        self._pump()
+
+    def _pump(self) -> None:
+        if self._pending is None or self._in_flight is not None:
+            return
+        wait = self._last_issue + self.min_interval - time.monotonic()
+        if wait > 0:
+            if not self._timer_id:
+                self._timer_id = GLib.timeout_add(max(1, int(wait * 1000)), self._on_interval)
+            return
+        position, final = self._pending
+        self._pending = None
+        self._last_issue = time.monotonic()
+        if not self.pipeline.seek_simple(Gst.Format.TIME, FINAL_FLAGS if final else DRAG_FLAGS, position):
+            self.failed += 1
+            self._pump()
+            return
+        self.issued += 1
+        self._in_flight = (self._last_issue, final)
+        self._arm_timeout()
+
+    def _on_interval(self) -> bool:
+        self._timer_id = 0
+        self._pump()
+        return False
+
+    def _arm_timeout(self) -> None:
+        if self._timer_id:
+            GLib.source_remove(self._timer_id)
+        self._timer_id = GLib.timeout_add(int(self.timeout * 1000), self._on_timeout)
+
+    def _on_timeout(self) -> bool:
+        self._timer_id = 0
+        if self._in_flight is not None:
+            self._in_flight = None
+            self.failed += 1
+            self._pump()
+        return False
+
+    # ---------- 버스 ----------
+    def handle(self, msg: Gst.Message) -> bool:
+        """ASYNC_DONE 이면 진행 중인 시크를 끝내고 다음 목표를 보낸다. 처리했으면 True."""
+        if msg.type != Gst.MessageType.ASYNC_DONE or msg.src != self.pipeline or self._in_flight is None:
+            return False
+        started, final = self._in_flight
+        self.latencies.append((final, time.monotonic() - started))
+        self._in_flight = None
+        if self._timer_id:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = 0
+        self._pump()
+        return True
+
+    @property
+    def busy(self) -> bool:
+        return self._in_flight is not None or self._pending is not None
+
+    def stats(self) -> dict:
+        report = {"requested": self.requested, "issued": self.issued,
+                  "coalesced": self.coalesced, "failed": self.failed}
+        for name, want in (("drag", False), ("final", True)):
+            values = sorted(s for f, s in self.latencies if f == want)
+            if values:
+                report[f"{name}_p50_ms"] = values[len(values) // 2] * 1000
+                report[f"{name}_max_ms"] = values[-1] * 1000
+        return report
+
+
+# ---------- 데모: 드래그 흉내 ----------
+def _scrub(uri: str, scheduled: bool, events: int = 120, hz: float = 60.0) -> dict:
+    """0 → 끝까지 hz 로 value-changed 를 events 번 보내고, 마지막 위치의 프레임이 나올 때까지 시간"""
+    playbin = Gst.ElementFactory.make("playbin", None)
+    playbin.set_property("uri", uri)
+    playbin.set_property("video-sink", Gst.ElementFactory.make("fakesink", None))
+    playbin.set_property("audio-sink", Gst.ElementFactory.make("fakesink", None))
+    playbin.set_state(Gst.State.PAUSED)
+    playbin.get_state(Gst.CLOCK_TIME_NONE)
+    ok, duration = playbin.query_duration(Gst.Format.TIME)
+    scheduler = SeekScheduler(playbin)
+    loop = GLib.MainLoop()
+    bus = playbin.get_bus()
+    bus.add_signal_watch()
+    state = {"sent": 0, "t0": time.monotonic(), "done": None, "async_done": 0}
+
+    def on_message(_bus, msg):
+        if msg.type == Gst.MessageType.ASYNC_DONE:
+            state["async_done"] += 1
+        if scheduled:
+            scheduler.handle(msg)
+        if state["sent"] >= events and msg.type == Gst.MessageType.ASYNC_DONE \
+                and (not scheduled or not scheduler.busy):
+            state["done"] = time.monotonic()
+            loop.quit()
+
+    def tick():
+        i = state["sent"]
+        position = int(duration * (i + 1) / events * 0.95)
+        final = i == events - 1
+        if scheduled:
+            scheduler.request(position, final=final)
+        else:
+            playbin.seek_simple(Gst.Format.TIME, Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT, position)
+        state["sent"] += 1
+        return state["sent"] < events
+
+    bus.connect("message", on_message)
+    GLib.timeout_add(int(1000 / hz), tick)
+    GLib.timeout_add_seconds(60, loop.quit)
+    loop.run()
+    playbin.set_state(Gst.State.NULL)
+    bus.remove_signal_watch()
+    result = {"settle_ms": ((state["done"] or time.monotonic()) - state["t0"]) * 1000,
+              "async_done": state["async_done"]}
+    if scheduled:
+        result.update(scheduler.stats())
+    return result
+
+
+if __name__ == "__main__":
+    import local_media
+
+    Gst.init(None)
+    uri = local_media.file_uri(local_media.mp4_clip(seconds=300, width=1280, height=720, gop=250,
+                                                    name="long-720p-gop250.mp4"))
+    for scheduled in (False, True):
+        r = _scrub(uri, scheduled)
+        print(f"{'scheduler' if scheduled else 'seek_simple':>12}: {r}")
+    sys.exit(0)
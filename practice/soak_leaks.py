@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+tee 브랜치 붙이기/떼기 반복 누수 검사 (soak test)
+— hls_test.py 의 start_recording / stop_recording 처럼 attach_branch → detach_branch 를
+  videotestsrc 파이프라인에 수천 번 반복
+— 매 사이클 끝에서 측정: 살아 있는 GstObject 수(leaks 트레이서 checkpoint), RSS,
+  파이프라인 안의 pad 수, 열린 fd 수, 스레드 수
+— 워밍업 이후 사이클당 증가량(최소제곱 기울기)이 한도를 넘는 항목이 있으면 exit 1
+  남은 객체는 타입별로 보여 준다
+
+    python soak_leaks.py --cycles 2000                  # 녹화 브랜치 (x264enc ! mp4mux ! filesink)
+    python soak_leaks.py --branch display --cycles 5000 --on-ms 50
+"""
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gst, GLib
+
+from pipeline_control import CommandQueue, attach_branch, detach_branch
+
+LEAKS_TRACER = "leaks(filter=GstObject)"
+# 사이클당 허용 증가량
+LIMITS = {"objects": 0.05, "rss_kb": 4.0, "pads": 0.001, "fds": 0.001, "threads": 0.001}
+
+
+def enable_leaks_tracer() -> None:
+    """Gst.init() 보다 먼저 불러야 한다 (트레이서는 init 때 켜진다)."""
+    if Gst.is_initialized():
+        print("soak: Gst is already initialized, leaks tracer will not be active", file=sys.stderr)
+    tracers = os.environ.get("GST_TRACERS")
+    if not tracers or "leaks" not in tracers:
+        os.environ["GST_TRACERS"] = f"{tracers};{LEAKS_TRACER}" if tracers else LEAKS_TRACER
+
+
+def _leaks_tracer() -> Gst.Tracer | None:
+    for tracer in Gst.tracing_get_active_tracers():
+        if tracer.__gtype__.name == "GstLeaksTracer":
+            return tracer
+    return None
+
+
+class ObjectTracker:
+    """leaks 트레이서의 activity checkpoint 로 '이전 checkpoint 이후 생성 - 해제' 를 타입별로 누적"""
+
+    def __init__(self) -> None:
+        self.tracer = _leaks_tracer()
+        self.net: Counter = Counter()
+        if self.tracer is not None:
+            self.tracer.emit("activity-start-tracking")
+
+    @property
+    def available(self) -> bool:
+        return self.tracer is not None
+
+    def checkpoint(self) -> int:
+        """지금까지 순증가한 객체 수 (트레이서가 없으면 0)"""
+        if self.tracer is None:
+            return 0
+        s = self.tracer.emit("activity-get-checkpoint")
+        for field, sign in (("objects-created-list", 1), ("objects-removed-list", -1)):
+            for entry in s.get_value(field) or []:
+                self.net[entry.get_string("type-name")] += sign
+        return sum(self.net.values())
+
+    def reset(self) -> None:
+        self.checkpoint()
+        self.net.clear()
+
+    def leftovers(self, top: int = 10) -> list[tuple[str, int]]:
+        return [(name, n) for name, n in self.net.most_common(top) if n > 0]
+
+    def stop(self) -> None:
+        if self.tracer is not None:
+            self.tracer.emit("activity-stop-tracking")
+
+
+# ---------- 측정 ----------
+def _rss_kb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+
+
+def _count_pads(pipeline: Gst.Bin) -> int:
+    count = 0
+    it = pipeline.iterate_recurse()
+    while True:
+        ret, element = it.next()
+        if ret == Gst.IteratorResult.OK:
+            count += element.numpads
+        elif ret == Gst.IteratorResult.RESYNC:
+            it.resync()
+            count = 0
+        else:
+            break
+    return count
+
+
+def _slope(values: list[float]) -> float:
+    """사이클 번호에 대한 최소제곱 기울기"""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x, mean_y = (n - 1) / 2, sum(values) / n
+    num = sum((i - mean_x) * (v - mean_y) for i, v in enumerate(values))
+    den = sum((i - mean_x) ** 2 for i in range(n))
+    return num / den
+
+
+# ---------- 브랜치 ----------
+def make_branch(kind: str, cycle: int, fixed_names: bool, directory: str) -> list[Gst.Element]:
+    """hls_test 의 녹화 브랜치 (fixed_names 면 hls_test 처럼 매번 같은 이름)"""
+    name = (lambda base: base) if fixed_names else (lambda base: f"{base}_{cycle}")
+    if kind == "display":
+        return [Gst.ElementFactory.make("queue", name("queue_display")),
+                Gst.ElementFactory.make("videoscale", name("scale_display")),
+                Gst.ElementFactory.make("videoconvert", name("convert_display")),
+                Gst.ElementFactory.make("fakesink", name("sink_display"))]
+    encoder = Gst.ElementFactory.make("x264enc", name("encoder"))
+    encoder.set_property("tune", "zerolatency")
+    encoder.set_property("speed-preset", "ultrafast")
+    sink = Gst.ElementFactory.make("filesink", name("sink_rec"))
+    sink.set_property("location", os.path.join(directory, "soak.mp4"))
+    return [Gst.ElementFactory.make("queue", name("queue_rec")),
+            Gst.ElementFactory.make("videoconvert", name("convert_rec")),
+            encoder, Gst.ElementFactory.make("mp4mux", name("muxer")), sink]
+
+
+class Soak:
+
+    def __init__(self, branch: str = "record", cycles: int = 2000, warmup: int = 50,
+                 on_ms: int = 200, fixed_names: bool = True) -> None:
+        self.branch = branch
+        self.cycles = cycles
+        self.warmup = warmup
+        self.on_ms = on_ms
+        self.fixed_names = fixed_names
+        self.samples: dict[str, list[float]] = {k: [] for k in LIMITS}
+        self.directory = tempfile.mkdtemp(prefix="gst-soak-")
+        self.pipeline = Gst.parse_launch(
+            "videotestsrc is-live=true ! video/x-raw,width=320,height=240,framerate=30/1 ! "
+            "tee name=t ! queue ! fakesink sync=false")
+        self.tee = self.pipeline.get_by_name("t")
+        self.control = CommandQueue()
+        self.tracker = ObjectTracker()
+        self.error: str | None = None
+
+    def _cycle(self, i: int) -> None:
+        branch = make_branch(self.branch, i, self.fixed_names, self.directory)
+        pad = self.control.submit(attach_branch, self.pipeline, self.tee, branch).result(timeout=10)
+        time.sleep(self.on_ms / 1000)
+        # 녹화 브랜치는 EOS 로 mp4mux 를 마무리한 뒤 제거 (hls_test.stop_recording 과 같음)
+        self.control.submit(detach_branch, self.pipeline, self.tee, pad, branch,
+                            self.branch == "record").result(timeout=10)
+        del branch, pad           # 파이썬 쪽 참조가 남으면 누수처럼 보인다
+        gc.collect()
+
+    def _sample(self) -> None:
+        self.samples["objects"].append(self.tracker.checkpoint())
+        self.samples["rss_kb"].append(_rss_kb())
+        self.samples["pads"].append(_count_pads(self.pipeline))
+        self.samples["fds"].append(len(os.listdir("/proc/self/fd")))
+        self.samples["threads"].append(len(os.listdir("/proc/self/task")))
+
+    def _worker(self, loop: GLib.MainLoop) -> None:
+        try:
+            for i in range(self.warmup + self.cycles):
+                self._cycle(i)
+                if i == self.warmup - 1 or (self.warmup == 0 and i == 0):
+                    self.tracker.reset()      # 플러그인 로드 · 스레드 풀 등 첫 사이클 할당은 제외
+                if i >= self.warmup:
+                    self._sample()
+                    done = i - self.warmup + 1
+                    if done % 100 == 0:
+                        print(f"{done:>6}/{self.cycles}: objects {self.samples['objects'][-1]:+d}  "
+                              f"rss {self.samples['rss_kb'][-1] / 1024:.1f} MB  "
+                              f"pads {self.samples['pads'][-1]}  fds {self.samples['fds'][-1]}  "
+                              f"threads {self.samples['threads'][-1]}")
+        except Exception as e:       # 타임아웃, 링크 실패 등 — 그 자체가 결과
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            GLib.idle_add(loop.quit)
+
+    def run(self) -> dict:
+        loop = GLib.MainLoop()
+        self.pipeline.set_state(Gst.State.PLAYING)
+        threading.Thread(target=self._worker, args=(loop,), name="soak", daemon=True).start()
+        loop.run()
+        self.pipeline.set_state(Gst.State.NULL)
+        report = self.report()
+        self.tracker.stop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return report
+
+    def report(self) -> dict:
+        growth = {k: _slope(v) for k, v in self.samples.items()}
+        failed = [k for k, g in growth.items() if g > LIMITS[k]]
+        if not self.tracker.available:
+            failed = [k for k in failed if k != "objects"]
+        return {
+            "branch": self.branch,
+            "cycles": len(self.samples["rss_kb"]),
+            "error": self.error,
+            "leaks_tracer": self.tracker.available,
+            "growth_per_cycle": growth,
+            "first": {k: v[0] for k, v in self.samples.items() if v},
+            "last": {k: v[-1] for k, v in self.samples.items() if v},
+            "leftover_objects": self.tracker.leftovers(),
+            "failed": failed,
+            "ok": not failed and self.error is None,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="attach/detach soak test for leaks")
+    parser.add_argument("--branch", choices=("record", "display"), default="record")
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--on-ms", type=int, default=200, help="time each branch stays attached")
+    parser.add_argument("--unique-names", action="store_true",
+                        help="new element names every cycle (default: reuse names like hls_test)")
+    parser.add_argument("--json", help="write the report here")
+    args = parser.parse_args()
+
+    enable_leaks_tracer()
+    Gst.init(None)
+    soak = Soak(args.branch, args.cycles, args.warmup, args.on_ms, not args.unique_names)
+    if not soak.tracker.available:
+        print("soak: leaks tracer not available (GStreamer < 1.18?) — object counts skipped", file=sys.stderr)
+    r = soak.run()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(r, f, indent=2)
+    for key, g in r["growth_per_cycle"].items():
+        mark = "FAIL" if key in r["failed"] else "ok"
+        print(f"{key:>8}: {r['first'].get(key, 0):>10.0f} → {r['last'].get(key, 0):>10.0f}  "
+              f"{g:+.4f}/cycle (limit {LIMITS[key]})  {mark}")
+    for name, n in r["leftover_objects"]:
+        print(f"  leftover {name}: {n}")
+    if r["error"]:
+        print(f"error: {r['error']}")
+    sys.exit(0 if r["ok"] else 1)
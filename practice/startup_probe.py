@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+첫 프레임까지 걸리는 시간(TTFF) 계측과 빠른 playbin 시작 경로
+— Gst.init, 레지스트리 로드, 요소 생성, 파이프라인 상태 전환 하나하나,
+  싱크의 첫 버퍼, ASYNC_DONE 에 타임스탬프
+— legacy: ch5 처럼 URI/싱크 설정 전에 NULL→READY→PAUSED→PLAYING 을 돌린 뒤 다시 PLAYING
+— fast: 필요한 플러그인을 미리 로드하고 URI/싱크를 먼저 설정한 뒤 PLAYING 한 번
+— 두 경로를 로컬 미디어 파일로 각각 새 프로세스에서 여러 번 돌려 비교
+
+    python startup_probe.py                 # 한 번씩 실행하고 단계별 타임라인 출력
+    python startup_probe.py --bench --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+T0 = time.monotonic()     # import 시점 = 스크립트 시작 기준점
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+# webm(VP8+Vorbis) 재생에 필요한 요소들 — fast 경로에서 미리 로드
+DEFAULT_PRELOAD = ("playbin", "uridecodebin", "decodebin", "filesrc", "typefind",
+                   "matroskademux", "vp8dec", "vorbisdec", "multiqueue",
+                   "videoconvert", "videoscale", "audioconvert", "audioresample", "fakesink")
+
+
+class StartupTrace:
+
+    def __init__(self) -> None:
+        self.marks: list[tuple[str, float]] = [("import", 0.0)]
+        self._lock = threading.Lock()
+        self._first_buffer = False
+
+    def mark(self, name: str) -> None:
+        with self._lock:
+            self.marks.append((name, (time.monotonic() - T0) * 1000))
+
+    # ---------- 단계별 래퍼 ----------
+    def init(self) -> None:
+        Gst.init(None)
+        self.mark("gst-init")
+        registry = Gst.Registry.get()
+        n = len(registry.get_feature_list(Gst.ElementFactory))
+        self.mark(f"registry ({n} factories)")
+
+    def preload(self, names=DEFAULT_PRELOAD) -> None:
+        for name in names:
+            factory = Gst.ElementFactory.find(name)
+            if factory:
+                factory.load()
+        self.mark(f"preload ({len(names)} factories)")
+
+    def make(self, factory: str, name: str | None = None) -> Gst.Element:
+        element = Gst.ElementFactory.make(factory, name)
+        self.mark(f"make {factory}")
+        return element
+
+    def watch(self, pipeline: Gst.Pipeline, sink: Gst.Element) -> None:
+        """상태 전환/ASYNC_DONE 은 sync-message(게시 스레드)에서, 첫 버퍼는 싱크 pad probe 에서 기록"""
+        bus = pipeline.get_bus()
+        bus.enable_sync_message_emission()
+
+        def _on_sync(_bus, msg):
+            if msg.type == Gst.MessageType.STATE_CHANGED and msg.src == pipeline:
+                old, new, _ = msg.parse_state_changed()
+                self.mark(f"{old.value_nick}→{new.value_nick}")
+            elif msg.type == Gst.MessageType.ASYNC_DONE and msg.src == pipeline:
+                self.mark("async-done")
+
+        bus.connect("sync-message", _on_sync)
+
+        def _first(_pad, _info):
+            if not self._first_buffer:
+                self._first_buffer = True
+                self.mark("first-buffer-at-sink")
+            return Gst.PadProbeReturn.REMOVE
+
+        sink.get_static_pad("sink").add_probe(Gst.PadProbeType.BUFFER, _first)
+
+    def value(self, name: str) -> float | None:
+        for n, t in self.marks:
+            if n == name:
+                return t
+        return None
+
+    def timeline(self) -> str:
+        lines, prev = [], 0.0
+        for name, t in self.marks:
+            lines.append(f"{t:9.2f} ms  (+{t - prev:7.2f})  {name}")
+            prev = t
+        return "\n".join(lines)
+
+
+def _wait_first_frame(pipeline: Gst.Pipeline, trace: StartupTrace, timeout: float = 30) -> None:
+    bus = pipeline.get_bus()
+    deadline = time.monotonic() + timeout
+    while not trace._first_buffer or trace.value("paused→playing") is None:
+        msg = bus.timed_pop_filtered(100 * Gst.MSECOND, Gst.MessageType.ERROR)
+        if msg:
+            err, dbg = msg.parse_error()
+            if not trace._first_buffer:
+                raise RuntimeError(f"{msg.src.get_name()}: {err.message}")
+        if time.monotonic() > deadline:
+            raise RuntimeError("timed out waiting for the first frame")
+
+
+def start_legacy(uri: str) -> StartupTrace:
+    """ch5/ch5.py 의 기존 순서: 빈 playbin 을 한 바퀴 돌린 뒤 설정하고 다시 PLAYING"""
+    trace = StartupTrace()
+    trace.init()
+    playbin = trace.make("playbin", "playbin")
+    for state in (Gst.State.NULL, Gst.State.READY, Gst.State.PAUSED, Gst.State.PLAYING):
+        playbin.set_state(state)
+    # URI 없이 PAUSED 로 가면서 남은 "No URI set" 에러는 버린다
+    bus = playbin.get_bus()
+    bus.set_flushing(True)
+    bus.set_flushing(False)
+    trace.mark("redundant state cycle")
+    sink = trace.make("fakesink", "video_sink")
+    playbin.set_property("uri", uri)
+    playbin.set_property("video-sink", sink)
+    playbin.set_property("audio-sink", Gst.ElementFactory.make("fakesink", None))
+    trace.watch(playbin, sink)
+    playbin.set_state(Gst.State.PLAYING)
+    _wait_first_frame(playbin, trace)
+    playbin.set_state(Gst.State.NULL)
+    return trace
+
+
+def start_fast(uri: str, preload=DEFAULT_PRELOAD) -> StartupTrace:
+    """플러그인을 미리 로드하고, 설정을 끝낸 뒤 PLAYING 한 번"""
+    trace = StartupTrace()
+    trace.init()
+    trace.preload(preload)
+    playbin = trace.make("playbin", "playbin")
+    sink = trace.make("fakesink", "video_sink")
+    playbin.set_property("uri", uri)
+    playbin.set_property("video-sink", sink)
+    playbin.set_property("audio-sink", Gst.ElementFactory.make("fakesink", None))
+    trace.watch(playbin, sink)
+    playbin.set_state(Gst.State.PLAYING)
+    _wait_first_frame(playbin, trace)
+    playbin.set_state(Gst.State.NULL)
+    return trace
+
+
+def preload_async(names=DEFAULT_PRELOAD) -> threading.Thread:
+    """UI 를 만드는 동안 백그라운드에서 플러그인을 로드 (Gst.init 이후에 호출)"""
+    def _load():
+        for name in names:
+            factory = Gst.ElementFactory.find(name)
+            if factory:
+                factory.load()
+
+    thread = threading.Thread(target=_load, name="gst-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def _bench(runs: int) -> dict:
+    import local_media
+    Gst.init(None)
+    uri = local_media.file_uri(local_media.webm_clip())
+    results = {}
+    for mode in ("legacy", "fast"):
+        samples = []
+        for _ in range(runs):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode,
+                                  "--uri", uri, "--json"], capture_output=True, text=True)
+            if out.returncode != 0:
+                raise RuntimeError(out.stderr)
+            samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        ttff = [s["first-buffer-at-sink"] for s in samples]
+        playing = [s["paused→playing"] for s in samples]
+        results[mode] = {
+            "runs": runs,
+            "ttff_ms_median": statistics.median(ttff),
+            "ttff_ms_min": min(ttff),
+            "playing_ms_median": statistics.median(playing),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="time-to-first-frame for playbin start paths")
+    parser.add_argument("--mode", choices=("legacy", "fast"), default=None)
+    parser.add_argument("--uri", default=None)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.bench:
+        report = _bench(args.runs)
+        print(json.dumps(report, indent=2))
+        speedup = report["legacy"]["ttff_ms_median"] - report["fast"]["ttff_ms_median"]
+        print(f"fast start saves {speedup:.1f} ms to first frame (median)")
+        sys.exit(0)
+
+    if args.uri is None:
+        import local_media
+        Gst.init(None)
+        args.uri = local_media.file_uri(local_media.webm_clip())
+
+    if args.mode is None:
+        # 타임라인이 섞이지 않게 경로마다 새 프로세스
+        for mode in ("legacy", "fast"):
+            print(f"--- {mode} ---", flush=True)
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode, "--uri", args.uri])
+        sys.exit(0)
+
+    trace = (start_legacy if args.mode == "legacy" else start_fast)(args.uri)
+    print(json.dumps(dict(trace.marks)) if args.json else trace.timeline())
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+파이프라인 queue 레벨 / 지연 텔레메트리
+— 어떤 Gst.Pipeline 에든 붙여서 queue · queue2 · appsrc · appsink 를 찾아
+  current-level-buffers/bytes/time 를 주기적으로 샘플링
+— 기본은 current-level-* 폴링만 (요소의 silent 등은 건드리지 않음)
+— overrun/underrun 시그널 · appsink 버퍼 수는 subscribe 로 이름을 준 요소만 — 라이브 파이프라인에서
+  underrun 은 거의 버퍼마다 울리므로 모든 queue 에 걸면 스트리밍 스레드마다 파이썬이 돈다
+— 주기적인 LATENCY 쿼리
+— 시계열을 JSONL 파일 또는 Prometheus 텍스트 엔드포인트로 내보냄
+— 샘플러 스레드의 CPU 가 1 % 를 넘으면 주기를 늘림. 전체 비용은 measure_overhead() 로
+  텔레메트리 없는 실행과 프로세스 CPU(getrusage) 를 비교해서 잰다
+
+    python telemetry.py "videotestsrc ! queue ! x264enc ! fakesink" --port 9108 --jsonl out.jsonl
+    python telemetry.py "videotestsrc is-live=true ! queue name=q ! fakesink" --subscribe q
+    python telemetry.py "videotestsrc is-live=true ! queue ! fakesink" --measure-overhead 10
+"""
+import json
+import resource
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gst, GLib
+
+WATCHED_FACTORIES = ("queue", "queue2", "appsrc", "appsink")
+LEVEL_PROPS = ("current-level-buffers", "current-level-bytes", "current-level-time")
+MAX_OVERHEAD = 0.01          # 샘플링에 쓰는 CPU 가 1 % 를 넘으면 주기를 두 배로
+MAX_INTERVAL = 30.0
+
+
+def element_path(element: Gst.Element) -> str:
+    """'pipeline/bin/queue0' 처럼 이름만으로 만든 경로 (라벨용)"""
+    names = []
+    obj = element
+    while obj is not None:
+        names.append(obj.get_name())
+        obj = obj.get_parent()
+    return "/".join(reversed(names))
+
+
+class _Watched:
+    def __init__(self, element: Gst.Element, kind: str) -> None:
+        self.element = element
+        self.kind = kind
+        self.path = element_path(element)
+        self.props = [p for p in LEVEL_PROPS if element.find_property(p) is not None]
+        self.subscribed = False
+        self.overruns = 0
+        self.underruns = 0
+        self.buffers = 0     # appsink 는 레벨 속성이 없을 수 있어 유입 버퍼 수를 센다
+        self.last: dict[str, int] = {}
+
+
+class PipelineTelemetry:
+
+    def __init__(self, pipeline: Gst.Pipeline, interval: float = 1.0,
+                 latency_interval: float = 5.0, jsonl_path: str | None = None,
+                 history: int = 3600, subscribe: tuple[str, ...] = ()) -> None:
+        """subscribe: overrun/underrun 시그널(queue) · 버퍼 수(appsink)를 셀 요소 이름들"""
+        Gst.init(None)
+        self.pipeline = pipeline
+        self.subscribe = set(subscribe)
+        self.interval = interval
+        self.latency_interval = latency_interval
+        self.series: deque = deque(maxlen=history)     # 최근 샘플 (dict)
+        self.latency = {"live": False, "min": 0, "max": 0}
+        self.overhead = 0.0
+        self._watched: dict[Gst.Element, _Watched] = {}
+        self._lock = threading.Lock()
+        self._jsonl = open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+        self._timer_id = None
+        self._latency_id = None
+        self._started = None
+        self._spent = 0.0
+
+        it = pipeline.iterate_recurse()
+        while True:
+            ret, element = it.next()
+            if ret == Gst.IteratorResult.OK:
+                self._maybe_watch(element)
+            elif ret == Gst.IteratorResult.RESYNC:
+                it.resync()
+            else:
+                break
+        # 동적으로 추가되는 요소(uridecodebin 내부, 녹화 브랜치 등)도 따라간다
+        pipeline.connect("deep-element-added", lambda _p, _b, e: self._maybe_watch(e))
+        pipeline.connect("deep-element-removed", lambda _p, _b, e: self._unwatch(e))
+
+    # ---------- 대상 찾기 ----------
+    def _maybe_watch(self, element: Gst.Element) -> None:
+        factory = element.get_factory()
+        kind = factory.get_name() if factory else None
+        if kind not in WATCHED_FACTORIES:
+            return
+        w = _Watched(element, kind)
+        with self._lock:
+            if element in self._watched:
+                return
+            self._watched[element] = w
+        w.subscribed = element.get_name() in self.subscribe
+        if not w.subscribed:
+            return                                  # 레벨 폴링만
+        if kind in ("queue", "queue2"):
+            element.set_property("silent", False)   # overrun/underrun 시그널 활성화
+            element.connect("overrun", self._on_overrun, w)
+            element.connect("underrun", self._on_underrun, w)
+        elif kind == "appsink" and not w.props:
+            element.get_static_pad("sink").add_probe(Gst.PadProbeType.BUFFER, self._count, w)
+
+    def _unwatch(self, element: Gst.Element) -> None:
+        with self._lock:
+            self._watched.pop(element, None)
+
+    @staticmethod
+    def _on_overrun(_queue, w: _Watched) -> None:
+        w.overruns += 1
+
+    @staticmethod
+    def _on_underrun(_queue, w: _Watched) -> None:
+        w.underruns += 1
+
+    @staticmethod
+    def _count(_pad, _info, w: _Watched):
+        w.buffers += 1
+        return Gst.PadProbeReturn.OK
+
+    # ---------- 실행 ----------
+    def start(self) -> None:
+        if self._timer_id is None:
+            self._started = time.monotonic()
+            self._timer_id = GLib.timeout_add(int(self.interval * 1000), self._sample)
+            self._latency_id = GLib.timeout_add(int(self.latency_interval * 1000), self._query_latency)
+
+    def stop(self) -> None:
+        for source_id in (self._timer_id, self._latency_id):
+            if source_id is not None:
+                GLib.source_remove(source_id)
+        self._timer_id = self._latency_id = None
+        if self._jsonl:
+            self._jsonl.close()
+            self._jsonl = None
+
+    def _query_latency(self) -> bool:
+        query = Gst.Query.new_latency()
+        if self.pipeline.query(query):
+            live, min_lat, max_lat = query.parse_latency()
+            self.latency = {"live": live, "min": min_lat,
+                            "max": -1 if max_lat == Gst.CLOCK_TIME_NONE else max_lat}
+        return True
+
+    def _sample(self) -> bool:
+        t0 = time.thread_time()
+        record = {"ts": time.time(), "latency": dict(self.latency), "elements": {}}
+        with self._lock:
+            watched = list(self._watched.values())
+        for w in watched:
+            values = {p: w.element.get_property(p) for p in w.props}
+            if w.subscribed and w.kind in ("queue", "queue2"):
+                values["overruns"] = w.overruns
+                values["underruns"] = w.underruns
+            elif w.subscribed and w.kind == "appsink" and not w.props:
+                values["buffers"] = w.buffers
+            w.last = values
+            record["elements"][w.path] = values
+        self.series.append(record)
+        if self._jsonl:
+            self._jsonl.write(json.dumps(record) + "\n")
+
+        # 샘플러 자신의 비용 → 1 % 를 넘으면 주기를 늘린다 (시그널 비용은 measure_overhead() 로)
+        self._spent += time.thread_time() - t0
+        elapsed = time.monotonic() - self._started
+        self.overhead = self._spent / elapsed if elapsed > 0 else 0.0
+        if self.overhead > MAX_OVERHEAD and self.interval < MAX_INTERVAL:
+            self.interval = min(MAX_INTERVAL, self.interval * 2)
+            self._spent, self._started = 0.0, time.monotonic()
+            self._timer_id = GLib.timeout_add(int(self.interval * 1000), self._sample)
+            return False
+        return True
+
+    # ---------- 내보내기 ----------
+    def prometheus_lines(self) -> str:
+        """마지막 샘플 기준. HTTP 스레드에서 불려도 요소 속성은 건드리지 않는다."""
+        with self._lock:
+            watched = list(self._watched.values())
+        lines = []
+        metrics = {
+            "current-level-buffers": ("gst_queue_level_buffers", "gauge"),
+            "current-level-bytes": ("gst_queue_level_bytes", "gauge"),
+            "current-level-time": ("gst_queue_level_time_ns", "gauge"),
+            "overruns": ("gst_queue_overruns_total", "counter"),
+            "underruns": ("gst_queue_underruns_total", "counter"),
+            "buffers": ("gst_appsink_buffers_total", "counter"),
+        }
+        for key, (metric, kind) in metrics.items():
+            rows = [w for w in watched if key in w.last]
+            if not rows:
+                continue
+            lines.append(f"# TYPE {metric} {kind}")
+            for w in rows:
+                lines.append(f'{metric}{{element="{w.path}",factory="{w.kind}"}} {w.last[key]}')
+        pipeline = self.pipeline.get_name()
+        lines += [
+            "# TYPE gst_pipeline_latency_min_ns gauge",
+            f'gst_pipeline_latency_min_ns{{pipeline="{pipeline}"}} {self.latency["min"]}',
+            "# TYPE gst_pipeline_latency_max_ns gauge",
+            f'gst_pipeline_latency_max_ns{{pipeline="{pipeline}"}} {self.latency["max"]}',
+            "# TYPE gst_telemetry_overhead_ratio gauge",
+            f'gst_telemetry_overhead_ratio{{pipeline="{pipeline}"}} {self.overhead:.5f}',
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class PrometheusEndpoint:
+    """
+    /metrics 에서 등록된 collector 들의 prometheus_lines() 를 이어 붙여 내보낸다.
+    (PipelineTelemetry, queue_policy.BranchPolicies 등)
+    """
+
+    def __init__(self, port: int = 9108, host: str = "0.0.0.0") -> None:
+        self.collectors = []
+        endpoint = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = "".join(c.prometheus_lines() for c in endpoint.collectors).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def add(self, collector) -> None:
+        self.collectors.append(collector)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ---------- 오버헤드: 텔레메트리 없는 실행과 프로세스 CPU 비교 ----------
+def _process_cpu() -> float:
+    ru = resource.getrusage(resource.RUSAGE_SELF)     # 모든 스트리밍 스레드 포함
+    return ru.ru_utime + ru.ru_stime
+
+
+def _cpu_ratio(launch: str, seconds: float, telemetry_kwargs: dict | None = None) -> float:
+    """launch 를 seconds 동안 돌린 프로세스 CPU / 벽시계. telemetry_kwargs 가 None 이 아니면 붙여서."""
+    pipeline = Gst.parse_launch(launch)
+    telemetry = PipelineTelemetry(pipeline, **telemetry_kwargs) if telemetry_kwargs is not None else None
+    loop = GLib.MainLoop()
+    pipeline.set_state(Gst.State.PLAYING)
+    pipeline.get_state(5 * Gst.SECOND)
+    if telemetry:
+        telemetry.start()
+    cpu0, t0 = _process_cpu(), time.monotonic()
+    GLib.timeout_add(int(seconds * 1000), loop.quit)
+    loop.run()
+    cpu, wall = _process_cpu() - cpu0, time.monotonic() - t0
+    if telemetry:
+        telemetry.stop()
+    pipeline.set_state(Gst.State.NULL)
+    return cpu / wall
+
+
+def measure_overhead(launch: str, seconds: float = 10.0, **telemetry_kwargs) -> dict:
+    """같은 launch 를 텔레메트리 없이 / 붙여서 한 번씩 → 프로세스 CPU 차이 (1.0 = 코어 하나)"""
+    Gst.init(None)
+    without = _cpu_ratio(launch, seconds)
+    with_ = _cpu_ratio(launch, seconds, telemetry_kwargs)
+    return {"without": without, "with": with_, "overhead": with_ - without,
+            "within_budget": with_ - without <= MAX_OVERHEAD}
+
+
+# ---------- 실행: 임의의 launch 문자열에 붙이기 ----------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="queue level / latency telemetry for a launch line")
+    parser.add_argument("launch", help="gst-launch style pipeline description")
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=None, help="serve Prometheus text on this port")
+    parser.add_argument("--jsonl", default=None, help="append samples to this JSONL file")
+    parser.add_argument("--subscribe", nargs="*", default=[],
+                        help="element names whose overrun/underrun (or appsink buffers) are counted")
+    parser.add_argument("--measure-overhead", type=float, default=None, metavar="SECONDS",
+                        help="compare process CPU with and without telemetry, then exit")
+    args = parser.parse_args()
+
+    Gst.init(None)
+    if args.measure_overhead:
+        r = measure_overhead(args.launch, args.measure_overhead, interval=args.interval,
+                             subscribe=tuple(args.subscribe))
+        print(f"process CPU without {r['without'] * 100:.2f} %, with {r['with'] * 100:.2f} %, "
+              f"overhead {r['overhead'] * 100:+.2f} % ({'ok' if r['within_budget'] else 'over budget'})")
+        raise SystemExit(0 if r["within_budget"] else 1)
+    pipeline = Gst.parse_launch(args.launch)
+    if not isinstance(pipeline, Gst.Pipeline):
+        wrapper = Gst.Pipeline.new("pipeline")
+        wrapper.add(pipeline)
+        pipeline = wrapper
+
+    telemetry = PipelineTelemetry(pipeline, interval=args.interval, jsonl_path=args.jsonl,
+                                  subscribe=tuple(args.subscribe))
+    endpoint = None
+    if args.port:
+        endpoint = PrometheusEndpoint(args.port)
+        endpoint.add(telemetry)
+        endpoint.start()
+
+    loop = GLib.MainLoop()
+    bus = pipeline.get_bus()
+    bus.add_signal_watch()
+
+    def on_error(_bus, msg):
+        err, dbg = msg.parse_error()
+        print(f"[ERROR] {err.message}\n{dbg or ''}")
+        loop.quit()
+
+    bus.connect("message::error", on_error)
+    bus.connect("message::eos", lambda *_: loop.quit())
+
+    pipeline.set_state(Gst.State.PLAYING)
+    telemetry.start()
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        pass
+    telemetry.stop()
+    pipeline.set_state(Gst.State.NULL)
+    if endpoint:
+        endpoint.stop()
+    print(f"sampler thread overhead: {telemetry.overhead * 100:.3f} % CPU "
+          f"(use --measure-overhead for the whole process)")
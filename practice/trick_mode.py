@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+트릭 모드 빨리 감기 / 되감기 (키프레임만 디코딩)
+— |rate| > 2 면 FLUSH | TRICKMODE | TRICKMODE_KEY_UNITS | TRICKMODE_NO_AUDIO 로 rate 시크
+  (디먹서/디코더가 키프레임만 내보내고 오디오는 건너뜀), 음수 rate 는 현재 위치 → 0 역방향
+— 싱크의 QoS(dropped) 로 디코딩이 따라가지 못하면 rate 를 한 단계 낮추고,
+  여유가 생기면 요청한 rate 까지 다시 올린다
+— rate 별 실제 출력 fps 기록
+
+    python trick_mode.py          # 긴 CCTV 대역 파일에서 ±8×…64× 각각 몇 초씩
+"""
+import sys
+import time
+
+import gi
+
+gi.require_version("Gst", "1.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gst, GLib
+
+RATES = (8.0, 16.0, 32.0, 64.0)
+TRICK_FLAGS = (Gst.SeekFlags.FLUSH | Gst.SeekFlags.TRICKMODE
+               | Gst.SeekFlags.TRICKMODE_KEY_UNITS | Gst.SeekFlags.TRICKMODE_NO_AUDIO)
+
+
+class _RateStats:
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.seconds = 0.0
+        self.dropped = 0
+
+    def to_dict(self) -> dict:
+        return {"frames": self.frames, "seconds": round(self.seconds, 2), "dropped": self.dropped,
+                "fps": self.frames / self.seconds if self.seconds else 0.0}
+
+
+class TrickPlayer:
+
+    def __init__(self, playbin: Gst.Element, adapt: bool = True, drop_limit: float = 0.2,
+                 interval: float = 1.0) -> None:
+        """
+        drop_limit: 한 구간(interval 초) 동안 QoS dropped / (processed + dropped) 가 이보다 크면 rate 를 낮춘다
+        """
+        self.playbin = playbin
+        self.adapt = adapt
+        self.drop_limit = drop_limit
+        self.interval = interval
+        self.requested = 1.0          # 사용자가 요청한 rate
+        self.rate = 1.0               # 실제 적용 중인 rate
+        self.stats: dict[float, _RateStats] = {}
+        self._frames = 0
+        self._qos = {"processed": 0, "dropped": 0}
+        self._window = (0, 0)         # 이전 구간 끝의 (processed, dropped)
+        self._since = time.monotonic()
+        self._probe_pad: Gst.Pad | None = None
+        self._timer_id = 0
+
+    # ---------- 제어 ----------
+    def set_rate(self, rate: float) -> bool:
+        """rate 로 재생 (1.0 = 보통). 음수면 역방향. 메인 루프 스레드에서 호출."""
+        self.requested = rate
+        ok = self._seek(rate)
+        if ok and self.adapt and abs(rate) > 2 and not self._timer_id:
+            self._timer_id = GLib.timeout_add(int(self.interval * 1000), self._on_interval)
+        return ok
+
+    def normal(self) -> bool:
+        return self.set_rate(1.0)
+
+    def faster(self, reverse: bool = False) -> bool:
+        """±8 → 16 → 32 → 64 → 8 … 순환"""
+        sign = -1.0 if reverse else 1.0
+        current = abs(self.requested) if (self.requested < 0) == reverse else 0
+        bigger = [r for r in RATES if r > current]
+        return self.set_rate(sign * (bigger[0] if bigger else RATES[0]))
+
+    def _seek(self, rate: float) -> bool:
+        self._account()
+        ok, position = self.playbin.query_position(Gst.Format.TIME)
+        if not ok:
+            return False
+        flags = TRICK_FLAGS if abs(rate) > 2 else Gst.SeekFlags.FLUSH | Gst.SeekFlags.ACCURATE
+        if rate > 0:
+            done = self.playbin.seek(rate, Gst.Format.TIME, flags,
+                                     Gst.SeekType.SET, position, Gst.SeekType.END, 0)
+        else:
+            done = self.playbin.seek(rate, Gst.Format.TIME, flags,
+                                     Gst.SeekType.SET, 0, Gst.SeekType.SET, position)
+        if done:
+            self.rate = rate
+            # 싱크는 FLUSH_STOP 에서 QoS 카운터를 0 으로 되돌린다
+            self._qos = {"processed": 0, "dropped": 0}
+            self._window = (0, 0)
+            self._attach_counter()
+        return done
+
+    # ---------- 측정 ----------
+    def _attach_counter(self) -> None:
+        if self._probe_pad is not None:
+            return
+        sink = self.playbin.get_property("video-sink")
+        pad = sink.get_static_pad("sink") if sink else None
+        if pad is None:
+            return
+        pad.add_probe(Gst.PadProbeType.BUFFER, self._on_buffer)
+        self._probe_pad = pad
+
+    def _on_buffer(self, _pad, _info):
+        self._frames += 1             # 스트리밍 스레드 — 정수 증가만
+        return Gst.PadProbeReturn.OK
+
+    def handle(self, msg: Gst.Message) -> bool:
+        """QoS 메시지를 넘겨 주면 디코딩 여유를 판단하는 데 쓴다."""
+        if msg.type != Gst.MessageType.QOS:
+            return False
+        _fmt, processed, dropped = msg.parse_qos_stats()
+        if processed >= 0 and dropped >= 0:
+            # 요소마다 따로 누적하므로 가장 큰 값(보통 비디오 싱크)을 쓴다
+            self._qos["processed"] = max(self._qos["processed"], processed)
+            self._qos["dropped"] = max(self._qos["dropped"], dropped)
+        return True
+
+    def _account(self) -> None:
+        """지금까지의 프레임/시간/드롭을 현재 rate 에 더한다."""
+        now = time.monotonic()
+        entry = self.stats.setdefault(self.rate, _RateStats())
+        entry.frames += self._frames
+        entry.seconds += now - self._since
+        entry.dropped += self._qos["dropped"] - self._window[1]
+        self._frames = 0
+        self._since = now
+        self._window = (self._qos["processed"], self._qos["dropped"])
+
+    def _on_interval(self) -> bool:
+        processed = self._qos["processed"] - self._window[0]
+        dropped = self._qos["dropped"] - self._window[1]
+        self._account()
+        if abs(self.requested) <= 2:
+            self._timer_id = 0
+            return False
+        sign = 1.0 if self.requested > 0 else -1.0
+        ladder = [r for r in RATES if r <= abs(self.requested)] or [RATES[0]]
+        step = ladder.index(abs(self.rate)) if abs(self.rate) in ladder else len(ladder) - 1
+        total = processed + dropped
+        if total and dropped / total > self.drop_limit and step > 0:
+            self._seek(sign * ladder[step - 1])          # 못 따라감 → 한 단계 낮춤
+        elif total and dropped == 0 and step < len(ladder) - 1:
+            self._seek(sign * ladder[step + 1])          # 여유 → 요청한 rate 쪽으로
+        return True
+
+    def report(self) -> dict:
+        self._account()
+        return {f"{rate:+g}x": s.to_dict() for rate, s in sorted(self.stats.items())}
+
+
+# ---------- 데모 ----------
+if __name__ == "__main__":
+    import local_media
+
+    Gst.init(None)
+    # 30 fps, 1 초마다 키프레임인 10 분짜리 CCTV 대역
+    path = local_media.mp4_clip(seconds=600, width=1280, height=720, fps=30, gop=30,
+                                name="cctv-720p-10min-gop30.mp4")
+    playbin = Gst.ElementFactory.make("playbin", None)
+    playbin.set_property("uri", local_media.file_uri(path))
+    playbin.set_property("video-sink", Gst.ElementFactory.make("fakesink", None))
+    playbin.get_property("video-sink").set_property("qos", True)
+    playbin.set_property("audio-sink", Gst.ElementFactory.make("fakesink", None))
+    player = TrickPlayer(playbin)
+
+    bus = playbin.get_bus()
+    bus.add_signal_watch()
+    bus.connect("message::qos", lambda _bus, msg: player.handle(msg))
+    loop = GLib.MainLoop()
+    bus.connect("message::eos", lambda *_: loop.quit())
+    bus.connect("message::error", lambda _bus, msg: (print(msg.parse_error()[0].message), loop.quit()))
+
+    playbin.set_state(Gst.State.PAUSED)
+    playbin.get_state(Gst.CLOCK_TIME_NONE)
+    playbin.seek_simple(Gst.Format.TIME, Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT, 300 * Gst.SECOND)
+    playbin.set_state(Gst.State.PLAYING)
+
+    schedule = [1.0, 8.0, 16.0, 32.0, 64.0, -8.0, -32.0, -64.0, 1.0]
+
+    def next_rate():
+        if not schedule:
+            loop.quit()
+            return False
+        player.set_rate(schedule.pop(0))
+        return True
+
+    next_rate()
+    GLib.timeout_add_seconds(4, next_rate)
+    loop.run()
+    for rate, s in player.report().items():
+        print(f"{rate:>6}: {s['fps']:6.1f} fps out  ({s['frames']} frames / {s['seconds']} s, "
+              f"dropped {s['dropped']})")
+    playbin.set_state(Gst.State.NULL)
+    sys.exit(0)
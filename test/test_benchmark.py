@@ -0,0 +1,35 @@
+"""
+benchmark 토폴로지 빌드 확인
+— _topologies() 의 모든 launch 문자열이 파싱되고, 측정할 bench_sink 를 PLAYING 전에 찾을 수 있는지
+
+    python -m pytest test/test_benchmark.py
+"""
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("gi")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+import benchmark
+
+Gst.init(None)
+
+
+@pytest.mark.parametrize("name", list(benchmark._topologies()))
+def test_topology_builds(name):
+    description, unit = benchmark._topologies()[name]
+    pipeline = Gst.parse_launch(description)
+    try:
+        sink = benchmark._bench_sink(pipeline)
+        assert sink is not None
+        assert sink.get_static_pad("sink") is not None
+        assert unit in ("frames", "samples")
+    finally:
+        pipeline.set_state(Gst.State.NULL)
@@ -0,0 +1,79 @@
+"""
+buffering_control 확인
+— 대역폭을 제한한 로컬 HTTP 서버(local_media.ThrottledHTTPServer)로 끝까지 재생
+— 히스테리시스: 재버퍼링 한 번에 PAUSED/PLAYING 한 쌍만 (ch12 방식은 메시지마다 상태를 바꾼다)
+— 적응: 재생 속도보다 느린 입력이면 buffer-duration 이 늘고 buffer-size 가 입력 속도로 정해진다
+— download=None: max_duration 으로도 모자라면 다운로드 모드로 다시 열고 멈췄던 위치 근처에서 이어 재생
+
+    python -m pytest test/test_buffering_control.py
+"""
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("gi")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+import local_media
+from buffering_control import BufferingController, NaiveBuffering, run_once
+
+SECONDS = 6
+
+Gst.init(None)
+
+
+@pytest.fixture(scope="module")
+def clip():
+    path = local_media.webm_clip(seconds=SECONDS)
+    return path, os.path.getsize(path) / SECONDS       # (경로, 재생 비트레이트 바이트/초)
+
+
+def _play(clip_path, cls, rate=0, profile=None, **kwargs):
+    server = local_media.ThrottledHTTPServer(rate=rate, profile=profile).start()
+    try:
+        return run_once(server.url(clip_path), cls, timeout=60, **kwargs)
+    finally:
+        server.stop()
+
+
+def test_hysteresis_does_not_flap(clip):
+    path, bitrate = clip
+    profile = [(1, bitrate * 2.0), (1, bitrate * 0.6)] * 10
+    naive = _play(path, NaiveBuffering, profile=profile)
+    ours = _play(path, BufferingController, profile=profile, download=False)
+    assert "error" not in ours
+    # 첫 프리버퍼링 한 쌍 + 재버퍼링마다 PAUSED/PLAYING 한 쌍
+    assert ours["state_changes"] <= 2 * (ours["rebuffers"] + 1)
+    assert ours["state_changes"] <= naive["state_changes"]
+
+
+def test_slow_input_adapts_duration_and_size(clip):
+    path, bitrate = clip
+    r = _play(path, BufferingController, rate=bitrate * 0.6, download=False,
+              min_duration=1.0, max_duration=8.0)
+    assert "error" not in r
+    assert r["rebuffers"] >= 1
+    assert r["buffer_duration_s"] > 1.0
+    assert r["buffer_size_bytes"] is not None
+    # 입력 속도(≈ 0.6 × 비트레이트) × duration 근처, 한도 안
+    assert 256 * 1024 <= r["buffer_size_bytes"] <= 64 * 1024 * 1024
+
+
+def test_slow_input_falls_back_to_download(clip):
+    path, bitrate = clip
+    r = _play(path, BufferingController, rate=bitrate * 0.6, download=None,
+              min_duration=0.5, max_duration=1.0)
+    assert "error" not in r
+    assert r["download"] is True
+    assert r["reopen_s"] > 0
+    assert r["stall_time_s"] + r["reopen_s"] <= r["wall_s"]
+    # KEY_UNIT seek 라서 앞쪽 키프레임(webm_clip 은 2초 간격)으로 붙을 수 있다
+    assert r["resume_target_s"] is not None and r["resume_target_s"] > 0
+    assert r["resume_position_s"] is not None
+    assert abs(r["resume_position_s"] - r["resume_target_s"]) <= 2.5
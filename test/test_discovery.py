@@ -0,0 +1,57 @@
+"""
+discovery 실패 캐시 확인
+— 잘린 파일: 에러는 메시지가 아닌 안정된 키, 확정된 실패라 TTL 이 지나도 다시 열지 않는다
+
+    python -m pytest test/test_discovery.py
+"""
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("gi")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+import local_media
+from discovery import DiscoveryService, is_definitive, probe
+
+Gst.init(None)
+
+
+@pytest.fixture
+def truncated(tmp_path):
+    data = open(local_media.mp4_clip(), "rb").read()
+    path = tmp_path / "truncated.mp4"
+    path.write_bytes(data[:len(data) // 4])
+    return str(path)
+
+
+def test_truncated_file_is_a_definitive_error(truncated):
+    _path, info, error = probe(truncated, timeout=5)
+    assert info is None
+    assert error and truncated not in error          # 메시지(경로 포함)가 아닌 키
+    assert is_definitive(error), error
+
+
+def test_truncated_file_is_not_reprobed(tmp_path, truncated):
+    service = DiscoveryService(str(tmp_path / "cache.sqlite"), workers=1, timeout=5, failure_ttl=0)
+    try:
+        first = service.discover([truncated])
+        assert "error" in first[os.path.abspath(truncated)]
+        assert service.last_stats["probed"] == 1
+        second = service.discover([truncated])
+        assert second == first
+        assert service.last_stats["cached"] == 1 and service.last_stats["probed"] == 0
+    finally:
+        service.close()
+
+
+def test_transient_errors_expire():
+    assert not is_definitive("timeout")
+    assert not is_definitive("resource:busy")
+    assert is_definitive("stream:demux")
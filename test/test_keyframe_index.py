@@ -0,0 +1,60 @@
+"""
+keyframe_index 빈 인덱스 확인
+— 키프레임이 없는 파일(소리만)에서 lookup 은 None, span 은 ValueError, seek 는 보통 시크
+
+    python -m pytest test/test_keyframe_index.py
+"""
+import os
+import sys
+from array import array
+
+import pytest
+
+pytest.importorskip("gi")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+import local_media
+from keyframe_index import KeyframeIndex, build
+
+Gst.init(None)
+
+
+@pytest.fixture
+def audio_only():
+    return local_media.generate(
+        "audio-only-2s.ogg",
+        "audiotestsrc num-buffers=86 samplesperbuffer=1024 ! audioconvert ! vorbisenc ! oggmux")
+
+
+def test_empty_index_lookup_and_span(tmp_path):
+    index = KeyframeIndex(str(tmp_path / "none.mp4"), array("q"), array("q"))
+    assert index.lookup(5 * Gst.SECOND) is None
+    assert index.next_after(0) is None
+    with pytest.raises(ValueError):
+        index.span(0, Gst.SECOND)
+
+
+def test_audio_only_file_builds_empty_index_and_seeks(audio_only):
+    index = build(audio_only, save=False)
+    assert len(index) == 0
+    assert index.lookup(Gst.SECOND) is None
+
+    pipeline = Gst.parse_launch(f"filesrc location={audio_only} ! oggdemux ! vorbisdec ! fakesink")
+    pipeline.set_state(Gst.State.PAUSED)
+    try:
+        assert pipeline.get_state(5 * Gst.SECOND)[0] == Gst.StateChangeReturn.SUCCESS
+        assert index.seek(pipeline, Gst.SECOND)          # 보통 시크로 대체
+    finally:
+        pipeline.set_state(Gst.State.NULL)
+
+
+def test_lookup_with_keyframes(tmp_path):
+    index = KeyframeIndex(str(tmp_path / "x.mp4"), array("q", [0, 2 * Gst.SECOND]), array("q", [48, 9000]))
+    assert index.lookup(Gst.SECOND) == (0, 48)
+    assert index.lookup(3 * Gst.SECOND) == (2 * Gst.SECOND, 9000)
+    assert index.span(Gst.SECOND, Gst.SECOND) == (0, 2 * Gst.SECOND)
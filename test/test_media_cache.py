@@ -0,0 +1,34 @@
+"""
+media_cache.parse_range 확인 (CachingProxy, ThrottledHTTPServer 가 같이 쓰는 Range 파서)
+— 거꾸로 된 범위(bytes=500-100)와 파일 끝 너머는 ValueError → 416
+
+    python -m pytest test/test_media_cache.py
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+
+from media_cache import parse_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("bytes=-", None),
+    ("items=0-10", None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=500-100", "bytes=1000-", "bytes=1000-1200"])
+def test_unsatisfiable_range(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 1000)
@@ -0,0 +1,64 @@
+"""
+mmap_feeder 타임스탬프 확인
+— _timing(): caps → (단위 바이트, rate_n, rate_d)
+— _push(): 알려진 caps 에서 PTS/duration/offset 이 단위 수로 계산되는지 (복사 · 복사 없는 방식 모두)
+
+    python -m pytest test/test_mmap_feeder.py
+"""
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("gi")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice"))
+
+import gi
+
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+from mmap_feeder import MmapFeeder, _timing
+
+AUDIO_CAPS = "audio/x-raw,format=S16LE,rate=48000,channels=2,layout=interleaved"
+VIDEO_CAPS = "video/x-raw,format=I420,width=320,height=240,framerate=30/1"
+
+Gst.init(None)
+
+
+def test_timing_audio():
+    assert _timing(Gst.Caps.from_string(AUDIO_CAPS)) == (4, 48000, 1)
+
+
+def test_timing_video():
+    assert _timing(Gst.Caps.from_string(VIDEO_CAPS)) == (320 * 240 * 3 // 2, 30, 1)
+
+
+def test_timing_rejects_encoded():
+    with pytest.raises(ValueError):
+        _timing(Gst.Caps.from_string("video/x-h264"))
+
+
+@pytest.mark.parametrize("zero_copy", [True, False])
+def test_push_timestamps(tmp_path, zero_copy):
+    path = tmp_path / "audio.raw"
+    path.write_bytes(bytes(range(256)) * 1500)              # 384000 바이트 = 96000 프레임 = 2 초
+    pipeline = Gst.parse_launch("appsrc name=src ! appsink name=sink sync=false")
+    feeder = MmapFeeder(pipeline.get_by_name("src"), str(path), Gst.Caps.from_string(AUDIO_CAPS),
+                        chunk_bytes=4800 * 4, zero_copy=zero_copy)        # 4800 프레임 = 100 ms
+    sink = pipeline.get_by_name("sink")
+    pipeline.set_state(Gst.State.PLAYING)
+    try:
+        assert feeder._push(48000 * 4, 4800 * 4, 48000) == 0            # 1 초 위치부터 한 덩어리
+        sample = sink.emit("try-pull-sample", 5 * Gst.SECOND)
+        assert sample is not None
+        buf = sample.get_buffer()
+        assert buf.pts == Gst.SECOND
+        assert buf.duration == 100 * Gst.MSECOND
+        assert buf.offset == 48000
+        assert buf.get_size() == 4800 * 4
+        assert buf.extract_dup(0, 4) == path.read_bytes()[48000 * 4:48000 * 4 + 4]
+    finally:
+        feeder.stop()
+        pipeline.set_state(Gst.State.NULL)
+        feeder.close()
@@ -0,0 +1,31 @@
+"""
+짧은 attach/detach soak
+— soak_leaks.py 를 새 프로세스에서 (leaks 트레이서는 Gst.init 전에 켜야 하므로)
+  화면 브랜치, 고정 이름, 20 사이클 → report()["ok"]
+
+    python -m pytest test/test_soak_leaks.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("gi")
+
+SOAK = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "practice", "soak_leaks.py")
+
+
+def test_display_branch_does_not_grow(tmp_path):
+    report_path = tmp_path / "soak.json"
+    proc = subprocess.run(
+        [sys.executable, SOAK, "--branch", "display", "--cycles", "20", "--warmup", "10",
+         "--on-ms", "50", "--json", str(report_path)],
+        capture_output=True, text=True, timeout=120, cwd=os.path.dirname(SOAK))
+    assert report_path.exists(), proc.stderr
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert report["error"] is None
+    assert report["cycles"] == 20
+    assert report["ok"], (report["failed"], report["growth_per_cycle"], report["leftover_objects"])
+    assert proc.returncode == 0